@@ -1,20 +1,32 @@
 import logging
-from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-import pandas as pd
-import numpy as np
+
+from app.clock import SYSTEM_CLOCK, Clock
 
 logger = logging.getLogger(__name__)
 
 
+# Timeframe yang candle-nya dibentuk live per tick (lainnya hanya dari history database)
+LIVE_TIMEFRAMES = ("M1", "M5")
+
+
 class OHLCVAggregator:
-    def __init__(self, pair: str = "XAUUSD"):
+    """
+    Tick buffer + candle berjalan per timeframe live, di-update incremental per tick (O(1))
+    Semua state dimiliki event loop; compute stage hanya menerima candle yang sudah close
+    (dict baru saat rollover, tidak pernah diubah lagi)
+    """
+    
+    def __init__(self, pair: str = "XAUUSD", clock: Optional[Clock] = None, timeframes=LIVE_TIMEFRAMES):
         self.pair = pair
+        self.clock = clock or SYSTEM_CLOCK
         self.tick_buffer = []
-        self.ohlcv_cache: Dict[str, List[Dict]] = {}  # {timeframe: [candles]}
-        
-    def add_tick(self, bid: float, ask: float, timestamp: float):
-        """Tambahkan tick ke buffer"""
+        self.ohlcv_cache: Dict[str, List[Dict]] = {}  # {timeframe: [candles closed]}
+        self.timeframes = {self._get_timeframe_seconds(tf): tf for tf in timeframes}
+        self.forming: Dict[int, Dict] = {}  # {timeframe_seconds: candle berjalan}
+    
+    def add_tick(self, bid: float, ask: float, timestamp: float) -> List[Dict]:
+        """Tambahkan tick ke buffer dan update candle berjalan; return candle yang close oleh tick ini"""
         mid_price = (bid + ask) / 2
         self.tick_buffer.append({
             "timestamp": timestamp,
@@ -23,44 +35,55 @@ class OHLCVAggregator:
             "price": mid_price
         })
         
+        closed = []
+        for seconds, timeframe in self.timeframes.items():
+            start = timestamp - timestamp % seconds
+            candle = self.forming.get(seconds)
+            if candle is None or start > candle['timestamp']:
+                if candle is not None:
+                    closed.append(candle)
+                self.forming[seconds] = {'timeframe': timeframe, 'timestamp': start, 'open': mid_price,
+                                         'high': mid_price, 'low': mid_price, 'close': mid_price, 'volume': 1}
+            elif start == candle['timestamp']:
+                if mid_price > candle['high']:
+                    candle['high'] = mid_price
+                elif mid_price < candle['low']:
+                    candle['low'] = mid_price
+                candle['close'] = mid_price
+                candle['volume'] += 1
+            # Tick terlambat milik candle yang sudah close diabaikan
+        return closed
+    
+    def forming_candle(self, timeframe: str = "M1") -> Optional[Dict]:
+        """Candle berjalan timeframe live (object live, jangan dipakai di luar event loop)"""
+        return self.forming.get(self._get_timeframe_seconds(timeframe))
+    
     def aggregate_to_timeframe(self, timeframe: str = "M1") -> Optional[Dict]:
         """
-        Aggregate tick buffer menjadi OHLCV candlestick
-        timeframe: M1, M5, M15, H1
+        Copy candle OHLCV terakhir (berjalan)
+        timeframe: M1, M5, M15, H1 (non-live dibangun dari tick buffer)
         """
         if not self.tick_buffer:
             return None
         
-        # Convert timeframe ke seconds
-        timeframe_seconds = self._get_timeframe_seconds(timeframe)
-        
-        # Group ticks by timeframe
-        df = pd.DataFrame(self.tick_buffer)
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='s')
-        df.set_index('timestamp', inplace=True)
-        
-        # Resample to OHLCV
-        ohlcv = df['price'].resample(f'{timeframe_seconds}S').agg({
-            'open': 'first',
-            'high': 'max',
-            'low': 'min',
-            'close': 'last',
-            'volume': 'count'
-        })
-        
-        if ohlcv.empty or ohlcv.iloc[-1]['volume'] == 0:
-            return None
-        
-        last_candle = ohlcv.iloc[-1]
-        return {
-            "timeframe": timeframe,
-            "timestamp": ohlcv.index[-1].timestamp(),
-            "open": float(last_candle['open']),
-            "high": float(last_candle['high']),
-            "low": float(last_candle['low']),
-            "close": float(last_candle['close']),
-            "volume": int(last_candle['volume'])
-        }
+        candle = self.forming_candle(timeframe)
+        if candle is None:
+            candle = self._build_candle(self.tick_buffer, self._get_timeframe_seconds(timeframe))
+        return dict(candle, timeframe=timeframe)
+    
+    @staticmethod
+    def _build_candle(ticks: List[Dict], seconds: int) -> Dict:
+        """Candle terakhir dari buffer: scan mundur dari tick terbaru sampai awal candle"""
+        last = ticks[-1]['timestamp']
+        start = last - last % seconds
+        prices = []
+        for tick in reversed(ticks):
+            if tick['timestamp'] < start:
+                break
+            prices.append(tick['price'])
+        prices.reverse()
+        return {'timestamp': start, 'open': prices[0], 'high': max(prices), 'low': min(prices),
+                'close': prices[-1], 'volume': len(prices)}
     
     def get_recent_candles(self, timeframe: str = "M1", count: int = 20) -> List[Dict]:
         """Ambil recent candles dari cache"""
@@ -79,21 +102,25 @@ class OHLCVAggregator:
             self.ohlcv_cache[timeframe][-1] = candle
         else:
             self.ohlcv_cache[timeframe].append(candle)
-            
+        
         # Keep only last 100 candles per timeframe untuk memory efficiency
         if len(self.ohlcv_cache[timeframe]) > 100:
             self.ohlcv_cache[timeframe] = self.ohlcv_cache[timeframe][-100:]
     
     def clear_old_ticks(self, keep_seconds: int = 300):
         """Clear old ticks dari buffer"""
-        current_time = datetime.now().timestamp()
+        current_time = self.clock.time()
         self.tick_buffer = [t for t in self.tick_buffer if current_time - t["timestamp"] < keep_seconds]
     
     @staticmethod
     def _get_timeframe_seconds(timeframe: str) -> int:
-        """Convert timeframe string ke seconds"""
-        multiplier = int(timeframe[:-1]) if timeframe[:-1].isdigit() else 1
-        unit = timeframe[-1]
+        """Convert timeframe string ke seconds (M5, H1, D1; format lama 5M juga diterima)"""
+        timeframe = timeframe.upper()
+        if timeframe[:1].isalpha():
+            unit, count = timeframe[0], timeframe[1:]
+        else:
+            unit, count = timeframe[-1], timeframe[:-1]
+        multiplier = int(count) if count.isdigit() else 1
         
         if unit == 'M':
             return multiplier * 60
@@ -1,16 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+import hmac
+import json
 import logging
 import os
-from datetime import datetime
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, ContextTypes
-from typing import Dict, List, Optional
+import secrets
+import time
+from datetime import timezone
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from app.aggregator import LIVE_TIMEFRAMES
+from app.charts import ChartRenderer
+from app.clock import SYSTEM_CLOCK, Clock
+from app.delivery import PRIORITY_BROADCAST, DeliveryPipeline, TokenBucket
+from app.filters import WIB, SubscriberFilter
+from app.status import StatusCache
+from app.subscribers import SubscriberRegistry
+from app.ticker import LiveTicker
+from app.symbols import price_digits
+from app.tracing import Span
+from app.profiler import SamplingProfiler
+from app.memory import MemoryMonitor
+
+# python-telegram-bot (+ httpx) di-import saat application dibuat, bukan saat startup:
+# feed dan pipeline sudah jalan sebelum Telegram dibutuhkan
+if TYPE_CHECKING:
+    from telegram import Update
+    from telegram.ext import Application, ContextTypes
 
 logger = logging.getLogger(__name__)
 
+# Balasan statis untuk request yang di-shed (tanpa query/format apa pun)
+RATE_LIMITED_REPLY = "⏳ Terlalu banyak command, coba lagi beberapa detik lagi"
+BUSY_REPLY = "⏳ Bot sedang sibuk, coba lagi sebentar"
+SHED_NOTIFY_INTERVAL = 10
+# Jumlah user dengan state rate limit (bucket / catatan shed) sebelum entry idle dibuang
+USER_STATE_MAX = 10000
+# /chart: M1/M5 dari candle live, sisanya hanya dari history database
+CHART_TIMEFRAMES = ("M1", "M5", "M15", "M30", "H1", "H4", "D1")
+
 
 class TelegramBot:
     def __init__(self, token: str, authorized_users: List[int], admin_users: List[int],
-                 ws_manager, risk_manager, strategy, database):
+                 ws_manager, risk_manager, strategy, database, pipelines: Optional[Dict] = None,
+                 clock: Optional[Clock] = None):
         self.token = token
         self.authorized_users = authorized_users
         self.admin_users = admin_users
@@ -18,11 +52,70 @@ class TelegramBot:
         self.risk_manager = risk_manager
         self.strategy = strategy
         self.database = database
-        self.subscribers = set()
+        self.pipelines = pipelines or {}
+        self.clock = clock or SYSTEM_CLOCK
+        self.subscribers = SubscriberRegistry(database)
+        self.memory = MemoryMonitor()
+        self.status = StatusCache(ws_manager, risk_manager, self.subscribers, self.pipelines, memory=self.memory)
+        self.application: Optional[Application] = None
+        self.webhook_secret: Optional[str] = None
+        self.delivery = DeliveryPipeline(self._send_message)
+        self.last_delivery: Optional[Dict] = None
+        self.broadcast_batch_size = int(os.getenv('BROADCAST_BATCH_SIZE', 50))
+        self.broadcast_progress_interval = float(os.getenv('BROADCAST_PROGRESS_INTERVAL', 2))
+        self.broadcast_tasks = set()
+        
+        # Rate limit command per user + budget global untuk command berat (query database)
+        self.command_rate = float(os.getenv('COMMAND_RATE_PER_USER', 1))
+        self.command_burst = float(os.getenv('COMMAND_BURST_PER_USER', 5))
+        self.user_buckets: Dict[int, TokenBucket] = {}
+        self.shed_notified: Dict[int, float] = {}
+        self.expensive_slots = asyncio.Semaphore(int(os.getenv('EXPENSIVE_COMMAND_CONCURRENCY', 2)))
+        self.riwayat_max_limit = int(os.getenv('RIWAYAT_MAX_LIMIT', 20))
+        self.performa_max_hours = int(os.getenv('PERFORMA_MAX_HOURS', 720))
+        self.shed_count = 0
+        
+        # Chart (matplotlib opsional) di-render di process pool, cache di CHART_CACHE_DIR
+        self.charts = ChartRenderer()
+        self.chart_max_candles = int(os.getenv('CHART_MAX_CANDLES', 2000))
+        self.chart_on_signal = os.getenv('CHART_ON_SIGNAL', 'false').lower() == 'true'
+        self.photo_file_ids: Dict[str, str] = {}
+        self._photo_upload_lock = asyncio.Lock()
+        
+        # Live ticker (edit in-place, cadence per chat)
+        self.ticker = LiveTicker(ws_manager, self.pipelines, self.delivery, self._edit_message)
+        
+        # Sampling profiler on-demand (/profile), tidak ada biaya saat tidak dipakai
+        self.profiler = SamplingProfiler()
         
+        # Struktur in-memory yang bisa tumbuh selama proses hidup (dilaporkan di /health)
+        for symbol, pipeline in self.pipelines.items():
+            self.memory.track(f"tick_buffer[{symbol}]", lambda p=pipeline: p.aggregator.tick_buffer)
+            self.memory.track(f"ohlcv_cache[{symbol}]", lambda p=pipeline: p.aggregator.ohlcv_cache)
+        self.memory.track("risk.trades_list", lambda: self.risk_manager.trades_list)
+        self.memory.track("risk.daily_loss_list", lambda: self.risk_manager.daily_loss_list)
+        self.memory.track("subscribers.filters", lambda: self.subscribers.filters)
+        self.memory.track("delivery.chat_buckets", lambda: self.delivery.chat_buckets)
+        self.memory.track("ticker.chats", lambda: self.ticker.chats)
+        self.memory.track("user_buckets", lambda: self.user_buckets)
+        self.memory.track("photo_file_ids", lambda: self.photo_file_ids)
+    
     def create_application(self) -> Application:
         """Create Telegram bot application"""
-        app = Application.builder().token(self.token).build()
+        from telegram.ext import Application, CommandHandler, MessageHandler, filters
+        
+        builder = Application.builder().token(self.token)
+        # Bot API alternatif (mis. fake Telegram untuk benchmark)
+        base_url = os.getenv('TELEGRAM_BASE_URL')
+        if base_url:
+            builder = builder.base_url(base_url)
+        # Jumlah update yang diproses concurrent (1 = berurutan seperti default PTB)
+        builder = builder.concurrent_updates(int(os.getenv('TELEGRAM_CONCURRENT_UPDATES', 32)))
+        app = builder.build()
+        
+        # Rate limit gate (group -1) jalan sebelum semua CommandHandler; hanya pesan command yang
+        # memakai budget, callback query / pesan biasa tidak ikut terhitung
+        app.add_handler(MessageHandler(filters.COMMAND, self.rate_limit_gate), group=-1)
         
         # Add handlers
         app.add_handler(CommandHandler("start", self.cmd_start))
@@ -30,17 +123,128 @@ class TelegramBot:
         app.add_handler(CommandHandler("status", self.cmd_status))
         app.add_handler(CommandHandler("monitor", self.cmd_monitor))
         app.add_handler(CommandHandler("stopmonitor", self.cmd_stopmonitor))
+        app.add_handler(CommandHandler("filter", self.cmd_filter))
         app.add_handler(CommandHandler("riwayat", self.cmd_riwayat))
         app.add_handler(CommandHandler("performa", self.cmd_performa))
+        app.add_handler(CommandHandler("chart", self.cmd_chart))
+        app.add_handler(CommandHandler("ticker", self.cmd_ticker))
         app.add_handler(CommandHandler("settings", self.cmd_settings))
         app.add_handler(CommandHandler("pausebot", self.cmd_pausebot))
         app.add_handler(CommandHandler("resumebot", self.cmd_resumebot))
         app.add_handler(CommandHandler("health", self.cmd_health))
+        app.add_handler(CommandHandler("trace", self.cmd_trace))
+        app.add_handler(CommandHandler("profile", self.cmd_profile))
+        app.add_handler(CommandHandler("memtrace", self.cmd_memtrace))
         app.add_handler(CommandHandler("broadcast", self.cmd_broadcast))
         
+        self.application = app
         logger.info("Telegram bot application created")
         return app
     
+    async def start_webhook(self, http_server, webhook_url: str, path: str = "/telegram",
+                            secret: Optional[str] = None):
+        """
+        Daftarkan route webhook di http_server lalu set webhook di Telegram
+        Tanpa secret siapa pun bisa POST update palsu (mis. dari ID admin), jadi dibuat token acak per proses
+        """
+        from telegram import Update
+        
+        if not secret:
+            secret = secrets.token_urlsafe(32)
+            logger.warning("WEBHOOK_SECRET kosong: memakai secret acak untuk proses ini")
+        self.webhook_secret = secret
+        http_server.route("POST", path, self.handle_webhook)
+        await self.application.bot.set_webhook(
+            url=webhook_url.rstrip('/') + path,
+            secret_token=secret,
+            allowed_updates=Update.ALL_TYPES,
+        )
+        logger.info(f"Telegram webhook set: {webhook_url.rstrip('/')}{path}")
+    
+    async def handle_webhook(self, request):
+        """Terima update dari Telegram: validasi secret, masukkan ke update queue, langsung ack"""
+        token = request.headers.get('x-telegram-bot-api-secret-token', '')
+        if not self.webhook_secret or not hmac.compare_digest(token.encode(), self.webhook_secret.encode()):
+            return 403, "text/plain", b"forbidden"
+        from telegram import Update
+        
+        try:
+            update = Update.de_json(json.loads(request.body), self.application.bot)
+        except ValueError:
+            return 400, "text/plain", b"invalid json"
+        if update is not None:
+            await self.application.update_queue.put(update)
+        return 200, "text/plain", b"ok"
+    
+    async def _send_message(self, chat_id: int, text: str, photo: Optional[str] = None, **kwargs):
+        """Kirim pesan lewat bot application (photo = path PNG lokal, text jadi caption)"""
+        bot = self.application.bot
+        if photo is None:
+            return await bot.send_message(chat_id=chat_id, text=text, **kwargs)
+        
+        # File di-upload sekali, penerima berikutnya memakai file_id dari Telegram
+        file_id = self.photo_file_ids.get(photo)
+        if file_id is None:
+            async with self._photo_upload_lock:
+                file_id = self.photo_file_ids.get(photo)
+                if file_id is None:
+                    with open(photo, 'rb') as f:
+                        message = await bot.send_photo(chat_id=chat_id, photo=f, caption=text, **kwargs)
+                    if message.photo:
+                        if len(self.photo_file_ids) >= 100:
+                            self.photo_file_ids.clear()
+                        self.photo_file_ids[photo] = message.photo[-1].file_id
+                    return message
+        return await bot.send_photo(chat_id=chat_id, photo=file_id, caption=text, **kwargs)
+    
+    def _prune_user_state(self):
+        """Buang bucket yang sudah penuh lagi (user idle) dan catatan shed yang sudah lewat interval notifikasi"""
+        idle_after = self.command_burst / self.command_rate
+        now = time.monotonic()
+        self.user_buckets = {uid: b for uid, b in self.user_buckets.items() if now - b.updated < idle_after}
+        self.shed_notified = {uid: t for uid, t in self.shed_notified.items() if now - t < SHED_NOTIFY_INTERVAL}
+    
+    def _user_bucket(self, user_id: int) -> TokenBucket:
+        bucket = self.user_buckets.get(user_id)
+        if bucket is None:
+            if len(self.user_buckets) >= USER_STATE_MAX:
+                self._prune_user_state()
+            bucket = self.user_buckets[user_id] = TokenBucket(self.command_rate, self.command_burst)
+        return bucket
+    
+    async def _shed(self, update: Update, reply: str):
+        """Tolak request dengan balasan statis, maksimal satu balasan per user per SHED_NOTIFY_INTERVAL detik"""
+        self.shed_count += 1
+        user_id = update.effective_user.id
+        now = time.monotonic()
+        if now - self.shed_notified.get(user_id, 0.0) >= SHED_NOTIFY_INTERVAL:
+            if user_id not in self.shed_notified and len(self.shed_notified) >= USER_STATE_MAX:
+                self._prune_user_state()
+            self.shed_notified[user_id] = now
+            await update.effective_message.reply_text(reply)
+    
+    async def rate_limit_gate(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Token bucket per user untuk pesan command; request berlebih berhenti di sini"""
+        if update.effective_user is None or update.effective_message is None:
+            return
+        if self._user_bucket(update.effective_user.id).try_acquire() > 0:
+            await self._shed(update, RATE_LIMITED_REPLY)
+            from telegram.ext import ApplicationHandlerStop
+            raise ApplicationHandlerStop
+    
+    async def _run_expensive(self, update: Update, func, *args):
+        """Jalankan query berat di thread dengan budget concurrency global; None jika di-shed"""
+        if self.expensive_slots.locked():
+            await self._shed(update, BUSY_REPLY)
+            return None
+        async with self.expensive_slots:
+            return await asyncio.to_thread(func, *args)
+    
+    async def _edit_message(self, chat_id: int, text: str, message_id: int, **kwargs):
+        """Edit pesan yang sudah terkirim"""
+        return await self.application.bot.edit_message_text(text=text, chat_id=chat_id, message_id=message_id,
+                                                             **kwargs)
+    
     async def check_authorization(self, user_id: int) -> bool:
         """Check if user is authorized"""
         return user_id in self.authorized_users
@@ -87,7 +291,10 @@ Ketik /help untuk melihat semua command
 /status - Lihat status bot & trade count
 /monitor XAUUSD - Subscribe sinyal
 /stopmonitor - Unsubscribe
+/filter - Atur filter sinyal (direction, confidence, symbols, quiet)
 /riwayat [n] - Lihat n trade terakhir
+/chart [tf] [n] - Chart candle + EMA (live M1/M5; M15-D1 dari history import)
+/ticker on|off - Harga live (pesan di-update otomatis)
 /help - Bantuan
 
 **ADMIN COMMAND:**
@@ -96,6 +303,9 @@ Ketik /help untuk melihat semua command
 /pausebot - Pause bot
 /resumebot - Resume bot
 /health - Detail kesehatan bot
+/trace [signal_id] - Timeline tick -> signal terkirim
+/profile [detik] - Sampling profiler CPU (default 10s)
+/memtrace start|diff|reset|stop - tracemalloc diff per lokasi alokasi
 /broadcast - Broadcast pesan
 """
         if not is_admin:
@@ -110,31 +320,8 @@ Ketik /help untuk melihat semua command
             await update.message.reply_text("❌ Tidak terotorisasi")
             return
         
-        ws_status = self.ws_manager.get_status()
-        risk_status = self.risk_manager.get_status()
-        
-        msg = f"""
-🟢 **STATUS BOT**
-
-📊 Mode: **{'EVALUATION UNLIMITED' if risk_status['evaluation_mode'] else 'PRODUCTION'}**
-🤖 Bot Status: **{'PAUSED' if risk_status['is_paused'] else 'RUNNING'}**
-
-**WebSocket:**
-Status: **{'🟢 Connected' if ws_status['connected'] else '🔴 Disconnected'}**
-Delay: {ws_status['delay_seconds']:.2f}s
-Tick Rate: {ws_status['tick_rate_tps']:.2f} tps
-Spread: {ws_status['spread_pips']:.2f} pips
-Price: BID {ws_status['current_bid']:.2f} / ASK {ws_status['current_ask']:.2f}
-
-**Trading:**
-Trades Today: {risk_status['trades_today']}
-Max/Day: {risk_status['max_trades_per_day']}
-Daily Loss: {risk_status['daily_loss_percent']:.2f}%
-Balance: ${risk_status['virtual_balance']:,}
-
-📈 Subscribers: {len(self.subscribers)}
-"""
-        await update.message.reply_text(msg, parse_mode="Markdown")
+        # Pesan sudah di-render oleh status cache (refresh maks. 1x/detik)
+        await update.message.reply_text(self.status.get().status_message, parse_mode="Markdown")
     
     async def cmd_monitor(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /monitor command"""
@@ -154,6 +341,60 @@ Balance: ${risk_status['virtual_balance']:,}
         await update.message.reply_text("✅ Anda unsubscribe sinyal")
         logger.info(f"User {user_id} unsubscribed")
     
+    async def cmd_filter(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /filter command"""
+        user_id = update.effective_user.id
+        if not await self.check_authorization(user_id):
+            await update.message.reply_text("❌ Tidak terotorisasi")
+            return
+        
+        current = self.subscribers.get_filter(user_id)
+        args = [a.lower() for a in context.args]
+        usage = (
+            "Format:\n"
+            "/filter direction buy|sell|all\n"
+            "/filter confidence <0-100>\n"
+            "/filter symbols XAUUSD,XAGUSD|all\n"
+            "/filter quiet <start>-<end>|off (jam WIB)\n"
+            "/filter reset"
+        )
+        
+        if not args:
+            await update.message.reply_text(f"🔎 Filter sinyal Anda:\n{current.describe()}\n\n{usage}")
+            return
+        
+        directions, min_confidence, symbols = current.directions, current.min_confidence, current.symbols
+        quiet_start, quiet_end = current.quiet_start, current.quiet_end
+        try:
+            key, value = args[0], (args[1] if len(args) > 1 else "")
+            if key == "reset":
+                directions, min_confidence, symbols, quiet_start, quiet_end = None, 0, None, None, None
+            elif key == "direction" and value in ("buy", "sell", "all"):
+                directions = None if value == "all" else frozenset([value.upper()])
+            elif key == "confidence" and value:
+                min_confidence = float(value)
+                if not 0 <= min_confidence <= 100:
+                    raise ValueError(value)
+            elif key == "symbols" and value:
+                symbols = None if value == "all" else frozenset(
+                    s.strip().upper() for s in value.split(",") if s.strip())
+            elif key == "quiet" and value:
+                if value == "off":
+                    quiet_start = quiet_end = None
+                else:
+                    start, end = value.split("-")
+                    quiet_start, quiet_end = int(start) % 24, int(end) % 24
+            else:
+                raise ValueError(key)
+        except ValueError:
+            await update.message.reply_text(usage)
+            return
+        
+        new_filter = SubscriberFilter(directions, min_confidence, symbols, quiet_start, quiet_end)
+        self.subscribers.set_filter(user_id, new_filter)
+        await update.message.reply_text(f"✅ Filter disimpan:\n{new_filter.describe()}")
+        logger.info(f"User {user_id} filter: {new_filter.to_json()}")
+    
     async def cmd_riwayat(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /riwayat command"""
         user_id = update.effective_user.id
@@ -163,9 +404,11 @@ Balance: ${risk_status['virtual_balance']:,}
         
         limit = 10
         if context.args and context.args[0].isdigit():
-            limit = int(context.args[0])
+            limit = max(1, min(int(context.args[0]), self.riwayat_max_limit))
         
-        trades = self.database.get_trades(limit)
+        trades = await self._run_expensive(update, self.database.get_trades, limit)
+        if trades is None:
+            return
         if not trades:
             await update.message.reply_text("📭 Belum ada trade")
             return
@@ -188,9 +431,11 @@ Balance: ${risk_status['virtual_balance']:,}
         
         hours = 24
         if context.args and context.args[0].isdigit():
-            hours = int(context.args[0])
+            hours = max(1, min(int(context.args[0]), self.performa_max_hours))
         
-        perf = self.database.get_performance(hours)
+        perf = await self._run_expensive(update, self.database.get_performance, hours)
+        if perf is None:
+            return
         
         msg = f"""
 📈 **PERFORMA ({hours}H)**
@@ -207,6 +452,87 @@ Mode: **EVALUATION UNLIMITED**
 """
         await update.message.reply_text(msg, parse_mode="Markdown")
     
+    async def _chart_candles(self, symbol: str, timeframe: str, n: int) -> List[Dict]:
+        """Candle closed dari aggregator, ditambah history database untuk symbol utama"""
+        pipeline = self.pipelines.get(symbol)
+        live = pipeline.closed_candles(timeframe, n) if pipeline else []
+        if len(live) >= n or symbol != next(iter(self.pipelines), symbol):
+            return live
+        
+        history = await asyncio.to_thread(self.database.get_recent_ohlcv, timeframe, n)
+        if live:
+            history = [c for c in history if c['timestamp'] < live[0]['timestamp']]
+        return (history + live)[-n:]
+    
+    async def cmd_chart(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /chart [timeframe] [n] command"""
+        user_id = update.effective_user.id
+        if not await self.check_authorization(user_id):
+            await update.message.reply_text("❌ Tidak terotorisasi")
+            return
+        if not self.charts.available():
+            await update.message.reply_text("📉 Chart tidak tersedia (matplotlib belum terpasang)")
+            return
+        
+        timeframe, n = "M5", 60
+        for arg in context.args:
+            if arg.isdigit():
+                n = max(10, min(int(arg), self.chart_max_candles))
+            elif arg.upper() in CHART_TIMEFRAMES:
+                timeframe = arg.upper()
+            else:
+                await update.message.reply_text(
+                    f"❌ Timeframe tidak dikenal: {arg}\nPilihan: {', '.join(CHART_TIMEFRAMES)}"
+                )
+                return
+        symbol = next(iter(self.pipelines), "XAUUSD")
+        
+        if self.expensive_slots.locked():
+            await self._shed(update, BUSY_REPLY)
+            return
+        async with self.expensive_slots:
+            candles = await self._chart_candles(symbol, timeframe, n)
+            path = await self.charts.render(symbol, timeframe, candles, n)
+        
+        if path is None:
+            if timeframe in LIVE_TIMEFRAMES:
+                await update.message.reply_text(f"📭 Belum ada candle {timeframe} yang close untuk chart")
+            else:
+                # Timeframe di atas M5 tidak dibentuk dari feed live, hanya dari history yang di-import
+                await update.message.reply_text(
+                    f"📭 Tidak ada history {timeframe} di database\n"
+                    f"Candle live hanya {'/'.join(LIVE_TIMEFRAMES)}; import {timeframe} dengan "
+                    f"python -m app.history import-candles <csv> --timeframe {timeframe}"
+                )
+            return
+        with open(path, 'rb') as f:
+            await update.message.reply_photo(f, caption=f"{symbol} {timeframe} ({min(n, len(candles))} candles)")
+    
+    async def cmd_ticker(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /ticker on|off [symbol] command"""
+        user_id = update.effective_user.id
+        if not await self.check_authorization(user_id):
+            await update.message.reply_text("❌ Tidak terotorisasi")
+            return
+        
+        chat_id = update.effective_chat.id
+        action = context.args[0].lower() if context.args else "on"
+        if action == "off":
+            state = self.ticker.stop_chat(chat_id)
+            await update.message.reply_text("⏹️ Ticker dimatikan" if state else "ℹ️ Ticker tidak aktif")
+            return
+        
+        symbol = context.args[1].upper() if len(context.args) > 1 else next(iter(self.pipelines), "XAUUSD")
+        if symbol not in self.pipelines:
+            await update.message.reply_text(f"❌ Symbol tidak tersedia: {symbol}")
+            return
+        
+        message = await update.message.reply_text(self.ticker.render(symbol))
+        if not self.ticker.start_chat(chat_id, message.message_id, symbol):
+            await message.edit_text("⏳ Kapasitas ticker penuh, coba lagi nanti")
+            return
+        logger.info(f"Ticker started for {chat_id} ({symbol})")
+    
     async def cmd_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /settings command"""
         user_id = update.effective_user.id
@@ -214,6 +540,8 @@ Mode: **EVALUATION UNLIMITED**
             await update.message.reply_text("❌ Hanya admin")
             return
         
+        from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+        
         msg = "⚙️ **SETTINGS** - Pilih parameter untuk ubah"
         keyboard = [
             [InlineKeyboardButton("🎯 Confidence Min", callback_data="set_confidence")],
@@ -231,6 +559,7 @@ Mode: **EVALUATION UNLIMITED**
             return
         
         self.risk_manager.pause_bot()
+        self.status.refresh()
         await update.message.reply_text("⏸️ Bot paused")
     
     async def cmd_resumebot(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -241,6 +570,7 @@ Mode: **EVALUATION UNLIMITED**
             return
         
         self.risk_manager.resume_bot()
+        self.status.refresh()
         await update.message.reply_text("▶️ Bot resumed")
     
     async def cmd_health(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -250,30 +580,74 @@ Mode: **EVALUATION UNLIMITED**
             await update.message.reply_text("❌ Hanya admin")
             return
         
-        ws_status = self.ws_manager.get_status()
-        risk_status = self.risk_manager.get_status()
+        await update.message.reply_text(self.status.get().health_message, parse_mode="Markdown")
+    
+    async def cmd_profile(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /profile [seconds] command: sampling semua thread, balas top-N + file collapsed stack"""
+        user_id = update.effective_user.id
+        if not await self.check_admin(user_id):
+            await update.message.reply_text("❌ Hanya admin")
+            return
         
-        msg = f"""
-🏥 **BOT HEALTH CHECK**
-
-**WebSocket:**
-Status: **{'🟢 OK' if ws_status['connected'] else '🔴 ERROR'}**
-Delay: {ws_status['delay_seconds']:.3f}s
-Tick Rate: {ws_status['tick_rate_tps']:.2f} tps
-Reconnects: {ws_status['reconnect_count']}
-Ticks Today: {ws_status['tick_count']}
-
-**Trading Engine:**
-Mode: {'EVAL' if risk_status['evaluation_mode'] else 'PROD'}
-Trades: {risk_status['trades_today']}
-Loss: {risk_status['daily_loss_percent']:.2f}%
-Paused: {'YES' if risk_status['is_paused'] else 'NO'}
-
-**Memory:**
-Uptime: Running
-Database: OK
-"""
-        await update.message.reply_text(msg, parse_mode="Markdown")
+        try:
+            seconds = float(context.args[0]) if context.args else 10.0
+        except ValueError:
+            await update.message.reply_text("Format: /profile [detik]")
+            return
+        seconds = max(1.0, min(seconds, self.profiler.max_seconds))
+        if self.profiler.running:
+            await update.message.reply_text("⏳ Profiler sedang berjalan, coba lagi nanti")
+            return
+        
+        await update.message.reply_text(f"🔬 Profiling {seconds:.0f}s...")
+        # Sampler jalan di worker thread (thread itu sendiri tidak ikut di-sample)
+        try:
+            result = await asyncio.to_thread(self.profiler.profile, seconds)
+        except ValueError as e:
+            await update.message.reply_text(f"⏳ {e}")
+            return
+        path = await asyncio.to_thread(result.write_collapsed, self.profiler.output_path())
+        logger.info(f"Profile saved: {path} ({result.samples} samples)")
+        
+        await update.message.reply_text(f"```\n{result.summary(12)[:3900]}\n```", parse_mode="Markdown")
+        with open(path, 'rb') as f:
+            await update.message.reply_document(f, filename=os.path.basename(path),
+                                                caption="Collapsed stacks (flamegraph.pl / speedscope)")
+    
+    async def cmd_memtrace(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /memtrace start|diff|reset|stop: pertumbuhan alokasi sejak baseline tracemalloc"""
+        user_id = update.effective_user.id
+        if not await self.check_admin(user_id):
+            await update.message.reply_text("❌ Hanya admin")
+            return
+        
+        action = context.args[0].lower() if context.args else 'diff'
+        actions = {
+            'start': self.memory.trace_start,
+            'diff': self.memory.trace_diff,
+            'reset': lambda: self.memory.trace_diff(reset=True),
+            'stop': self.memory.trace_stop,
+        }
+        if action not in actions:
+            await update.message.reply_text("Format: /memtrace start|diff|reset|stop")
+            return
+        # Snapshot tracemalloc bisa ratusan ms, jangan di event loop
+        result = await asyncio.to_thread(actions[action])
+        await update.message.reply_text(f"```\n{result[:3900]}\n```", parse_mode="Markdown")
+    
+    async def cmd_trace(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /trace [signal_id] command (default: signal terakhir)"""
+        user_id = update.effective_user.id
+        if not await self.check_admin(user_id):
+            await update.message.reply_text("❌ Hanya admin")
+            return
+        
+        signal_id = context.args[0] if context.args else None
+        row = await asyncio.to_thread(self.database.get_trade_trace, signal_id)
+        if row is None:
+            await update.message.reply_text("Trace tidak ditemukan (signal belum ada atau tidak di-sample)")
+            return
+        await update.message.reply_text(f"```\n{Span.describe(row[1])}\n```", parse_mode="Markdown")
     
     async def cmd_broadcast(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /broadcast command"""
@@ -286,24 +660,87 @@ Database: OK
             await update.message.reply_text("Format: /broadcast <message>")
             return
         
-        message = " ".join(context.args)
-        # TODO: Send to all subscribers
-        await update.message.reply_text(f"✅ Broadcast sent to {len(self.subscribers)} users")
+        # Ambil teks asli setelah command supaya newline tidak hilang
+        message = update.message.text.split(maxsplit=1)[1]
+        recipients = list(self.subscribers)
+        if not recipients:
+            await update.message.reply_text("ℹ️ Belum ada subscriber")
+            return
+        
+        job_id = f"bc_{int(time.time() * 1000)}"
+        progress = await update.message.reply_text(
+            f"📣 Broadcast {job_id} queued: 0 sent, 0 failed, {len(recipients)} remaining"
+        )
+        
+        # Jalan di background, handler langsung selesai
+        task = asyncio.create_task(self.run_broadcast(job_id, message, recipients, progress))
+        self.broadcast_tasks.add(task)
+        task.add_done_callback(self.broadcast_tasks.discard)
+    
+    async def run_broadcast(self, job_id: str, message: str, recipients: List[int], progress=None) -> Dict:
+        """
+        Kirim broadcast per batch lewat delivery pipeline (prioritas di bawah signal)
+        Progress message diedit in-place, hasil ditulis ke database sekali di akhir
+        """
+        total = len(recipients)
+        sent = failed = 0
+        results = []
+        last_edit = time.monotonic()
+        started = time.perf_counter()
+        
+        for i in range(0, total, self.broadcast_batch_size):
+            batch = recipients[i:i + self.broadcast_batch_size]
+            report = await self.delivery.deliver(batch, message, priority=PRIORITY_BROADCAST)
+            sent += report.sent
+            failed += report.failed
+            for chat_id in batch:
+                error = report.failures.get(chat_id)
+                results.append((chat_id, 'FAILED' if error else 'SENT', error))
+            
+            remaining = total - sent - failed
+            if progress is not None and remaining and \
+                    time.monotonic() - last_edit >= self.broadcast_progress_interval:
+                last_edit = time.monotonic()
+                await self._edit_progress(progress, f"📣 Broadcast {job_id}: {sent} sent, {failed} failed, "
+                                                    f"{remaining} remaining")
+        
+        elapsed = time.perf_counter() - started
+        if progress is not None:
+            await self._edit_progress(progress, f"✅ Broadcast {job_id} selesai: {sent} sent, {failed} failed, "
+                                                f"0 remaining ({elapsed:.1f}s)")
+        
+        try:
+            await asyncio.to_thread(self.database.add_delivery_results, job_id, results)
+        except Exception as e:
+            logger.error(f"Failed to save delivery log {job_id}: {e}")
+        
+        logger.info(f"📣 Broadcast {job_id} delivered {sent}/{total} ({failed} failed) in {elapsed:.1f}s")
+        return {"job_id": job_id, "total": total, "sent": sent, "failed": failed}
+    
+    async def _edit_progress(self, progress, text: str):
+        """Edit progress message admin, error edit diabaikan"""
+        try:
+            await progress.edit_text(text)
+        except Exception as e:
+            logger.debug(f"Progress edit failed: {e}")
     
     async def send_signal(self, signal_type: str, entry: float, sl: float, tp: float,
-                         confidence: float, spread: float, delay: float, pips_risk: float):
-        """Send signal to all subscribers"""
-        pips_profit = abs(tp - entry) * 100
+                         confidence: float, spread: float, delay: float, pips_risk: float,
+                         symbol: str = "XAUUSD", pip_size: float = 0.01, span=None):
+        """Send signal to all subscribers (span: trace evaluasi, diberi hop deliver)"""
+        pips_profit = abs(tp - entry) / pip_size
+        digits = price_digits(pip_size)
         estimated_pl = pips_profit * 10 * 0.01  # For 0.01 lot
+        now = self.clock.now(timezone.utc)
         
         msg = f"""
-🚀 **XAUUSD SCALPING SIGNAL**
+🚀 **{symbol} SCALPING SIGNAL**
 
 📈 Type: **{signal_type}**
 ⏰ Timeframe: **M1/M5**
-💰 Entry: {entry:.2f} {'(ASK)' if signal_type == 'BUY' else '(BID)'}
-🎯 TP: {tp:.2f}
-🛑 SL: {sl:.2f}
+💰 Entry: {entry:.{digits}f} {'(ASK)' if signal_type == 'BUY' else '(BID)'}
+🎯 TP: {tp:.{digits}f}
+🛑 SL: {sl:.{digits}f}
 📊 Confidence: **{confidence:.0f}%**
 📏 Spread: {spread:.2f} pips
 ⏱️ Delay: {delay:.2f}s ✅
@@ -312,12 +749,38 @@ Database: OK
 📈 Risk: {pips_risk:.1f}p | Profit: {pips_profit:.1f}p
 💰 Est. P/L: ${estimated_pl:.2f} (0.01 lot)
 
-⏰ Signal Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC / %H:%M WIB')}
+⏰ Signal Time: {now:%Y-%m-%d %H:%M:%S} UTC / {now.astimezone(WIB):%H:%M} WIB
 """
         
-        for user_id in self.subscribers:
-            try:
-                # TODO: Send via context.bot.send_message
-                pass
-            except Exception as e:
-                logger.error(f"Failed to send signal to {user_id}: {e}")
+        # Resolve recipient lewat index filter (direction x confidence band x symbol)
+        recipients = list(self.subscribers.recipients(signal_type, confidence, symbol, now.astimezone(WIB).hour))
+        if not recipients:
+            return None
+        if self.application is None:
+            logger.warning("Telegram application not created, signal not delivered")
+            return None
+        
+        # Chart opsional sebagai foto (pesan signal jadi caption)
+        extra = {}
+        if self.chart_on_signal and symbol in self.pipelines:
+            path = await self.charts.render(symbol, "M1", self.pipelines[symbol].closed_candles("M1", 60), 60)
+            if path:
+                extra['photo'] = path
+        
+        # Pesan di-render sekali, dikirim concurrent dengan rate limit
+        if span is not None:
+            span.mark('deliver_start')
+        report = await self.delivery.deliver(recipients, msg, parse_mode="Markdown", **extra)
+        summary = report.summary()
+        self.last_delivery = summary
+        if span is not None:
+            span.mark('delivered')
+            span.attrs.update(sent=summary['sent'], total=summary['total'],
+                              first_ms=round(summary['first_ms'], 1), last_ms=round(summary['last_ms'], 1))
+        
+        for user_id, error in report.failures.items():
+            logger.error(f"Failed to send signal to {user_id}: {error}")
+        logger.info(f"📤 Signal delivered {summary['sent']}/{summary['total']} "
+                    f"(first {summary['first_ms']:.0f}ms, median {summary['median_ms']:.0f}ms, "
+                    f"last {summary['last_ms']:.0f}ms)")
+        return summary
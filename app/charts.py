@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def ema(values: Sequence[float], period: int) -> List[float]:
+    """EMA sederhana (seed = nilai pertama)"""
+    if not values:
+        return []
+    k = 2 / (period + 1)
+    out = [values[0]]
+    for v in values[1:]:
+        out.append(v * k + out[-1] * (1 - k))
+    return out
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets: pilih threshold index yang mempertahankan bentuk kurva
+    Return index terurut (titik pertama dan terakhir selalu ikut)
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    
+    every = (n - 2) / (threshold - 2)
+    indices = [0]
+    a = 0
+    for i in range(threshold - 2):
+        # Rata-rata bucket berikutnya sebagai titik ketiga segitiga
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        count = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / count
+        avg_y = sum(ys[next_start:next_end]) / count
+        
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        indices.append(best)
+        a = best
+    indices.append(n - 1)
+    return indices
+
+
+def render_chart(path: str, title: str, timestamps: List[float], opens: List[float], highs: List[float],
+                 lows: List[float], closes: List[float], ema_periods: Sequence[int] = (5, 10, 20),
+                 max_candles: int = 120, max_points: int = 400) -> str:
+    """
+    Render PNG (dijalankan di worker process)
+    <= max_candles: candlestick; lebih dari itu: close + EMA di-downsample dengan LTTB
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from datetime import datetime, timezone
+    
+    xs = list(range(len(closes)))
+    emas = {p: ema(closes, p) for p in ema_periods}
+    
+    fig, ax = plt.subplots(figsize=(9, 4.5), dpi=100)
+    if len(closes) <= max_candles:
+        colors = ['#26a69a' if c >= o else '#ef5350' for o, c in zip(opens, closes)]
+        ax.vlines(xs, lows, highs, colors=colors, linewidth=0.8)
+        bottoms = [min(o, c) for o, c in zip(opens, closes)]
+        heights = [max(abs(c - o), 1e-9) for o, c in zip(opens, closes)]
+        ax.bar(xs, heights, bottom=bottoms, color=colors, width=0.6)
+        for period, values in emas.items():
+            ax.plot(xs, values, linewidth=1.0, label=f"EMA {period}")
+        shown = xs
+    else:
+        # Downsample: index yang sama dipakai untuk close dan EMA supaya overlay sejajar
+        shown = lttb(xs, closes, max_points)
+        ax.fill_between(shown, [lows[i] for i in shown], [highs[i] for i in shown], color='#90a4ae', alpha=0.3,
+                        linewidth=0)
+        ax.plot(shown, [closes[i] for i in shown], color='#37474f', linewidth=1.0, label="Close")
+        for period, values in emas.items():
+            ax.plot(shown, [values[i] for i in shown], linewidth=1.0, label=f"EMA {period}")
+    
+    ticks = shown[::max(1, len(shown) // 6)]
+    ax.set_xticks(ticks)
+    ax.set_xticklabels([datetime.fromtimestamp(timestamps[i], timezone.utc).strftime('%m-%d %H:%M') for i in ticks],
+                       fontsize=8)
+    ax.set_title(title, fontsize=10)
+    ax.grid(alpha=0.2)
+    ax.legend(fontsize=8, loc='upper left')
+    fig.tight_layout()
+    
+    tmp = f"{path}.{os.getpid()}.tmp"
+    fig.savefig(tmp, format='png')
+    plt.close(fig)
+    os.replace(tmp, path)
+    return path
+
+
+class ChartRenderer:
+    """
+    Render chart di process pool (spawn: proses bot sudah multi-thread saat pool dibuat) dengan cache
+    file di disk. Key cache: (symbol, timeframe, timestamp candle terakhir, n, digest OHLC) sehingga
+    history yang di-import ulang tidak memakai PNG lama
+    """
+    
+    def __init__(self, cache_dir: Optional[str] = None, max_workers: int = 1, max_files: int = 200,
+                 ema_periods: Sequence[int] = (5, 10, 20)):
+        self.cache_dir = cache_dir or os.getenv('CHART_CACHE_DIR', '/app/data/charts')
+        self.max_workers = max_workers
+        self.max_files = max_files
+        self.ema_periods = tuple(ema_periods)
+        self.pool: Optional[ProcessPoolExecutor] = None
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "renders": 0, "errors": 0}
+    
+    @staticmethod
+    def available() -> bool:
+        """matplotlib opsional; tanpa itu fitur chart non-aktif"""
+        return importlib.util.find_spec("matplotlib") is not None
+    
+    def cache_path(self, symbol: str, timeframe: str, candles: List[Dict], n: int) -> str:
+        digest = hashlib.blake2b(digest_size=8)
+        for c in candles:
+            digest.update(f"{c['timestamp']},{c['open']},{c['high']},{c['low']},{c['close']};".encode())
+        last_closed = int(candles[-1]['timestamp'])
+        return os.path.join(self.cache_dir, f"{symbol}_{timeframe}_{last_closed}_{n}_{digest.hexdigest()}.png")
+    
+    async def render(self, symbol: str, timeframe: str, candles: List[Dict], n: int) -> Optional[str]:
+        """Path PNG untuk n candle closed terakhir, None jika tidak ada data/gagal"""
+        candles = candles[-n:]
+        if not candles or not self.available():
+            return None
+        
+        path = self.cache_path(symbol, timeframe, candles, n)
+        # Disk I/O (cek cache, prune) di thread, bukan di event loop
+        if await asyncio.to_thread(os.path.exists, path):
+            self.stats["hits"] += 1
+            return path
+        
+        # Request identik yang sedang di-render menunggu hasil yang sama
+        pending = self.inflight.get(path)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[path] = future
+        try:
+            result = await self._render(path, symbol, timeframe, candles)
+            future.set_result(result)
+            return result
+        finally:
+            if not future.done():
+                future.set_result(None)
+            del self.inflight[path]
+    
+    async def _render(self, path: str, symbol: str, timeframe: str, candles: List[Dict]) -> Optional[str]:
+        await asyncio.to_thread(os.makedirs, self.cache_dir, exist_ok=True)
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                            mp_context=multiprocessing.get_context('spawn'))
+        
+        title = f"{symbol} {timeframe} - {len(candles)} candles"
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self.pool, render_chart, path, title,
+                [c['timestamp'] for c in candles], [c['open'] for c in candles],
+                [c['high'] for c in candles], [c['low'] for c in candles],
+                [c['close'] for c in candles], self.ema_periods
+            )
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Chart render failed ({symbol} {timeframe}): {e}")
+            return None
+        
+        self.stats["renders"] += 1
+        await asyncio.to_thread(self._prune)
+        return result
+    
+    def _prune(self):
+        """Batasi jumlah file cache (hapus yang paling lama)"""
+        try:
+            files = [os.path.join(self.cache_dir, f) for f in os.listdir(self.cache_dir) if f.endswith('.png')]
+            if len(files) <= self.max_files:
+                return
+            files.sort(key=os.path.getmtime)
+            for f in files[:len(files) - self.max_files]:
+                os.remove(f)
+        except OSError as e:
+            logger.debug(f"Chart cache prune failed: {e}")
+    
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
@@ -0,0 +1,135 @@
+"""
+Sumber waktu yang bisa di-inject ke komponen jalur tick (feed, aggregator, pipeline, risk, orchestrator)
+
+    time()      wall clock epoch (timestamp tick/candle, cooldown, umur quote)
+    monotonic() durasi dan interval (watchdog feed, rate meter, jadwal cleanup)
+    now()       datetime dari time()
+    sleep()     asyncio sleep dalam waktu clock
+
+SystemClock untuk produksi, AcceleratedClock untuk menjalankan stack live N kali lebih cepat
+(mis. terhadap mock feed), SimulatedClock untuk replay deterministik: waktu hanya maju lewat advance().
+Deadline compute dan timestamp signal ikut clock; pengukuran durasi/CPU (perf_counter, thread_time)
+sengaja tetap memakai waktu nyata.
+"""
+import abc
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+
+class Clock(abc.ABC):
+    """
+    Interface clock; subclass wajib mengimplementasikan time, monotonic dan sleep
+    (gagal saat instansiasi, bukan di tengah replay). now() diturunkan dari time()
+    """
+    
+    @abc.abstractmethod
+    def time(self) -> float:
+        """Wall clock epoch seconds"""
+    
+    @abc.abstractmethod
+    def monotonic(self) -> float:
+        """Detik monotonic untuk durasi dan interval"""
+    
+    def now(self, tz=None) -> datetime:
+        return datetime.fromtimestamp(self.time(), tz)
+    
+    @abc.abstractmethod
+    async def sleep(self, seconds: float):
+        """asyncio sleep dalam waktu clock"""
+
+
+class SystemClock(Clock):
+    """Waktu nyata (default semua komponen)"""
+    
+    def time(self) -> float:
+        return time.time()
+    
+    def monotonic(self) -> float:
+        return time.monotonic()
+    
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+class AcceleratedClock(Clock):
+    """Waktu nyata yang dipercepat speed kali, mulai dari start (default sekarang)"""
+    
+    def __init__(self, speed: float, start: Optional[float] = None):
+        if speed <= 0:
+            raise ValueError("speed must be positive")
+        self.speed = speed
+        self._wall0 = time.time() if start is None else start
+        self._mono0 = time.monotonic()
+    
+    def _elapsed(self) -> float:
+        return (time.monotonic() - self._mono0) * self.speed
+    
+    def time(self) -> float:
+        return self._wall0 + self._elapsed()
+    
+    def monotonic(self) -> float:
+        return self._mono0 + self._elapsed()
+    
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds / self.speed)
+
+
+class SimulatedClock(Clock):
+    """
+    Waktu simulasi untuk replay: hanya maju lewat advance()/advance_to()
+    sleep() menunggu sampai waktu simulasi melewati deadline, jadi loop periodik (signal loop,
+    health check) berjalan sesuai waktu data, bukan waktu nyata
+    """
+    
+    def __init__(self, start: float = 0.0):
+        self._start = start
+        self._now = start
+        self._sleepers: List[Tuple[float, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+    
+    def time(self) -> float:
+        return self._now
+    
+    def monotonic(self) -> float:
+        return self._now - self._start
+    
+    async def sleep(self, seconds: float):
+        if seconds <= 0:
+            await asyncio.sleep(0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._sleepers, (self._now + seconds, next(self._seq), future))
+        await future
+    
+    def advance_to(self, timestamp: float) -> int:
+        """Majukan waktu (tidak pernah mundur) dan bangunkan sleeper yang jatuh tempo; return jumlahnya"""
+        if timestamp > self._now:
+            self._now = timestamp
+        woken = 0
+        while self._sleepers and self._sleepers[0][0] <= self._now:
+            _, _, future = heapq.heappop(self._sleepers)
+            if not future.done():
+                future.set_result(None)
+                woken += 1
+        return woken
+    
+    def advance(self, seconds: float) -> int:
+        return self.advance_to(self._now + seconds)
+    
+    def next_wakeup(self) -> Optional[float]:
+        """Deadline sleeper terdekat (None jika tidak ada yang menunggu)"""
+        return self._sleepers[0][0] if self._sleepers else None
+
+
+SYSTEM_CLOCK = SystemClock()
+
+
+def clock_from_env() -> Clock:
+    """CLOCK_SPEED > 1 -> AcceleratedClock (hanya untuk feed simulasi), selain itu waktu nyata"""
+    speed = float(os.getenv('CLOCK_SPEED', 1))
+    return AcceleratedClock(speed) if speed != 1 else SYSTEM_CLOCK
@@ -0,0 +1,112 @@
+import json
+import logging
+import os
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class Tick(NamedTuple):
+    """Compact tick record hasil decode frame WebSocket"""
+    pair: str
+    bid: float
+    ask: float
+    timestamp: Optional[float] = None
+    seq: int = 0  # sequence ID tick (naik monoton per feed), korelasi tick -> signal
+
+
+def load_json_backend(name: Optional[str] = None) -> Tuple[Callable, str]:
+    """
+    Pilih fungsi JSON loads: orjson / ujson jika tersedia, fallback ke stdlib json
+    name: 'auto' (default, dari WS_JSON_BACKEND), 'orjson', 'ujson', 'json'
+    """
+    name = (name or os.getenv('WS_JSON_BACKEND', 'auto')).lower()
+    candidates = ('orjson', 'ujson') if name == 'auto' else (name,)
+    
+    for candidate in candidates:
+        if candidate == 'json':
+            break
+        try:
+            module = __import__(candidate)
+            return module.loads, candidate
+        except ImportError:
+            if name != 'auto':
+                logger.warning(f"JSON backend {candidate} not installed, falling back to stdlib json")
+    
+    return json.loads, 'json'
+
+
+class TickDecoder:
+    """
+    Decode frame WebSocket Exness menjadi Tick
+    Frame non-tick dan pair lain ditolak dengan scan byte sebelum JSON parse
+    """
+    
+    def __init__(self, pairs: Iterable[str], backend: Optional[str] = None):
+        self.loads, self.backend = load_json_backend(backend)
+        self.pairs = set()
+        self._pair_tokens_str: Tuple[str, ...] = ()
+        self._pair_tokens_bytes: Tuple[bytes, ...] = ()
+        self.set_pairs(pairs)
+        self.stats: Dict[str, int] = {
+            'frames': 0,
+            'prefiltered': 0,
+            'parsed': 0,
+            'ticks': 0,
+            'errors': 0,
+        }
+    
+    def set_pairs(self, pairs: Iterable[str]):
+        """Update pair yang diterima (dipakai saat subscribe berubah)"""
+        self.pairs = set(pairs)
+        self._pair_tokens_str = tuple(f'"{p}"' for p in self.pairs)
+        self._pair_tokens_bytes = tuple(t.encode() for t in self._pair_tokens_str)
+    
+    def accepts(self, message: Union[str, bytes]) -> bool:
+        """Cheap pre-filter: frame harus memuat token "tick" dan salah satu pair"""
+        if isinstance(message, str):
+            if '"tick"' not in message:
+                return False
+            tokens = self._pair_tokens_str
+        else:
+            if b'"tick"' not in message:
+                return False
+            tokens = self._pair_tokens_bytes
+        
+        for token in tokens:
+            if token in message:
+                return True
+        return False
+    
+    def decode(self, message: Union[str, bytes]) -> Optional[Tick]:
+        """Decode satu frame; return None untuk heartbeat, pair lain, atau frame rusak"""
+        stats = self.stats
+        stats['frames'] += 1
+        
+        if not self.accepts(message):
+            stats['prefiltered'] += 1
+            return None
+        
+        try:
+            data = self.loads(message)
+            stats['parsed'] += 1
+            # Pre-filter hanya substring, validasi ulang setelah parse
+            if data["type"] != "tick":
+                return None
+            pair = data["pair"]
+            if pair not in self.pairs:
+                return None
+            timestamp = data.get("timestamp")
+            if timestamp is not None:
+                timestamp = float(timestamp)
+                # Feed bisa kirim epoch milliseconds
+                if timestamp > 1e11:
+                    timestamp /= 1000.0
+            tick = Tick(pair, float(data["bid"]), float(data["ask"]), timestamp, stats['ticks'] + 1)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            stats['errors'] += 1
+            logger.debug(f"Malformed frame dropped: {e}")
+            return None
+        
+        stats['ticks'] += 1
+        return tick
@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.clock import SYSTEM_CLOCK, Clock
+from app.metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+_STALE = object()
+
+
+class ComputeStage:
+    """
+    Stage CPU (aggregasi candle + indikator) di executor terpisah dari event loop
+    Setiap job punya deadline dihitung dari waktu event (candle close); job yang basi di-drop
+    Deadline memakai clock.monotonic(), jadi di replay (SimulatedClock) tidak ada job yang di-drop
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None, deadline: Optional[float] = None,
+                 clock: Optional[Clock] = None):
+        self.max_workers = max_workers or int(os.getenv('COMPUTE_WORKERS', 1))
+        self.deadline = deadline or float(os.getenv('COMPUTE_DEADLINE_SECONDS', 2.0))
+        self.clock = clock or SYSTEM_CLOCK
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='compute')
+        self.latency = LatencyHistogram()  # event -> hasil tersedia di event loop
+        self.stats = {"submitted": 0, "completed": 0, "dropped_queued": 0, "dropped_late": 0, "errors": 0}
+    
+    async def run(self, fn: Callable[..., Any], *args, event_time: Optional[float] = None) -> Optional[Any]:
+        """
+        Jalankan fn(*args) di executor
+        Returns: hasil fn, atau None jika job melewati deadline (fn tidak boleh return None)
+        """
+        monotonic = self.clock.monotonic
+        event_time = monotonic() if event_time is None else event_time
+        expires = event_time + self.deadline
+        self.stats["submitted"] += 1
+        
+        def _job():
+            # Antrian executor sudah terlalu lama: jangan hitung sama sekali
+            if monotonic() > expires:
+                return _STALE
+            return fn(*args)
+        
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, _job)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        
+        now = monotonic()
+        if result is _STALE:
+            self.stats["dropped_queued"] += 1
+            return None
+        if now > expires:
+            self.stats["dropped_late"] += 1
+            return None
+        
+        self.stats["completed"] += 1
+        self.latency.observe(now - event_time)
+        return result
+    
+    def get_status(self):
+        return dict(self.stats, workers=self.max_workers, deadline_s=self.deadline, latency=self.latency.summary())
+    
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -1,12 +1,36 @@
+import functools
 import sqlite3
 import logging
+import time
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
+
+from app.metrics import REGISTRY
 
 logger = logging.getLogger(__name__)
 
+DB_WRITE_SECONDS = REGISTRY.histogram('db_write_seconds', "Durasi write SQLite per operasi", ('op',))
+
+
+def _timed_write(method):
+    """Catat durasi method write ke histogram db_write_seconds{op=nama method}"""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            DB_WRITE_SECONDS.observe(time.perf_counter() - start, op=method.__name__)
+    return wrapper
+
 
 class Database:
+    TRADE_EXPORT_COLUMNS = (
+        'signal_id', 'ticker', 'direction', 'entry_price', 'exit_price', 'sl', 'tp',
+        'signal_timestamp', 'status', 'confidence', 'pips_gained', 'virtual_pl_usd',
+        'is_evaluation_mode'
+    )
+    
     def __init__(self, db_url: str):
         self.db_path = db_url.replace('sqlite:///', '')
         self.init_db()
@@ -31,6 +55,22 @@ class Database:
             )
         ''')
         
+        # Migrasi sekali: dedup candle per (timeframe, timestamp_utc) lalu pasang unique index
+        # (setelah index ada, dedup full scan tidak perlu diulang tiap startup)
+        has_index = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_ohlcv_tf_ts'"
+        ).fetchone()
+        if not has_index:
+            cursor.execute('''
+                DELETE FROM ohlcv_cache WHERE id NOT IN (
+                    SELECT MIN(id) FROM ohlcv_cache GROUP BY timeframe, timestamp_utc
+                )
+            ''')
+            cursor.execute('''
+                CREATE UNIQUE INDEX idx_ohlcv_tf_ts
+                ON ohlcv_cache (timeframe, timestamp_utc)
+            ''')
+        
         # Tabel Trades
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS trades (
@@ -48,11 +88,17 @@ class Database:
                 pips_gained REAL,
                 virtual_pl_usd REAL,
                 is_evaluation_mode BOOLEAN DEFAULT 1,
+                trace TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
         
+        # Migrasi database lama: kolom trace (span record tick -> signal, JSON)
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(trades)')}
+        if 'trace' not in columns:
+            cursor.execute('ALTER TABLE trades ADD COLUMN trace TEXT')
+        
         # Tabel Bot State
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS bot_state (
@@ -74,10 +120,43 @@ class Database:
             )
         ''')
         
+        # Tabel Subscribers
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS subscribers (
+                chat_id INTEGER PRIMARY KEY,
+                subscribed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Tabel Subscriber Filters (JSON preferensi sinyal per chat)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS subscriber_filters (
+                chat_id INTEGER PRIMARY KEY,
+                filter TEXT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Tabel Delivery Log (hasil broadcast per penerima)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS delivery_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                chat_id INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_delivery_log_job ON delivery_log(job_id)
+        ''')
+        
         conn.commit()
         conn.close()
         logger.info(f"Database initialized: {self.db_path}")
     
+    @_timed_write
     def add_ohlcv(self, timeframe: str, timestamp_utc: int, ohlcv: Dict):
         """Add OHLCV candle"""
         conn = sqlite3.connect(self.db_path)
@@ -86,30 +165,157 @@ class Database:
         cursor.execute('''
             INSERT INTO ohlcv_cache (timeframe, timestamp_utc, open, high, low, close, volume)
             VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (timeframe, timestamp_utc) DO UPDATE SET
+                open = excluded.open, high = excluded.high, low = excluded.low,
+                close = excluded.close, volume = excluded.volume
         ''', (timeframe, timestamp_utc, ohlcv['open'], ohlcv['high'], 
               ohlcv['low'], ohlcv['close'], ohlcv['volume']))
         
         conn.commit()
         conn.close()
     
+    @_timed_write
+    def add_ohlcv_bulk(self, timeframe: str, rows: Iterable[Tuple], chunk_size: int = 50000) -> int:
+        """
+        Bulk insert candles (timestamp_utc, open, high, low, close, volume)
+        Satu transaksi per chunk, duplikat (timeframe, timestamp_utc) di-skip
+        Returns: jumlah row yang benar-benar masuk
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('PRAGMA synchronous = NORMAL')
+        cursor = conn.cursor()
+        inserted = 0
+        
+        try:
+            chunk = []
+            for row in rows:
+                chunk.append((timeframe,) + tuple(row))
+                if len(chunk) >= chunk_size:
+                    inserted += self._insert_ohlcv_chunk(conn, cursor, chunk)
+                    chunk = []
+            if chunk:
+                inserted += self._insert_ohlcv_chunk(conn, cursor, chunk)
+        finally:
+            conn.close()
+        
+        return inserted
+    
+    @staticmethod
+    def _insert_ohlcv_chunk(conn, cursor, chunk: List[Tuple]) -> int:
+        """Insert satu chunk candle dalam satu transaksi"""
+        before = conn.total_changes
+        cursor.executemany('''
+            INSERT OR IGNORE INTO ohlcv_cache (timeframe, timestamp_utc, open, high, low, close, volume)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', chunk)
+        conn.commit()
+        return conn.total_changes - before
+    
+    def count_ohlcv(self, timeframe: str, start: Optional[int] = None, end: Optional[int] = None) -> int:
+        """Hitung jumlah candle untuk timeframe dalam range [start, end)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT COUNT(*) FROM ohlcv_cache
+            WHERE timeframe = ? AND timestamp_utc >= ? AND timestamp_utc < ?
+        ''', (timeframe, start if start is not None else -2**63, end if end is not None else 2**63 - 1))
+        result = cursor.fetchone()
+        conn.close()
+        
+        return result[0]
+    
+    def iter_ohlcv(self, timeframe: str, start: Optional[int] = None, end: Optional[int] = None,
+                   chunk_size: int = 10000) -> Iterator[List[Tuple]]:
+        """
+        Stream candle per chunk, urut timestamp
+        Yields: list of (timestamp_utc, open, high, low, close, volume)
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('''
+                SELECT timestamp_utc, open, high, low, close, volume FROM ohlcv_cache
+                WHERE timeframe = ? AND timestamp_utc >= ? AND timestamp_utc < ?
+                ORDER BY timestamp_utc
+            ''', (timeframe, start if start is not None else -2**63, end if end is not None else 2**63 - 1))
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+    
+    def get_recent_ohlcv(self, timeframe: str, limit: int = 100) -> List[Dict]:
+        """limit candle terakhir, urut timestamp naik"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT timestamp_utc, open, high, low, close, volume FROM ohlcv_cache
+            WHERE timeframe = ? ORDER BY timestamp_utc DESC LIMIT ?
+        ''', (timeframe, limit))
+        rows = cursor.fetchall()
+        conn.close()
+        
+        return [
+            {'timeframe': timeframe, 'timestamp': ts, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for ts, o, h, l, c, v in reversed(rows)
+        ]
+    
+    def count_trades(self) -> int:
+        """Hitung jumlah trade"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT COUNT(*) FROM trades')
+        result = cursor.fetchone()
+        conn.close()
+        
+        return result[0]
+    
+    def iter_trades(self, chunk_size: int = 10000) -> Iterator[List[Tuple]]:
+        """
+        Stream semua trade per chunk, urut id
+        Yields: list of row sesuai TRADE_EXPORT_COLUMNS
+        """
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(f'''
+                SELECT {', '.join(self.TRADE_EXPORT_COLUMNS)} FROM trades ORDER BY id
+            ''')
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            conn.close()
+    
+    @_timed_write
     def add_trade(self, signal_id: str, ticker: str, direction: str, entry_price: float,
                   sl: float, tp: float, signal_timestamp: str, confidence: float,
-                  is_eval_mode: bool):
+                  is_eval_mode: bool, trace: Optional[str] = None):
         """Add new trade"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
         cursor.execute('''
             INSERT INTO trades (signal_id, ticker, direction, entry_price, sl, tp, 
-                              signal_timestamp, status, confidence, is_evaluation_mode)
-            VALUES (?, ?, ?, ?, ?, ?, ?, 'OPEN', ?, ?)
+                              signal_timestamp, status, confidence, is_evaluation_mode, trace)
+            VALUES (?, ?, ?, ?, ?, ?, ?, 'OPEN', ?, ?, ?)
         ''', (signal_id, ticker, direction, entry_price, sl, tp, 
-              signal_timestamp, confidence, is_eval_mode))
+              signal_timestamp, confidence, is_eval_mode, trace))
         
         conn.commit()
         conn.close()
         logger.info(f"Trade added: {signal_id} {direction} @ {entry_price}")
     
+    @_timed_write
     def update_trade_result(self, signal_id: str, exit_price: float, pips_gained: float,
                            pl_usd: float, status: str):
         """Update trade result"""
@@ -126,6 +332,31 @@ class Database:
         conn.close()
         logger.info(f"Trade updated: {signal_id} {status} (P/L: ${pl_usd})")
     
+    @_timed_write
+    def update_trade_trace(self, signal_id: str, trace: str):
+        """Simpan span record final (setelah signal terkirim)"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.execute('UPDATE trades SET trace = ? WHERE signal_id = ?', (trace, signal_id))
+        finally:
+            conn.close()
+    
+    def get_trade_trace(self, signal_id: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """(signal_id, trace) untuk signal_id, atau trade terakhir yang punya trace"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        if signal_id:
+            cursor.execute('SELECT signal_id, trace FROM trades WHERE signal_id = ? AND trace IS NOT NULL',
+                           (signal_id,))
+        else:
+            cursor.execute('SELECT signal_id, trace FROM trades WHERE trace IS NOT NULL ORDER BY id DESC LIMIT 1')
+        result = cursor.fetchone()
+        conn.close()
+        
+        return result
+    
     def get_trades(self, limit: int = 10) -> List[Dict]:
         """Get recent trades"""
         conn = sqlite3.connect(self.db_path)
@@ -194,6 +425,7 @@ class Database:
             'profit_factor': 1.0  # Will calculate from trades
         }
     
+    @_timed_write
     def set_state(self, key: str, value: str):
         """Set bot state"""
         conn = sqlite3.connect(self.db_path)
@@ -218,6 +450,7 @@ class Database:
         
         return result[0] if result else None
     
+    @_timed_write
     def log_ws_health(self, delay_ms: float, status: str, message: str = ""):
         """Log WebSocket health"""
         conn = sqlite3.connect(self.db_path)
@@ -230,3 +463,84 @@ class Database:
         
         conn.commit()
         conn.close()
+    
+    @_timed_write
+    def add_delivery_results(self, job_id: str, results: Iterable[Tuple]) -> int:
+        """Simpan hasil delivery (chat_id, status, error) dalam satu transaksi"""
+        rows = [(job_id, chat_id, status, error) for chat_id, status, error in results]
+        if not rows:
+            return 0
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany('''
+                    INSERT INTO delivery_log (job_id, chat_id, status, error)
+                    VALUES (?, ?, ?, ?)
+                ''', rows)
+        finally:
+            conn.close()
+        
+        logger.info(f"Delivery log saved: {job_id} ({len(rows)} rows)")
+        return len(rows)
+    
+    def get_subscribers(self) -> List[int]:
+        """Semua chat_id subscriber"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT chat_id FROM subscribers ORDER BY subscribed_at')
+        result = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        
+        return result
+    
+    @_timed_write
+    def apply_subscriber_changes(self, changes: Iterable[Tuple[int, bool]]) -> int:
+        """Terapkan batch (chat_id, subscribed) dalam satu transaksi"""
+        changes = list(changes)
+        added = [(chat_id,) for chat_id, subscribed in changes if subscribed]
+        removed = [(chat_id,) for chat_id, subscribed in changes if not subscribed]
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                if added:
+                    conn.executemany('INSERT OR IGNORE INTO subscribers (chat_id) VALUES (?)', added)
+                if removed:
+                    conn.executemany('DELETE FROM subscribers WHERE chat_id = ?', removed)
+        finally:
+            conn.close()
+        
+        return len(changes)
+    
+    def get_subscriber_filters(self) -> Dict[int, str]:
+        """Filter JSON per chat_id"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT chat_id, filter FROM subscriber_filters')
+        result = dict(cursor.fetchall())
+        conn.close()
+        
+        return result
+    
+    @_timed_write
+    def save_subscriber_filters(self, rows: Iterable[Tuple[int, str]]) -> int:
+        """Upsert batch (chat_id, filter_json) dalam satu transaksi"""
+        rows = list(rows)
+        if not rows:
+            return 0
+        
+        conn = sqlite3.connect(self.db_path)
+        try:
+            with conn:
+                conn.executemany('''
+                    INSERT INTO subscriber_filters (chat_id, filter) VALUES (?, ?)
+                    ON CONFLICT (chat_id) DO UPDATE SET
+                        filter = excluded.filter, updated_at = CURRENT_TIMESTAMP
+                ''', rows)
+        finally:
+            conn.close()
+        
+        return len(rows)
@@ -0,0 +1,242 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from app.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_SEND_SECONDS = REGISTRY.histogram('telegram_send_seconds', "Durasi request Bot API (tanpa antrian rate limit)")
+TELEGRAM_SEND_TOTAL = REGISTRY.counter('telegram_send_total', "Request Bot API per hasil", ('result',))
+
+# Prioritas pengiriman: signal selalu didahulukan dari broadcast
+PRIORITY_SIGNAL = 0
+PRIORITY_BROADCAST = 1
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter (rate token/detik, burst = capacity)
+    Waiter diantre per prioritas (FIFO di prioritas yang sama); hanya kepala antrean yang polling
+    """
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated', 'blocked_until', '_waiters', '_sequence')
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._waiters: List[list] = []  # heap [priority, seq, future]
+        self._sequence = itertools.count()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def try_acquire(self, n: float = 1.0) -> float:
+        """Ambil n token; return 0 jika berhasil, selain itu detik yang harus ditunggu"""
+        now = time.monotonic()
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        self._refill(now)
+        if self.tokens >= n:
+            self.tokens -= n
+            return 0.0
+        return (n - self.tokens) / self.rate
+    
+    def idle(self, now: Optional[float] = None) -> bool:
+        """Tidak ada waiter dan token sudah penuh lagi: bucket bisa dibuang tanpa mengubah perilaku"""
+        now = time.monotonic() if now is None else now
+        if self._waiters or now < self.blocked_until:
+            return False
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+    
+    def _wake_head(self):
+        if self._waiters:
+            future = self._waiters[0][2]
+            if future is not None and not future.done():
+                future.set_result(None)
+    
+    async def acquire(self, n: float = 1.0, priority: int = PRIORITY_SIGNAL):
+        """
+        Tunggu sampai n token tersedia. Waiter prioritas lebih tinggi (angka lebih kecil) yang
+        datang belakangan tetap dilayani lebih dulu dari waiter yang sudah antre
+        """
+        if not self._waiters and self.try_acquire(n) <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        entry = [priority, next(self._sequence), None]
+        heapq.heappush(self._waiters, entry)
+        try:
+            while True:
+                entry[2] = future = loop.create_future()
+                timer = None
+                if self._waiters[0] is entry:
+                    wait = self.try_acquire(n)
+                    if wait <= 0:
+                        return
+                    timer = loop.call_later(wait, lambda: future.done() or future.set_result(None))
+                try:
+                    await future
+                finally:
+                    if timer is not None:
+                        timer.cancel()
+        finally:
+            self._waiters.remove(entry)
+            heapq.heapify(self._waiters)
+            self._wake_head()
+    
+    def block(self, seconds: float):
+        """Tahan semua acquire selama seconds (flood control Telegram)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+
+class DeliveryReport:
+    """Hasil fan-out satu pesan ke banyak chat"""
+    
+    def __init__(self, total: int):
+        self.total = total
+        self.sent = 0
+        self.failed = 0
+        self.failures: Dict[int, str] = {}
+        self.latencies: List[float] = []  # detik sejak fan-out mulai, per penerima sukses
+    
+    def record(self, chat_id: int, ok: bool, latency: float, error: Optional[str] = None):
+        if ok:
+            self.sent += 1
+            self.latencies.append(latency)
+        else:
+            self.failed += 1
+            self.failures[chat_id] = error or "unknown"
+    
+    def summary(self) -> Dict:
+        """Latency penerima pertama, median dan terakhir (ms)"""
+        latencies = sorted(self.latencies)
+        return {
+            "total": self.total,
+            "sent": self.sent,
+            "failed": self.failed,
+            "first_ms": latencies[0] * 1000 if latencies else 0.0,
+            "median_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+            "last_ms": latencies[-1] * 1000 if latencies else 0.0,
+        }
+
+
+class DeliveryPipeline:
+    """
+    Pengiriman pesan Telegram concurrent dengan rate limit global dan per chat
+    Pesan di-render sekali oleh caller, pipeline hanya mengirim ulang string yang sama
+    """
+    
+    def __init__(self, send_func: Callable[..., Awaitable], concurrency: Optional[int] = None,
+                 global_rate: Optional[float] = None, per_chat_rate: Optional[float] = None,
+                 max_attempts: int = 3, max_chat_buckets: int = 10000):
+        self.send_func = send_func
+        self.concurrency = concurrency or int(os.getenv('TELEGRAM_SEND_CONCURRENCY', 16))
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.global_bucket = TokenBucket(global_rate or float(os.getenv('TELEGRAM_GLOBAL_RATE', 30)))
+        self.per_chat_rate = per_chat_rate or float(os.getenv('TELEGRAM_PER_CHAT_RATE', 1))
+        self.chat_buckets: Dict[int, TokenBucket] = {}
+        self.max_chat_buckets = max_chat_buckets
+        self.max_attempts = max_attempts
+        self._signal_fanouts = 0
+        self._signals_idle: Optional[asyncio.Event] = None
+    
+    def _idle_event(self) -> asyncio.Event:
+        if self._signals_idle is None:
+            self._signals_idle = asyncio.Event()
+            self._signals_idle.set()
+        return self._signals_idle
+    
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self.chat_buckets) >= self.max_chat_buckets:
+                self._evict_idle_buckets()
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.per_chat_rate, capacity=1.0)
+        return bucket
+    
+    def _evict_idle_buckets(self):
+        """Buang bucket chat yang idle (subscriber churn tidak menumpuk bucket selamanya)"""
+        now = time.monotonic()
+        self.chat_buckets = {chat_id: b for chat_id, b in self.chat_buckets.items() if not b.idle(now)}
+    
+    async def send(self, chat_id: int, text: str, priority: int = PRIORITY_SIGNAL,
+                   func: Optional[Callable[..., Awaitable]] = None, **kwargs) -> Optional[str]:
+        """
+        Kirim satu pesan dengan rate limit dan retry; return None jika sukses, selain itu error
+        func: pengganti send_func (mis. edit message) yang tetap memakai limiter yang sama
+        """
+        # Lazy: python-telegram-bot baru di-load saat pesan pertama dikirim, bukan saat startup
+        from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TimedOut
+        
+        func = func or self.send_func
+        error = None
+        for attempt in range(1, self.max_attempts + 1):
+            if priority > PRIORITY_SIGNAL:
+                # Broadcast menunggu sampai tidak ada fan-out signal yang berjalan
+                await self._idle_event().wait()
+            await self._chat_bucket(chat_id).acquire(priority=priority)
+            # Antrean global per prioritas: signal baru menyalip broadcast yang sudah menunggu token
+            await self.global_bucket.acquire(priority=priority)
+            result = "error"
+            try:
+                async with self.semaphore:
+                    with TELEGRAM_SEND_SECONDS.time():
+                        await func(chat_id=chat_id, text=text, **kwargs)
+                result = "ok"
+                return None
+            except RetryAfter as e:
+                result = "retry_after"
+                # Flood control: tahan semua pengiriman, lalu coba lagi
+                retry_after = float(e.retry_after)
+                logger.warning(f"Telegram flood control, retry after {retry_after:.0f}s (chat {chat_id})")
+                self.global_bucket.block(retry_after)
+                error = f"RetryAfter {retry_after:.0f}s"
+            except Forbidden as e:
+                # User block bot / chat tidak ada: tidak perlu retry
+                result = "forbidden"
+                return f"Forbidden: {e}"
+            except BadRequest as e:
+                result = "bad_request"
+                return f"BadRequest: {e}"
+            except (TimedOut, NetworkError) as e:
+                result = "network"
+                error = f"{type(e).__name__}: {e}"
+                await asyncio.sleep(0.5 * attempt)
+            except Exception as e:
+                return f"{type(e).__name__}: {e}"
+            finally:
+                TELEGRAM_SEND_TOTAL.inc(result=result)
+        return error
+    
+    async def deliver(self, chat_ids: Iterable[int], text: str, priority: int = PRIORITY_SIGNAL,
+                      **kwargs) -> DeliveryReport:
+        """Fan-out satu pesan ke semua chat secara concurrent"""
+        chat_ids = list(chat_ids)
+        report = DeliveryReport(len(chat_ids))
+        started = time.perf_counter()
+        
+        async def _one(chat_id: int):
+            error = await self.send(chat_id, text, priority, **kwargs)
+            report.record(chat_id, error is None, time.perf_counter() - started, error)
+        
+        idle = self._idle_event()
+        if priority == PRIORITY_SIGNAL:
+            self._signal_fanouts += 1
+            idle.clear()
+        try:
+            await asyncio.gather(*(_one(chat_id) for chat_id in chat_ids))
+        finally:
+            if priority == PRIORITY_SIGNAL:
+                self._signal_fanouts -= 1
+                if self._signal_fanouts == 0:
+                    idle.set()
+        return report
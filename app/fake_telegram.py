@@ -0,0 +1,359 @@
+"""
+Fake Telegram Bot API + webhook load generator untuk benchmark offline
+
+Server meniru endpoint https://api.telegram.org/bot<token>/<method> yang dipakai bot
+(getMe, setWebhook, sendMessage, editMessageText, ...). Bot diarahkan ke sini lewat
+TELEGRAM_BASE_URL, lalu load generator mengirim update ke webhook bot dan mengukur
+latency sampai balasan sendMessage diterima.
+
+Usage:
+    python -m app.fake_telegram serve --port 8081
+    python -m app.fake_telegram bench --updates 5000 --rate 2000 --command /help
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from collections import Counter, deque
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from app.http_server import HttpRequest, HttpServer
+from app.metrics import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+FAKE_TOKEN = "123456:FAKE-TOKEN-FOR-BENCHMARK"
+
+
+class FakeTelegramServer:
+    """Bot API palsu: semua method sukses, sendMessage/editMessageText di-callback ke on_message"""
+    
+    def __init__(self, token: str = FAKE_TOKEN, host: str = "127.0.0.1", port: int = 8081):
+        self.token = token
+        self.http = HttpServer(host, port)
+        self.http.route("POST", f"/bot{token}/", self.handle_method, prefix=True)
+        self.calls = Counter()
+        self.message_id = 0
+        self.webhook: Optional[Tuple[str, Optional[str]]] = None
+        self.webhook_set = asyncio.Event()
+        self.on_message: Optional[Callable[[int, str], None]] = None
+    
+    @staticmethod
+    def _params(request: HttpRequest) -> Dict[str, str]:
+        if request.headers.get('content-type', '').startswith('application/json'):
+            return {k: v if isinstance(v, str) else json.dumps(v) for k, v in json.loads(request.body or b'{}').items()}
+        return dict(parse_qsl(request.body.decode()))
+    
+    def _message(self, params: Dict[str, str]) -> Dict:
+        self.message_id += 1
+        return {
+            "message_id": int(params.get("message_id", self.message_id)),
+            "date": int(time.time()),
+            "chat": {"id": int(params.get("chat_id", 0)), "type": "private"},
+            "text": params.get("text", ""),
+        }
+    
+    async def handle_method(self, request: HttpRequest):
+        method = request.path.rsplit('/', 1)[-1]
+        params = self._params(request)
+        self.calls[method] += 1
+        
+        if method == "getMe":
+            result = {"id": int(self.token.split(':')[0]), "is_bot": True,
+                      "first_name": "Fake", "username": "fake_bot"}
+        elif method in ("sendMessage", "editMessageText", "sendPhoto"):
+            result = self._message(params)
+            if self.on_message is not None:
+                self.on_message(int(params.get("chat_id", 0)), method)
+        elif method == "setWebhook":
+            self.webhook = (params["url"], params.get("secret_token"))
+            self.webhook_set.set()
+            result = True
+        elif method == "getUpdates":
+            # Long polling palsu: tidak ada update
+            await asyncio.sleep(min(float(params.get("timeout", 1) or 1), 1.0))
+            result = []
+        else:
+            result = True
+        
+        return 200, "application/json", json.dumps({"ok": True, "result": result}).encode()
+
+
+class WebhookClient:
+    """Satu koneksi HTTP/1.1 keep-alive untuk POST update ke webhook"""
+    
+    def __init__(self, url: str, secret: Optional[str] = None):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path or "/"
+        self.secret = secret
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+    
+    async def post(self, body: bytes) -> int:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        head = (
+            f"POST {self.path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        )
+        if self.secret:
+            head += f"X-Telegram-Bot-Api-Secret-Token: {self.secret}\r\n"
+        self.writer.write(head.encode() + b"\r\n" + body)
+        await self.writer.drain()
+        
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode().partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        if length:
+            await self.reader.readexactly(length)
+        return status
+    
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+def make_update(update_id: int, user_id: int, text: str) -> bytes:
+    """Update JSON berisi pesan command dari user_id"""
+    command_length = len(text.split()[0]) if text.startswith('/') else 0
+    message = {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": {"id": user_id, "type": "private"},
+        "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"},
+        "text": text,
+    }
+    if command_length:
+        message["entities"] = [{"type": "bot_command", "offset": 0, "length": command_length}]
+    return json.dumps({"update_id": update_id, "message": message}).encode()
+
+
+async def drive_webhook(server: FakeTelegramServer, updates: int, rate: float, command: str,
+                        users: List[int], connections: int = 16, drain_timeout: float = 10.0) -> Dict:
+    """Kirim update ke webhook bot dengan rate tetap, ukur ack dan latency sampai balasan"""
+    await asyncio.wait_for(server.webhook_set.wait(), timeout=30)
+    url, secret = server.webhook
+    
+    sent_at: Dict[int, deque] = {}
+    ack_latency = LatencyHistogram()
+    reply_latency = LatencyHistogram()
+    counts = Counter()
+    replies_done = asyncio.Event()
+    last_reply = [0.0]
+    
+    def on_message(chat_id: int, method: str):
+        pending = sent_at.get(chat_id)
+        if not pending:
+            return
+        now = time.perf_counter()
+        reply_latency.observe(now - pending.popleft())
+        counts['replies'] += 1
+        last_reply[0] = now
+        if counts['replies'] >= updates:
+            replies_done.set()
+    
+    server.on_message = on_message
+    queue: asyncio.Queue = asyncio.Queue()
+    
+    async def worker():
+        client = WebhookClient(url, secret)
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                user_id, body = item
+                start = time.perf_counter()
+                sent_at.setdefault(user_id, deque()).append(start)
+                try:
+                    status = await client.post(body)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    status = 0
+                    await client.close()
+                ack_latency.observe(time.perf_counter() - start)
+                counts['acked' if status == 200 else f'http_{status}'] += 1
+        finally:
+            await client.close()
+    
+    workers = [asyncio.create_task(worker()) for _ in range(connections)]
+    started = time.perf_counter()
+    for i in range(updates):
+        # Pacing: tunggu sampai jadwal update ke-i
+        delay = started + i / rate - time.perf_counter()
+        if delay > 0.001:
+            await asyncio.sleep(delay)
+        queue.put_nowait((users[i % len(users)], make_update(i + 1, users[i % len(users)], command)))
+    for _ in workers:
+        queue.put_nowait(None)
+    await asyncio.gather(*workers)
+    send_elapsed = time.perf_counter() - started
+    
+    try:
+        await asyncio.wait_for(replies_done.wait(), timeout=drain_timeout)
+    except asyncio.TimeoutError:
+        pass
+    
+    elapsed = (last_reply[0] or time.perf_counter()) - started
+    return {
+        "updates": updates,
+        "target_rate": rate,
+        "send_rate": updates / send_elapsed if send_elapsed else 0.0,
+        "acked": counts['acked'],
+        "errors": {k: v for k, v in counts.items() if k.startswith('http_')},
+        "replies": counts['replies'],
+        "throughput": counts['replies'] / elapsed if elapsed > 0 else 0.0,
+        "webhook_ack": ack_latency.summary(),
+        "update_to_reply": reply_latency.summary(),
+        "api_calls": dict(server.calls),
+    }
+
+
+def _run_harness(port: int, updates: int, rate: float, command: str, users: List[int],
+                 connections: int, ready, results):
+    """Entry point proses fake Telegram + load generator"""
+    logging.basicConfig(level=logging.WARNING)
+    
+    async def _main():
+        server = FakeTelegramServer(port=port)
+        await server.http.start()
+        ready.set()
+        result = await drive_webhook(server, updates, rate, command, users, connections)
+        await server.http.stop()
+        return result
+    
+    try:
+        results.put(asyncio.run(_main()))
+    except Exception as e:
+        results.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def _wait_ready(ready, harness, timeout: float) -> bool:
+    """Tunggu harness siap; False jika timeout atau proses harness sudah mati"""
+    deadline = time.monotonic() + timeout
+    while not ready.wait(0.1):
+        if not harness.is_alive() or time.monotonic() > deadline:
+            return False
+    return True
+
+
+def _harness_result(results, harness, timeout: float) -> Dict:
+    """Hasil dari proses harness; error dict jika proses mati tanpa hasil atau timeout (tidak block selamanya)"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return results.get(timeout=1.0)
+        except queue.Empty:
+            pass
+        if not harness.is_alive():
+            # Hasil yang di-put tepat sebelum exit masih bisa sedang di-flush
+            try:
+                return results.get(timeout=1.0)
+            except queue.Empty:
+                return {"error": f"harness exited with code {harness.exitcode} without a result"}
+        if time.monotonic() > deadline:
+            return {"error": f"no result from harness within {timeout:.0f}s"}
+
+
+async def run_bench(updates: int, rate: float, command: str, users: int = 500, connections: int = 16,
+                    api_port: int = 8081, webhook_port: int = 8088) -> Dict:
+    """
+    Jalankan fake Telegram + load generator di proses terpisah dan bot (mode webhook) di proses ini
+    Path yang diukur sama dengan produksi: HTTP server -> update queue -> handler -> Bot API
+    """
+    user_ids = list(range(100000, 100000 + users))
+    os.environ.update({
+        'TELEGRAM_BOT_TOKEN': FAKE_TOKEN,
+        'TELEGRAM_BASE_URL': f"http://127.0.0.1:{api_port}/bot",
+        'TELEGRAM_MODE': 'webhook',
+        'PORT': str(webhook_port),
+        'WEBHOOK_URL': f"http://127.0.0.1:{webhook_port}",
+        'WEBHOOK_SECRET': 'bench-secret',
+        'AUTHORIZED_USER_IDS': ','.join(map(str, user_ids)),
+        'ADMIN_USER_IDS': str(user_ids[0]),
+    })
+    
+    ready = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    harness = multiprocessing.Process(
+        target=_run_harness,
+        args=(api_port, updates, rate, command, user_ids, connections, ready, results),
+        daemon=True
+    )
+    harness.start()
+    loop = asyncio.get_running_loop()
+    if not await loop.run_in_executor(None, _wait_ready, ready, harness, 10):
+        # Harness gagal start (mis. port API terpakai): laporkan error-nya, jangan lanjut tanpa fake server
+        result = await loop.run_in_executor(None, _harness_result, results, harness, 5)
+        harness.terminate()
+        harness.join(timeout=5)
+        return result if "error" in result else {"error": "fake Telegram harness not ready within 10s"}
+    
+    from app.main import BotOrchestrator
+    orchestrator = BotOrchestrator()
+    # Route webhook didaftarkan di http_server orchestrator; server-nya dijalankan BotOrchestrator.main()
+    await orchestrator.http_server.start()
+    bot_task = asyncio.create_task(orchestrator.run_telegram_bot())
+    
+    try:
+        # Waktu kirim + drain + margin setup webhook
+        result = await loop.run_in_executor(None, _harness_result, results, harness, updates / rate + 60)
+    finally:
+        orchestrator.running = False
+        await bot_task
+        await orchestrator.http_server.stop()
+    harness.join(timeout=5)
+    if harness.is_alive():
+        harness.terminate()
+    return result
+
+
+def main(argv: Optional[List[str]] = None):
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description="Fake Telegram Bot API server and webhook benchmark")
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('serve', help="Run fake Bot API server (point TELEGRAM_BASE_URL at it)")
+    p.add_argument('--host', default='127.0.0.1')
+    p.add_argument('--port', type=int, default=8081)
+    p = sub.add_parser('bench', help="Fire updates at the bot webhook and report throughput/latency")
+    p.add_argument('--updates', type=int, default=5000)
+    p.add_argument('--rate', type=float, default=1000.0, help="Updates per second")
+    p.add_argument('--command', default='/help', help="Message text sent by every update")
+    p.add_argument('--users', type=int, default=500, help="Distinct authorized users")
+    p.add_argument('--connections', type=int, default=16, help="Concurrent webhook connections")
+    p.add_argument('--api-port', type=int, default=8081)
+    p.add_argument('--webhook-port', type=int, default=8088)
+    
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s')
+    
+    if args.command == 'serve':
+        async def _serve():
+            server = FakeTelegramServer(host=args.host, port=args.port)
+            await server.http.start()
+            await asyncio.Future()
+        try:
+            asyncio.run(_serve())
+        except KeyboardInterrupt:
+            pass
+    else:
+        result = asyncio.run(run_bench(args.updates, args.rate, args.command, args.users,
+                                       args.connections, args.api_port, args.webhook_port))
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
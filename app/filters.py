@@ -0,0 +1,160 @@
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Dict, FrozenSet, Optional, Set, Tuple
+
+WIB = timezone(timedelta(hours=7))
+
+DIRECTIONS = ("BUY", "SELL")
+# Batas bawah band confidence; user di-index di band yang memuat min_confidence-nya
+CONFIDENCE_BANDS = (0, 50, 60, 70, 80, 90)
+ALL_SYMBOLS = "*"
+
+
+def confidence_band(confidence: float) -> int:
+    """Band tertinggi yang <= confidence"""
+    band = CONFIDENCE_BANDS[0]
+    for b in CONFIDENCE_BANDS:
+        if confidence >= b:
+            band = b
+    return band
+
+
+def wib_hour(now: Optional[datetime] = None) -> int:
+    """Jam sekarang dalam WIB (UTC+7)"""
+    return (now or datetime.now(timezone.utc)).astimezone(WIB).hour
+
+
+class SubscriberFilter:
+    """Preferensi sinyal satu subscriber (None = semua)"""
+    __slots__ = ('directions', 'min_confidence', 'symbols', 'quiet_start', 'quiet_end')
+    
+    def __init__(self, directions: Optional[FrozenSet[str]] = None, min_confidence: float = 0,
+                 symbols: Optional[FrozenSet[str]] = None, quiet_start: Optional[int] = None,
+                 quiet_end: Optional[int] = None):
+        self.directions = directions
+        self.min_confidence = min_confidence
+        self.symbols = symbols
+        self.quiet_start = quiet_start
+        self.quiet_end = quiet_end
+    
+    def quiet_hours(self) -> Set[int]:
+        """Jam WIB (0-23) di mana user tidak menerima sinyal; range boleh melewati tengah malam"""
+        if self.quiet_start is None or self.quiet_end is None or self.quiet_start == self.quiet_end:
+            return set()
+        if self.quiet_start < self.quiet_end:
+            return set(range(self.quiet_start, self.quiet_end))
+        return set(range(self.quiet_start, 24)) | set(range(0, self.quiet_end))
+    
+    def is_default(self) -> bool:
+        return (self.directions is None and self.min_confidence == 0 and self.symbols is None
+                and not self.quiet_hours())
+    
+    def matches(self, direction: str, confidence: float, symbol: str, hour: int) -> bool:
+        """Evaluasi langsung (referensi untuk index)"""
+        return ((self.directions is None or direction in self.directions)
+                and confidence >= self.min_confidence
+                and (self.symbols is None or symbol in self.symbols)
+                and hour not in self.quiet_hours())
+    
+    def describe(self) -> str:
+        quiet = self.quiet_hours()
+        return "\n".join([
+            f"Direction: {'/'.join(sorted(self.directions)) if self.directions else 'ALL'}",
+            f"Min confidence: {self.min_confidence:g}%",
+            f"Symbols: {', '.join(sorted(self.symbols)) if self.symbols else 'ALL'}",
+            f"Quiet hours (WIB): {f'{self.quiet_start:02d}:00-{self.quiet_end:02d}:00' if quiet else 'OFF'}",
+        ])
+    
+    def to_json(self) -> str:
+        return json.dumps({
+            "directions": sorted(self.directions) if self.directions else None,
+            "min_confidence": self.min_confidence,
+            "symbols": sorted(self.symbols) if self.symbols else None,
+            "quiet_start": self.quiet_start,
+            "quiet_end": self.quiet_end,
+        })
+    
+    @classmethod
+    def from_json(cls, data: str) -> "SubscriberFilter":
+        d = json.loads(data)
+        return cls(
+            directions=frozenset(d["directions"]) if d.get("directions") else None,
+            min_confidence=d.get("min_confidence", 0),
+            symbols=frozenset(d["symbols"]) if d.get("symbols") else None,
+            quiet_start=d.get("quiet_start"),
+            quiet_end=d.get("quiet_end"),
+        )
+
+
+DEFAULT_FILTER = SubscriberFilter()
+
+
+class FilterIndex:
+    """
+    Index recipient: (direction, confidence band, symbol) -> set chat_id, plus set quiet per jam
+    Lookup signal = satu/dua set + difference quiet, tidak mengevaluasi filter tiap user
+    
+    User masuk mulai dari band yang memuat min_confidence-nya; threshold yang tidak tepat di batas
+    band dicek ulang hanya untuk band signal itu sendiri (band di atasnya pasti lolos)
+    """
+    
+    def __init__(self):
+        self.buckets: Dict[Tuple[str, int, str], Set[int]] = {}
+        self.quiet_by_hour = [set() for _ in range(24)]
+        self.entries: Dict[int, SubscriberFilter] = {}
+        # band -> {chat_id: min_confidence} untuk threshold di dalam band (bukan di batasnya)
+        self.boundary: Dict[int, Dict[int, float]] = {}
+    
+    def _keys(self, f: SubscriberFilter):
+        directions = f.directions or DIRECTIONS
+        symbols = f.symbols or (ALL_SYMBOLS,)
+        floor = confidence_band(f.min_confidence)
+        bands = [b for b in CONFIDENCE_BANDS if b >= floor]
+        for direction in directions:
+            for band in bands:
+                for symbol in symbols:
+                    yield (direction, band, symbol)
+    
+    def add(self, chat_id: int, f: SubscriberFilter):
+        """Masukkan/replace chat_id dengan filter f"""
+        self.remove(chat_id)
+        self.entries[chat_id] = f
+        for key in self._keys(f):
+            self.buckets.setdefault(key, set()).add(chat_id)
+        floor = confidence_band(f.min_confidence)
+        if f.min_confidence > floor:
+            self.boundary.setdefault(floor, {})[chat_id] = f.min_confidence
+        for hour in f.quiet_hours():
+            self.quiet_by_hour[hour].add(chat_id)
+    
+    def remove(self, chat_id: int):
+        f = self.entries.pop(chat_id, None)
+        if f is None:
+            return
+        for key in self._keys(f):
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(chat_id)
+                if not bucket:
+                    del self.buckets[key]
+        floor = confidence_band(f.min_confidence)
+        boundary = self.boundary.get(floor)
+        if boundary is not None:
+            boundary.pop(chat_id, None)
+            if not boundary:
+                del self.boundary[floor]
+        for hour in f.quiet_hours():
+            self.quiet_by_hour[hour].discard(chat_id)
+    
+    def recipients(self, direction: str, confidence: float, symbol: str, hour: int) -> Set[int]:
+        """Chat yang menerima sinyal ini"""
+        band = confidence_band(confidence)
+        matched = self.buckets.get((direction, band, symbol), set()) | \
+            self.buckets.get((direction, band, ALL_SYMBOLS), set())
+        boundary = self.boundary.get(band)
+        if boundary:
+            below = {chat_id for chat_id, threshold in boundary.items() if confidence < threshold}
+            if below:
+                matched = matched - below
+        quiet = self.quiet_by_hour[hour]
+        return matched - quiet if quiet else matched
@@ -0,0 +1,336 @@
+"""
+Bulk import/export data historis (ticks, candles, trades)
+
+Semua jalur streaming per chunk sehingga memory konstan berapapun ukuran file.
+
+Usage:
+    python -m app.history import-candles data/xauusd_m1.csv.gz --timeframe M1
+    python -m app.history import-ticks data/ticks_2024.csv.xz --timeframe M1
+    python -m app.history export-candles out/m5.npz --timeframe M5
+    python -m app.history export-trades out/trades.csv
+"""
+import argparse
+import bz2
+import csv
+import gzip
+import io
+import logging
+import lzma
+import os
+import zipfile
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.aggregator import OHLCVAggregator
+from app.database import Database
+
+logger = logging.getLogger(__name__)
+
+CANDLE_COLUMNS = ('timestamp_utc', 'open', 'high', 'low', 'close', 'volume')
+
+# Nama kolom yang dikenali di header CSV
+TIMESTAMP_ALIASES = ('timestamp_utc', 'timestamp', 'time', 'datetime', 'date')
+FIELD_ALIASES = {
+    'open': ('open', 'o'),
+    'high': ('high', 'h'),
+    'low': ('low', 'l'),
+    'close': ('close', 'c'),
+    'volume': ('volume', 'vol', 'v', 'tick_volume'),
+    'bid': ('bid',),
+    'ask': ('ask',),
+}
+
+
+def open_text(path: str, mode: str = 'rt'):
+    """Buka file teks, otomatis dekompresi berdasarkan ekstensi (.gz, .bz2, .xz, .zip)"""
+    lower = path.lower()
+    if lower.endswith('.gz'):
+        return gzip.open(path, mode, newline='')
+    if lower.endswith('.bz2'):
+        return bz2.open(path, mode, newline='')
+    if lower.endswith('.xz') or lower.endswith('.lzma'):
+        return lzma.open(path, mode, newline='')
+    if lower.endswith('.zip') and 'r' in mode:
+        # Ambil member pertama di arsip. Member yang sudah dibuka memegang referensi file arsip
+        # sendiri, jadi file baru tertutup saat wrapper ditutup (archive boleh close di sini)
+        with zipfile.ZipFile(path) as archive:
+            return io.TextIOWrapper(archive.open(archive.namelist()[0]), newline='')
+    return open(path, mode, newline='')
+
+
+def parse_timestamp(value: str) -> float:
+    """Parse epoch (s/ms) atau ISO datetime ke epoch seconds UTC"""
+    value = value.strip()
+    try:
+        ts = float(value)
+        # Epoch milliseconds
+        return ts / 1000.0 if ts > 1e11 else ts
+    except ValueError:
+        pass
+    
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _resolve_columns(header: List[str], required: Tuple[str, ...],
+                     optional: Tuple[str, ...] = ()) -> Dict[str, int]:
+    """Map field ke index kolom CSV berdasarkan header"""
+    normalized = [h.strip().lower() for h in header]
+    columns = {}
+    
+    for alias in TIMESTAMP_ALIASES:
+        if alias in normalized:
+            columns['timestamp'] = normalized.index(alias)
+            break
+    
+    for field in required + optional:
+        for alias in FIELD_ALIASES[field]:
+            if alias in normalized:
+                columns[field] = normalized.index(alias)
+                break
+    
+    missing = [f for f in ('timestamp',) + required if f not in columns]
+    if missing:
+        raise ValueError(f"Kolom tidak ditemukan di header CSV: {', '.join(missing)}")
+    return columns
+
+
+def read_candles_csv(path: str) -> Iterator[Tuple]:
+    """Stream candle dari CSV: yields (timestamp_utc, open, high, low, close, volume)"""
+    with open_text(path) as f:
+        reader = csv.reader(f)
+        columns = _resolve_columns(next(reader), ('open', 'high', 'low', 'close'), ('volume',))
+        ts_idx = columns['timestamp']
+        o, h, l, c = columns['open'], columns['high'], columns['low'], columns['close']
+        v = columns.get('volume')
+        
+        for row in reader:
+            if not row:
+                continue
+            yield (
+                int(parse_timestamp(row[ts_idx])),
+                float(row[o]), float(row[h]), float(row[l]), float(row[c]),
+                int(float(row[v])) if v is not None and row[v] else 0
+            )
+
+
+def read_ticks_csv(path: str) -> Iterator[Tuple[float, float, float]]:
+    """Stream tick dari CSV: yields (timestamp, bid, ask)"""
+    with open_text(path) as f:
+        reader = csv.reader(f)
+        columns = _resolve_columns(next(reader), ('bid', 'ask'))
+        ts_idx, bid_idx, ask_idx = columns['timestamp'], columns['bid'], columns['ask']
+        
+        for row in reader:
+            if not row:
+                continue
+            yield parse_timestamp(row[ts_idx]), float(row[bid_idx]), float(row[ask_idx])
+
+
+def aggregate_ticks(ticks: Iterable[Tuple[float, float, float]], timeframe: str = "M1",
+                    stats: Optional[Dict] = None) -> Iterator[Tuple]:
+    """
+    Aggregate stream tick (urut waktu) menjadi candle OHLCV pakai mid price
+    Hanya satu candle yang dipegang di memory; tick mundur waktu di-skip
+    """
+    seconds = OHLCVAggregator._get_timeframe_seconds(timeframe)
+    bucket = None
+    o = h = l = c = 0.0
+    volume = 0
+    
+    for ts, bid, ask in ticks:
+        price = (bid + ask) / 2
+        tick_bucket = int(ts // seconds) * seconds
+        
+        if bucket is None or tick_bucket > bucket:
+            if bucket is not None:
+                yield bucket, o, h, l, c, volume
+            bucket = tick_bucket
+            o = h = l = c = price
+            volume = 1
+        elif tick_bucket == bucket:
+            h = max(h, price)
+            l = min(l, price)
+            c = price
+            volume += 1
+        elif stats is not None:
+            stats['out_of_order'] = stats.get('out_of_order', 0) + 1
+    
+    if bucket is not None:
+        yield bucket, o, h, l, c, volume
+
+
+def _counted(rows: Iterable[Tuple], stats: Dict, key: str) -> Iterator[Tuple]:
+    """Hitung jumlah row yang lewat tanpa materialisasi"""
+    for row in rows:
+        stats[key] += 1
+        yield row
+
+
+def import_candles(db: Database, path: str, timeframe: str, chunk_size: int = 50000) -> Dict:
+    """Import candle CSV ke ohlcv_cache"""
+    stats = {'read': 0, 'inserted': 0}
+    stats['inserted'] = db.add_ohlcv_bulk(
+        timeframe, _counted(read_candles_csv(path), stats, 'read'), chunk_size
+    )
+    stats['duplicates'] = stats['read'] - stats['inserted']
+    logger.info(f"Imported {stats['inserted']}/{stats['read']} {timeframe} candles from {path}")
+    return stats
+
+
+def import_ticks(db: Database, path: str, timeframe: str, chunk_size: int = 50000) -> Dict:
+    """Import tick CSV, aggregate ke candle timeframe, lalu simpan ke ohlcv_cache"""
+    stats = {'ticks': 0, 'read': 0, 'inserted': 0, 'out_of_order': 0}
+    ticks = _counted(read_ticks_csv(path), stats, 'ticks')
+    candles = _counted(aggregate_ticks(ticks, timeframe, stats), stats, 'read')
+    stats['inserted'] = db.add_ohlcv_bulk(timeframe, candles, chunk_size)
+    stats['duplicates'] = stats['read'] - stats['inserted']
+    logger.info(f"Imported {stats['ticks']} ticks as {stats['inserted']} {timeframe} candles from {path}")
+    return stats
+
+
+def export_candles_csv(db: Database, timeframe: str, path: str,
+                       start: Optional[int] = None, end: Optional[int] = None) -> int:
+    """Export candle ke CSV (boleh .gz/.bz2/.xz)"""
+    count = 0
+    with open_text(path, 'wt') as f:
+        writer = csv.writer(f)
+        writer.writerow(CANDLE_COLUMNS)
+        for rows in db.iter_ohlcv(timeframe, start, end):
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def export_trades_csv(db: Database, path: str) -> int:
+    """Export semua trade ke CSV (boleh .gz/.bz2/.xz)"""
+    count = 0
+    with open_text(path, 'wt') as f:
+        writer = csv.writer(f)
+        writer.writerow(Database.TRADE_EXPORT_COLUMNS)
+        for rows in db.iter_trades():
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def _write_npz_stream(path: str, name: str, dtype, total: int, chunks: Iterable[List[Tuple]]) -> int:
+    """
+    Tulis satu structured array ke .npz secara streaming
+    Header .npy ditulis dulu dengan shape = total, lalu data per chunk
+    """
+    import numpy as np
+    
+    written = 0
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as zf:
+        with zf.open(f'{name}.npy', 'w', force_zip64=True) as member:
+            np.lib.format.write_array_header_2_0(member, {
+                'descr': np.lib.format.dtype_to_descr(dtype),
+                'fortran_order': False,
+                'shape': (total,),
+            })
+            for rows in chunks:
+                # Snapshot di-cap ke total saat export dimulai
+                rows = rows[:total - written]
+                if not rows:
+                    break
+                member.write(np.array(rows, dtype=dtype).tobytes())
+                written += len(rows)
+            
+            if written < total:
+                raise RuntimeError(f"Row berkurang selama export: {written} < {total}")
+    return written
+
+
+def export_candles_npz(db: Database, timeframe: str, path: str,
+                       start: Optional[int] = None, end: Optional[int] = None) -> int:
+    """Export candle ke NumPy .npz (array 'candles', structured dtype)"""
+    import numpy as np
+    
+    dtype = np.dtype([
+        ('timestamp_utc', '<i8'), ('open', '<f8'), ('high', '<f8'),
+        ('low', '<f8'), ('close', '<f8'), ('volume', '<i8'),
+    ])
+    total = db.count_ohlcv(timeframe, start, end)
+    return _write_npz_stream(path, 'candles', dtype, total, db.iter_ohlcv(timeframe, start, end))
+
+
+def export_trades_npz(db: Database, path: str) -> int:
+    """Export trade ke NumPy .npz (array 'trades', structured dtype)"""
+    import numpy as np
+    
+    dtype = np.dtype([
+        ('signal_id', 'U64'), ('ticker', 'U16'), ('direction', 'U8'),
+        ('entry_price', '<f8'), ('exit_price', '<f8'), ('sl', '<f8'), ('tp', '<f8'),
+        ('signal_timestamp', 'U32'), ('status', 'U16'), ('confidence', '<f8'),
+        ('pips_gained', '<f8'), ('virtual_pl_usd', '<f8'), ('is_evaluation_mode', '?'),
+    ])
+    
+    def _clean(chunks):
+        # NULL dari SQLite -> NaN / string kosong agar cocok dengan dtype
+        for rows in chunks:
+            yield [
+                tuple(
+                    ('' if kind == 'U' else (float('nan') if kind == 'f' else False)) if v is None else v
+                    for v, kind in zip(row, (dtype[i].kind for i in range(len(row))))
+                )
+                for row in rows
+            ]
+    
+    total = db.count_trades()
+    return _write_npz_stream(path, 'trades', dtype, total, _clean(db.iter_trades()))
+
+
+def main(argv: Optional[List[str]] = None):
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description="Bulk import/export data historis XauScalp Sentinel")
+    parser.add_argument('--db', default=os.getenv('DATABASE_URL', 'sqlite:////workspaces/Freexausdbot/app/data/bot.db'),
+                        help="Database URL (default: $DATABASE_URL)")
+    parser.add_argument('--chunk-size', type=int, default=50000, help="Rows per transaksi")
+    sub = parser.add_subparsers(dest='command', required=True)
+    
+    p = sub.add_parser('import-candles', help="Import candle CSV (timestamp,open,high,low,close[,volume])")
+    p.add_argument('path')
+    p.add_argument('--timeframe', default='M1')
+    
+    p = sub.add_parser('import-ticks', help="Import tick CSV (timestamp,bid,ask) dan aggregate ke candle")
+    p.add_argument('path')
+    p.add_argument('--timeframe', default='M1')
+    
+    p = sub.add_parser('export-candles', help="Export candle ke .csv[.gz] atau .npz")
+    p.add_argument('path')
+    p.add_argument('--timeframe', default='M1')
+    p.add_argument('--start', type=parse_timestamp, default=None)
+    p.add_argument('--end', type=parse_timestamp, default=None)
+    
+    p = sub.add_parser('export-trades', help="Export trade ke .csv[.gz] atau .npz")
+    p.add_argument('path')
+    
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s')
+    db = Database(db_url=args.db)
+    
+    if args.command == 'import-candles':
+        result = import_candles(db, args.path, args.timeframe, args.chunk_size)
+    elif args.command == 'import-ticks':
+        result = import_ticks(db, args.path, args.timeframe, args.chunk_size)
+    elif args.command == 'export-candles':
+        start = int(args.start) if args.start is not None else None
+        end = int(args.end) if args.end is not None else None
+        if args.path.lower().endswith('.npz'):
+            result = export_candles_npz(db, args.timeframe, args.path, start, end)
+        else:
+            result = export_candles_csv(db, args.timeframe, args.path, start, end)
+    else:
+        if args.path.lower().endswith('.npz'):
+            result = export_trades_npz(db, args.path)
+        else:
+            result = export_trades_csv(db, args.path)
+    
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+logger = logging.getLogger(__name__)
+
+REASONS = {
+    200: "OK", 204: "No Content", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+    405: "Method Not Allowed", 408: "Request Timeout", 413: "Payload Too Large", 429: "Too Many Requests",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error", 503: "Service Unavailable",
+}
+
+
+class HttpRequest:
+    """Request HTTP yang sudah di-parse"""
+    __slots__ = ('method', 'path', 'query', 'headers', 'body')
+    
+    def __init__(self, method: str, path: str, query: Dict[str, str], headers: Dict[str, str], body: bytes):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers  # nama header lowercase
+        self.body = body
+
+
+# Handler return (status, content_type, body)
+Response = Tuple[int, str, bytes]
+Handler = Callable[[HttpRequest], Awaitable[Response]]
+
+
+def text_response(status: int, text: str, content_type: str = "text/plain; charset=utf-8") -> Response:
+    return status, content_type, text.encode()
+
+
+class HttpServer:
+    """
+    HTTP/1.1 server minimal di atas asyncio (keep-alive, Content-Length body)
+    Jalan di event loop yang sama dengan bot; dipakai untuk webhook Telegram dan endpoint internal
+    Port publik: jumlah/ukuran header dan body dibatasi, koneksi yang diam > idle_timeout ditutup
+    """
+    
+    def __init__(self, host: str = "0.0.0.0", port: int = 8080, max_body: int = 1 << 20,
+                 max_headers: int = 64, max_line: int = 8192, idle_timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.max_body = max_body
+        self.max_headers = max_headers
+        self.max_line = max_line
+        self.idle_timeout = idle_timeout
+        self.routes: Dict[Tuple[str, str], Handler] = {}
+        self.prefix_routes: List[Tuple[str, str, Handler]] = []
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.connections: Dict[asyncio.StreamWriter, asyncio.Task] = {}
+        self.requests = 0
+    
+    def route(self, method: str, path: str, handler: Handler, prefix: bool = False):
+        """Daftarkan handler untuk method + path (prefix=True: semua path yang diawali path)"""
+        if prefix:
+            self.prefix_routes.append((method.upper(), path, handler))
+        else:
+            self.routes[(method.upper(), path)] = handler
+    
+    def _resolve(self, method: str, path: str) -> Tuple[Optional[Handler], bool]:
+        handler = self.routes.get((method, path))
+        if handler is not None:
+            return handler, True
+        path_known = any(p == path for _, p in self.routes)
+        for m, p, h in self.prefix_routes:
+            if path.startswith(p):
+                if m == method:
+                    return h, True
+                path_known = True
+        return None, path_known
+    
+    async def start(self):
+        # limit: baris request/header lebih panjang dari max_line -> readline ValueError, koneksi ditutup
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port, limit=self.max_line)
+        if self.port == 0:
+            self.port = self.server.sockets[0].getsockname()[1]
+        logger.info(f"HTTP server listening on {self.host}:{self.port}")
+    
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            # Tutup koneksi keep-alive dan tunggu handler selesai supaya shutdown bersih
+            tasks = list(self.connections.values())
+            for writer, task in list(self.connections.items()):
+                writer.close()
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await self.server.wait_closed()
+            self.server = None
+    
+    async def _read(self, awaitable):
+        """Read dengan idle timeout (slowloris / keep-alive yang tidak pernah dipakai)"""
+        return await asyncio.wait_for(awaitable, self.idle_timeout)
+    
+    async def _read_headers(self, reader: asyncio.StreamReader) -> Optional[Dict[str, str]]:
+        """Header lowercase; None jika melebihi max_headers"""
+        headers = {}
+        while True:
+            line = await self._read(reader.readline())
+            if line in (b'\r\n', b'\n', b''):
+                return headers
+            if len(headers) >= self.max_headers:
+                return None
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                request_line = await self._read(reader.readline())
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._write(writer, text_response(400, "bad request line"), False)
+                    break
+                
+                headers = await self._read_headers(reader)
+                if headers is None:
+                    await self._write(writer, text_response(431, "too many headers"), False)
+                    break
+                
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._write(writer, text_response(400, "bad content-length"), False)
+                    break
+                if length > self.max_body:
+                    await self._write(writer, text_response(413, "payload too large"), False)
+                    break
+                body = await self._read(reader.readexactly(length)) if length else b''
+                
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                url = urlsplit(target)
+                request = HttpRequest(method.upper(), url.path, dict(parse_qsl(url.query)), headers, body)
+                await self._write(writer, await self._dispatch(request), keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError,
+                ConnectionError, asyncio.CancelledError):
+            # Timeout idle, baris terlalu panjang, atau client putus: tutup koneksi tanpa respons
+            pass
+        finally:
+            self.connections.pop(writer, None)
+            writer.close()
+    
+    async def _dispatch(self, request: HttpRequest) -> Response:
+        self.requests += 1
+        handler, path_known = self._resolve(request.method, request.path)
+        if handler is None:
+            return text_response(405 if path_known else 404, "method not allowed" if path_known else "not found")
+        try:
+            return await handler(request)
+        except Exception as e:
+            logger.error(f"HTTP handler error {request.method} {request.path}: {e}", exc_info=True)
+            return text_response(500, "internal error")
+    
+    @staticmethod
+    async def _write(writer: asyncio.StreamWriter, response: Response, keep_alive: bool):
+        status, content_type, body = response
+        head = (
+            f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
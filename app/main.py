@@ -3,9 +3,7 @@ import logging
 import os
 import sys
 import time
-import threading
-from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 import json
 from dotenv import load_dotenv
 
@@ -22,39 +20,91 @@ logging.basicConfig(
     ]
 )
 logger = logging.getLogger(__name__)
+# httpx log satu baris INFO per request Bot API; terlalu mahal di jalur kirim
+logging.getLogger('httpx').setLevel(logging.WARNING)
 
 # Import modules
 from app.ws_manager import ExnessWebSocket
-from app.aggregator import OHLCVAggregator
-from app.strategy import SignalStrategy
+from app.ring import RingFeed, TickRing
+from app.pipeline import SymbolPipeline
+from app.symbols import load_symbols, load_pip_sizes, pip_size_for
 from app.risk_manager import RiskManager
 from app.database import Database
 from app.bot import TelegramBot
+from app.http_server import HttpServer, text_response
+from app.metrics import REGISTRY, LoopLagMonitor, SlowLog, StageTimer, format_stages, process_rss_bytes
+from app.compute import ComputeStage
+from app.clock import Clock, clock_from_env
+from app.tracing import Tracer
+
+
+# Hanya penjadwalan + cleanup; evaluasi yang ditunggu diukur di signal_evaluation_seconds
+SIGNAL_SCHEDULE_SECONDS = REGISTRY.histogram('signal_loop_schedule_seconds',
+                                             "Durasi penjadwalan evaluasi + cleanup per iterasi signal loop")
+EVALUATION_SECONDS = REGISTRY.histogram('signal_evaluation_seconds', "Candle close -> hasil evaluasi di event loop")
+STAGE_SECONDS = REGISTRY.histogram('signal_stage_seconds', "Durasi per stage evaluasi signal", ('stage',))
+SIGNALS_TOTAL = REGISTRY.counter('signals_generated_total', "Signal yang dikirim", ('symbol', 'direction'))
+SIGNALS_BLOCKED = REGISTRY.counter('signals_blocked_total', "Signal yang ditolak risk manager", ('symbol', 'reason'))
+
+
+def _reason_label(reason: str) -> str:
+    """'Delay too high: 6.1s > 5s' -> 'delay_too_high' (label tanpa angka)"""
+    return reason.split(':')[0].strip().lower().replace(' ', '_')
 
 
 class BotOrchestrator:
-    def __init__(self):
+    def __init__(self, clock: Optional[Clock] = None):
         logger.info("=" * 50)
         logger.info("XauScalp Sentinel v2.2.0 - BOT START")
         logger.info("=" * 50)
         
         # Initialize components
-        self.ws_manager = ExnessWebSocket(
-            ws_url=os.getenv('WS_URL', 'wss://ws-json.exness.com/realtime'),
-            pair="XAUUSD"
-        )
+        # Clock jalur tick (feed, candle, cooldown, loop); latency/probe tetap memakai waktu nyata
+        self.clock = clock or clock_from_env()
+        self.symbols = load_symbols()
+        pip_sizes = load_pip_sizes()
         
-        self.aggregator = OHLCVAggregator("XAUUSD")
+        ring_name = os.getenv('FEED_RING_NAME')
+        if ring_name:
+            # Mode multi-process: tick datang dari proses feed lewat shared memory ring
+            self.ws_manager = RingFeed(TickRing.attach(ring_name), pairs=self.symbols, pip_sizes=pip_sizes,
+                                       clock=self.clock)
+        else:
+            self.ws_manager = ExnessWebSocket(
+                ws_url=os.getenv('WS_URL', 'wss://ws-json.exness.com/realtime'),
+                pairs=self.symbols,
+                pip_sizes=pip_sizes,
+                clock=self.clock
+            )
         
-        self.strategy = SignalStrategy({
+        strategy_config = {
             'ema_fast': int(os.getenv('EMA_PERIODS_FAST', 5)),
             'ema_med': int(os.getenv('EMA_PERIODS_MED', 10)),
             'ema_slow': int(os.getenv('EMA_PERIODS_SLOW', 20)),
             'rsi_period': int(os.getenv('RSI_PERIOD', 14)),
             'atr_period': int(os.getenv('ATR_PERIOD', 14)),
-        })
+        }
+        
+        # One pipeline (aggregator + strategy) per symbol, fed by the WS dispatch table
+        self.pipelines = {}
+        for symbol in self.symbols:
+            pipeline = SymbolPipeline(symbol, pip_size_for(symbol, pip_sizes), strategy_config, self.clock)
+            self.ws_manager.subscribe(symbol, pipeline.on_tick)
+            self.pipelines[symbol] = pipeline
+        
+        # Primary symbol components
+        self.aggregator = self.pipelines[self.symbols[0]].aggregator
+        self.strategy = self.pipelines[self.symbols[0]].strategy
         
-        self.risk_manager = RiskManager()
+        self.risk_manager = RiskManager(self.clock)
+        
+        # CPU stage (aggregasi + indikator) di luar event loop, dipicu candle M1 close
+        self.compute = ComputeStage(clock=self.clock)
+        self.evaluations: Dict[str, asyncio.Task] = {}
+        self.evaluated_seq: Dict[str, int] = {}
+        self.slow_log = SlowLog("evaluations")
+        self.tracer = Tracer(clock=self.clock)
+        self.loop_lag = LoopLagMonitor()
         
         self.database = Database(
             db_url=os.getenv('DATABASE_URL', 'sqlite:////workspaces/Freexausdbot/app/data/bot.db')
@@ -74,170 +124,307 @@ class BotOrchestrator:
             ws_manager=self.ws_manager,
             risk_manager=self.risk_manager,
             strategy=self.strategy,
-            database=self.database
+            database=self.database,
+            pipelines=self.pipelines,
+            clock=self.clock
         )
         
-        self.last_m1_candle = None
-        self.last_m5_candle = None
-        self.m1_candles = []
-        self.m5_candles = []
+        # Telegram update mode: polling (default) atau webhook lewat embedded HTTP server
+        self.telegram_mode = os.getenv('TELEGRAM_MODE', 'polling').lower()
+        self.http_server = HttpServer(port=int(os.getenv('PORT', 8080)),
+                                      idle_timeout=float(os.getenv('HTTP_IDLE_TIMEOUT_SECONDS', 30)))
+        
         self.running = True
-        self.last_cleanup = time.time()
+        self.last_cleanup = self.clock.time()
+        self.started_at = time.time()
+        self.last_loop_iteration: Optional[float] = None
+        self.telegram_ready = False
+        self.liveness_timeout = float(os.getenv('LIVENESS_TIMEOUT_SECONDS', 30))
+        # Feed menyerah (reconnect habis) atau putus terlalu lama -> /live 503 supaya platform restart
+        self.feed_down_timeout = float(os.getenv('FEED_DOWN_TIMEOUT_SECONDS', 600))
+        self.feed_down_since: Optional[float] = None
+        self.feed_task: Optional[asyncio.Task] = None
+        
+        # Endpoint probe + metrics selalu aktif (Koyeb health check), webhook ikut di server yang sama
+        self.http_server.route("GET", "/metrics", self.handle_metrics)
+        self.http_server.route("GET", "/live", self.handle_live)
+        self.http_server.route("GET", "/ready", self.handle_ready)
+        self._register_metrics()
         
         logger.info(f"✅ Authorized users: {self.authorized_users}")
         logger.info(f"✅ Admin users: {self.admin_users}")
         logger.info(f"✅ Evaluation mode: {self.risk_manager.evaluation_mode}")
+        logger.info(f"✅ Symbols: {', '.join(self.symbols)}")
     
-    def run_websocket(self):
-        """Run WebSocket connection in background thread"""
-        logger.info("Starting WebSocket connection...")
-        try:
-            self.ws_manager.connect()
-        except Exception as e:
-            logger.error(f"WebSocket error: {e}")
+    def _register_metrics(self):
+        """Metric yang dibaca saat scrape dari counter komponen (tanpa biaya per tick)"""
+        ws = self.ws_manager
+        REGISTRY.counter('ticks_received_total', "Tick diterima per symbol", ('symbol',),
+                         fn=lambda: {(p,): q.tick_count for p, q in ws.quotes.items()})
+        REGISTRY.counter('candles_closed_total', "Candle M1 closed per symbol", ('symbol',),
+                         fn=lambda: {(s,): p.closed_m1_seq for s, p in self.pipelines.items()})
+        REGISTRY.counter('ws_reconnects_total', "Reconnect WebSocket", fn=lambda: ws.reconnect_count)
+        REGISTRY.counter('ws_stale_total', "Reconnect karena feed diam", fn=lambda: ws.stale_count)
+        REGISTRY.gauge('ws_connected', "1 jika feed terhubung", fn=lambda: int(ws.connected))
+        REGISTRY.gauge('quote_age_seconds', "Umur quote terakhir per symbol", ('symbol',),
+                       fn=lambda: {(p,): q.get_delay(self.clock.time()) for p, q in ws.quotes.items()})
+        REGISTRY.counter('evaluations_dropped_total', "Evaluasi yang di-drop karena deadline",
+                         fn=lambda: self.compute.stats['dropped_queued'] + self.compute.stats['dropped_late'])
+        REGISTRY.gauge('subscribers', "Jumlah subscriber", fn=lambda: len(self.telegram_bot.subscribers))
+        REGISTRY.gauge('process_resident_memory_bytes', "RSS proses", fn=process_rss_bytes)
+        REGISTRY.gauge('process_start_time_seconds', "Waktu start proses (epoch)", fn=lambda: self.started_at)
+    
+    async def handle_metrics(self, request):
+        return text_response(200, REGISTRY.render(), "text/plain; version=0.0.4; charset=utf-8")
+    
+    async def handle_live(self, request):
+        """Liveness: event loop menjawab, signal loop masih berputar dan feed belum menyerah"""
+        if self.feed_task is not None and self.feed_task.done():
+            return text_response(503, "feed stopped")
+        if self.last_loop_iteration is None:
+            return text_response(200, "starting")
+        now = time.monotonic()
+        idle = now - self.last_loop_iteration
+        if self.running and idle > self.liveness_timeout:
+            return text_response(503, f"signal loop stalled for {idle:.0f}s")
+        if self.feed_down_since is not None and now - self.feed_down_since > self.feed_down_timeout:
+            return text_response(503, f"feed disconnected for {now - self.feed_down_since:.0f}s")
+        return text_response(200, "ok")
+    
+    async def handle_ready(self, request):
+        """Readiness: feed terhubung dan Telegram sudah menerima update"""
+        data = self.telegram_bot.status.as_dict()
+        checks = {
+            "feed": data["ws"]["connected"],
+            "telegram": self.telegram_ready,
+            "status_age_seconds": round(data["age_seconds"], 3),
+        }
+        ready = checks["feed"] and checks["telegram"]
+        return text_response(200 if ready else 503, json.dumps(checks), "application/json")
     
     async def run_signal_loop(self):
         """Main signal generation loop"""
         logger.info("Starting signal generation loop...")
         
         while self.running:
+            self.last_loop_iteration = time.monotonic()
             try:
                 # Check WebSocket connection
                 if not self.ws_manager.connected:
+                    if self.feed_down_since is None:
+                        self.feed_down_since = self.last_loop_iteration
                     logger.warning("WebSocket disconnected, waiting...")
-                    await asyncio.sleep(5)
-                    continue
-                
-                # Get current price
-                bid = self.ws_manager.current_bid
-                ask = self.ws_manager.current_ask
-                
-                if not (bid and ask):
-                    await asyncio.sleep(0.5)
+                    await self.clock.sleep(5)
                     continue
                 
-                # Add tick to aggregator
-                current_time = time.time()
-                self.aggregator.add_tick(bid, ask, current_time)
-                
-                # Aggregate M1 candle
-                m1_candle = self.aggregator.aggregate_to_timeframe("M1")
-                if m1_candle and (not self.last_m1_candle or m1_candle['timestamp'] != self.last_m1_candle['timestamp']):
-                    self.aggregator.update_cache("M1", m1_candle)
-                    self.m1_candles.append(m1_candle)
-                    if len(self.m1_candles) > 50:
-                        self.m1_candles = self.m1_candles[-50:]
-                    self.last_m1_candle = m1_candle
-                    logger.debug(f"M1 Candle: {m1_candle['close']:.2f}")
-                
-                # Aggregate M5 candle
-                m5_candle = self.aggregator.aggregate_to_timeframe("M5")
-                if m5_candle and (not self.last_m5_candle or m5_candle['timestamp'] != self.last_m5_candle['timestamp']):
-                    self.aggregator.update_cache("M5", m5_candle)
-                    self.m5_candles.append(m5_candle)
-                    if len(self.m5_candles) > 50:
-                        self.m5_candles = self.m5_candles[-50:]
-                    self.last_m5_candle = m5_candle
-                    logger.info(f"M5 Candle: {m5_candle['close']:.2f}")
-                
-                # Generate signals when we have enough candles
-                if len(self.m1_candles) >= 2 and len(self.m5_candles) >= 2:
-                    delay = self.ws_manager.get_current_delay()
-                    spread = self.ws_manager.get_spread()
-                    max_spread = float(os.getenv('MAX_SPREAD_PIPS', 5.0))
+                self.feed_down_since = None
+                with SIGNAL_SCHEDULE_SECONDS.time():
+                    # Event loop hanya menjadwalkan; evaluasi jalan di compute stage per candle close
+                    for pipeline in self.pipelines.values():
+                        self.schedule_evaluation(pipeline)
                     
-                    # Get indicator thresholds
-                    if self.risk_manager.evaluation_mode:
-                        min_conf = float(os.getenv('MIN_SIGNAL_CONFIDENCE_EVAL', 60.0))
-                    else:
-                        min_conf = float(os.getenv('MIN_SIGNAL_CONFIDENCE', 70.0))
-                    
-                    # Generate signal
-                    signal_type, confidence = self.strategy.generate_signal(
-                        self.m1_candles, self.m5_candles, bid, ask, spread, max_spread
-                    )
-                    
-                    # Check if we can generate signal
-                    can_generate, reason = self.risk_manager.can_generate_signal(
-                        delay, min_conf, confidence
-                    )
-                    
-                    if signal_type and can_generate and confidence >= min_conf:
-                        logger.info(f"✅ Signal: {signal_type} @ {ask:.2f} (Conf: {confidence:.0f}%)")
-                        
-                        # Calculate SL/TP
-                        m5_high = [c['high'] for c in self.m5_candles]
-                        m5_low = [c['low'] for c in self.m5_candles]
-                        m5_close = [c['close'] for c in self.m5_candles]
-                        
-                        atr = self.strategy.calculate_atr(m5_high, m5_low, m5_close)
-                        
-                        entry = ask if signal_type == "BUY" else bid
-                        sl, tp = self.strategy.calculate_sl_tp(
-                            entry,
-                            signal_type,
-                            atr,
-                            float(os.getenv('DEFAULT_SL_PIPS', 25.0)),
-                            float(os.getenv('DEFAULT_TP_PIPS', 45.0)),
-                            float(os.getenv('TP_RR_RATIO', 1.8)),
-                            float(os.getenv('SL_ATR_MULTIPLIER', 1.5))
-                        )
-                        
-                        # Calculate risk/reward
-                        pips_risk = abs(entry - sl) * 100
-                        pips_profit = abs(tp - entry) * 100
-                        
-                        # Record signal in database
-                        signal_id = f"eval_{int(time.time() * 1000)}"
-                        self.database.add_trade(
-                            signal_id,
-                            "XAUUSD",
-                            signal_type,
-                            entry,
-                            sl,
-                            tp,
-                            datetime.now().isoformat(),
-                            confidence,
-                            self.risk_manager.evaluation_mode
-                        )
-                        
-                        # Record in risk manager
-                        self.risk_manager.record_signal()
-                        
-                        # Send signal to Telegram
-                        await self.telegram_bot.send_signal(
-                            signal_type,
-                            entry,
-                            sl,
-                            tp,
-                            confidence,
-                            spread,
-                            delay,
-                            pips_risk
-                        )
-                    elif signal_type and not can_generate:
-                        logger.debug(f"Signal blocked: {reason}")
-                
-                # Cleanup old ticks
-                current_time = time.time()
-                if current_time - self.last_cleanup > 300:  # Every 5 minutes
-                    self.aggregator.clear_old_ticks()
-                    self.last_cleanup = current_time
+                    # Cleanup old ticks
+                    current_time = self.clock.time()
+                    if current_time - self.last_cleanup > 300:  # Every 5 minutes
+                        for pipeline in self.pipelines.values():
+                            pipeline.aggregator.clear_old_ticks()
+                        self.last_cleanup = current_time
                 
-                await asyncio.sleep(0.1)
+                await self.clock.sleep(0.1)
             
             except Exception as e:
                 logger.error(f"Error in signal loop: {e}", exc_info=True)
-                await asyncio.sleep(1)
+                await self.clock.sleep(1)
+    
+    def schedule_evaluation(self, pipeline: SymbolPipeline):
+        """Evaluasi symbol jika ada candle M1 close baru dan belum ada evaluasi yang berjalan"""
+        symbol = pipeline.symbol
+        if pipeline.closed_m1_seq == self.evaluated_seq.get(symbol, 0) or symbol in self.evaluations:
+            return
+        self.evaluated_seq[symbol] = pipeline.closed_m1_seq
+        task = asyncio.create_task(self.process_symbol(pipeline, self.clock.monotonic()))
+        self.evaluations[symbol] = task
+        task.add_done_callback(lambda t, s=symbol: self._evaluation_done(s, t))
+    
+    def _evaluation_done(self, symbol: str, task: asyncio.Task):
+        self.evaluations.pop(symbol, None)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Error evaluating {symbol}: {task.exception()}", exc_info=task.exception())
+    
+    async def process_symbol(self, pipeline: SymbolPipeline, event_time: Optional[float] = None):
+        """Evaluate signal for one symbol, dengan durasi per stage ke histogram dan slow log"""
+        timer = StageTimer()
+        if event_time is not None:
+            # Candle close terdeteksi -> task evaluasi mulai jalan
+            timer.add('schedule', self.clock.monotonic() - event_time)
+        try:
+            await self._evaluate_symbol(pipeline, event_time, timer)
+        finally:
+            for stage, seconds in timer.stages.items():
+                STAGE_SECONDS.observe(seconds, stage=stage)
+            self.slow_log.add(timer.total(), pipeline.symbol, timer.stages)
+    
+    async def _evaluate_symbol(self, pipeline: SymbolPipeline, event_time: Optional[float], timer: StageTimer):
+        """CPU di compute stage, risk check / DB / Telegram di event loop"""
+        symbol = pipeline.symbol
+        quote = self.ws_manager.quotes[symbol]
+        
+        if not (quote.bid and quote.ask):
+            return
+        
+        spread = self.ws_manager.get_spread(symbol)
+        max_spread = float(os.getenv('MAX_SPREAD_PIPS', 5.0))
+        
+        # Span tick pemicu (penutup candle M1) -> signal terkirim, disimpan di trades.trace
+        span = None
+        close_tick = pipeline.close_tick
+        if close_tick is not None:
+            span = self.tracer.start(f"{symbol}:{close_tick.seq}", close_tick.seq)
+        if span is not None:
+            if close_tick.timestamp is not None:
+                span.mark('tick_exchange', close_tick.timestamp)
+            span.mark('tick_recv', pipeline.close_tick_at)
+            span.mark('task_start')
+        
+        # Indikator off the event loop atas snapshot candle closed (state aggregator tetap milik event loop)
+        m1_candles, m5_candles = pipeline.snapshot()
+        result = await self.compute.run(
+            pipeline.evaluate, m1_candles, m5_candles, quote.bid, quote.ask, spread, max_spread, span,
+            event_time=event_time
+        )
+        compute_seconds = timer.mark('queue')
+        if result is None:
+            logger.warning(f"Evaluation {symbol} dropped (deadline {self.compute.deadline:.1f}s)")
+            return
+        # Pisahkan waktu tunggu executor dari kerja CPU yang diukur di compute thread
+        for stage, seconds in pipeline.stage_times.items():
+            timer.add(stage, seconds)
+            compute_seconds -= seconds
+        timer.stages['queue'] = max(0.0, compute_seconds)
+        signal_type, confidence, atr = result
+        if event_time is not None:
+            EVALUATION_SECONDS.observe(self.clock.monotonic() - event_time)
+        
+        # Harga dan delay terbaru untuk keputusan dan entry
+        bid = quote.bid
+        ask = quote.ask
+        delay = self.ws_manager.get_current_delay(symbol)
+        
+        # Get indicator thresholds
+        if self.risk_manager.evaluation_mode:
+            min_conf = float(os.getenv('MIN_SIGNAL_CONFIDENCE_EVAL', 60.0))
+        else:
+            min_conf = float(os.getenv('MIN_SIGNAL_CONFIDENCE', 70.0))
+        
+        # Check if we can generate signal
+        can_generate, reason = self.risk_manager.can_generate_signal(
+            delay, min_conf, confidence, symbol
+        )
+        timer.mark('risk')
+        if span is not None:
+            span.mark('risk')
+        
+        if signal_type and can_generate and confidence >= min_conf:
+            logger.info(f"✅ Signal: {symbol} {signal_type} @ {ask:.5f} (Conf: {confidence:.0f}%)")
+            
+            # Calculate SL/TP (ATR sudah dihitung di compute stage)
+            entry = ask if signal_type == "BUY" else bid
+            sl, tp = pipeline.strategy.calculate_sl_tp(
+                entry,
+                signal_type,
+                atr,
+                float(os.getenv('DEFAULT_SL_PIPS', 25.0)),
+                float(os.getenv('DEFAULT_TP_PIPS', 45.0)),
+                float(os.getenv('TP_RR_RATIO', 1.8)),
+                float(os.getenv('SL_ATR_MULTIPLIER', 1.5)),
+                pipeline.pip_size
+            )
+            
+            # Calculate risk/reward
+            pips_risk = abs(entry - sl) / pipeline.pip_size
+            timer.mark('risk')
+            
+            # Record signal in database
+            signal_id = f"eval_{symbol}_{int(self.clock.time() * 1000)}"
+            if span is not None:
+                span.attrs['signal_id'] = signal_id
+                span.mark('db_start')
+            await asyncio.to_thread(
+                self.database.add_trade,
+                signal_id,
+                symbol,
+                signal_type,
+                entry,
+                sl,
+                tp,
+                self.clock.now().isoformat(),
+                confidence,
+                self.risk_manager.evaluation_mode,
+                span.to_json() if span is not None else None
+            )
+            timer.mark('db')
+            if span is not None:
+                span.mark('db')
+            
+            # Record in risk manager
+            self.risk_manager.record_signal(symbol)
+            SIGNALS_TOTAL.inc(symbol=symbol, direction=signal_type)
+            pipeline.signal_count += 1
+            
+            # Send signal to Telegram
+            await self.telegram_bot.send_signal(
+                signal_type,
+                entry,
+                sl,
+                tp,
+                confidence,
+                spread,
+                delay,
+                pips_risk,
+                symbol=symbol,
+                pip_size=pipeline.pip_size,
+                span=span
+            )
+            timer.mark('telegram')
+            logger.info(f"⏱️ Signal {symbol} ready in {timer.total() * 1000:.0f}ms = {format_stages(timer.stages)}")
+            if span is not None:
+                await asyncio.to_thread(self.database.update_trade_trace, signal_id, span.to_json())
+                logger.info(f"🔎 Trace {signal_id}: tick #{span.seq}")
+        elif signal_type and not can_generate:
+            SIGNALS_BLOCKED.inc(symbol=symbol, reason=_reason_label(reason))
+            logger.debug(f"Signal blocked ({symbol}): {reason}")
     
     async def run_telegram_bot(self):
-        """Run Telegram bot"""
-        logger.info("Starting Telegram bot...")
+        """Run Telegram bot (polling atau webhook) sampai orchestrator berhenti"""
+        logger.info(f"Starting Telegram bot ({self.telegram_mode})...")
+        app = None
         try:
             app = self.telegram_bot.create_application()
-            await app.run_polling()
+            await app.initialize()
+            await app.start()
+            
+            if self.telegram_mode == 'webhook':
+                await self.telegram_bot.start_webhook(
+                    self.http_server,
+                    webhook_url=os.environ['WEBHOOK_URL'],
+                    path=os.getenv('WEBHOOK_PATH', '/telegram'),
+                    secret=os.getenv('WEBHOOK_SECRET') or None
+                )
+            else:
+                await app.updater.start_polling(drop_pending_updates=True)
+            self.telegram_ready = True
+            
+            while self.running:
+                await asyncio.sleep(1)
         except Exception as e:
             logger.error(f"Telegram bot error: {e}", exc_info=True)
+        finally:
+            self.telegram_ready = False
+            if app is not None and app.running:
+                if app.updater and app.updater.running:
+                    await app.updater.stop()
+                await app.stop()
+                await app.shutdown()
     
     async def run_health_check(self):
         """Run health check periodically"""
@@ -260,24 +447,38 @@ class BotOrchestrator:
                 logger.info(f"📊 Status - Trades: {risk_status['trades_today']}, "
                           f"Loss: {risk_status['daily_loss_percent']:.2f}%, "
                           f"Delay: {delay:.2f}s")
+                for pipeline in self.pipelines.values():
+                    p = pipeline.get_status()
+                    logger.info(f"📊 {p['symbol']} - Ticks: {p['tick_count']}, "
+                              f"CPU: {p['cpu_ms']:.1f}ms ({p['cpu_us_per_tick']:.1f}µs/tick), "
+                              f"Signals: {p['signal_count']}")
+                lag = self.loop_lag.histogram.summary()
+                logger.info(f"📊 Loop lag - p50: {lag['p50_ms']:.1f}ms, p99: {lag['p99_ms']:.1f}ms, "
+                          f"max: {lag['max_ms']:.1f}ms")
+                c = self.compute.get_status()
+                logger.info(f"📊 Compute - Completed: {c['completed']}, "
+                          f"Dropped: {c['dropped_queued'] + c['dropped_late']}, Errors: {c['errors']}")
                 
                 # Reset daily stats at midnight
-                now = datetime.now()
+                now = self.clock.now()
                 if now.hour == 0 and now.minute == 0:
                     logger.info("🔄 Resetting daily statistics...")
                     self.risk_manager.reset_daily_stats()
                 
-                await asyncio.sleep(3600)  # Check every hour
+                await self.clock.sleep(3600)  # Check every hour
             
             except Exception as e:
                 logger.error(f"Health check error: {e}")
-                await asyncio.sleep(60)
+                await self.clock.sleep(60)
     
     async def main(self):
         """Main async function"""
-        # Start WebSocket in background thread
-        ws_thread = threading.Thread(target=self.run_websocket, daemon=True)
-        ws_thread.start()
+        # Probe /live dan /ready sudah harus menjawab selama menunggu feed
+        await self.http_server.start()
+        
+        # Start WebSocket feed on the same event loop
+        logger.info("Starting WebSocket connection...")
+        feed_task = self.feed_task = asyncio.create_task(self.ws_manager.run())
         
         # Wait for WebSocket connection
         max_wait = 30
@@ -289,10 +490,18 @@ class BotOrchestrator:
         
         if not self.ws_manager.connected:
             logger.error("❌ Failed to connect to WebSocket")
+            await self.ws_manager.stop()
+            feed_task.cancel()
+            await self.http_server.stop()
             return
         
         logger.info("✅ WebSocket connected!")
         
+        # Status snapshot untuk /status, /health dan endpoint metrics
+        status_task = asyncio.create_task(self.telegram_bot.status.run())
+        ticker_task = asyncio.create_task(self.telegram_bot.ticker.run())
+        lag_task = asyncio.create_task(self.loop_lag.run())
+        
         # Run signal loop and Telegram bot concurrently
         try:
             await asyncio.gather(
@@ -306,6 +515,20 @@ class BotOrchestrator:
         except Exception as e:
             logger.error(f"Fatal error: {e}", exc_info=True)
             self.running = False
+        finally:
+            await self.ws_manager.stop()
+            feed_task.cancel()
+            self.telegram_bot.status.stop()
+            status_task.cancel()
+            self.compute.shutdown()
+            self.telegram_bot.ticker.stop()
+            ticker_task.cancel()
+            self.loop_lag.stop()
+            lag_task.cancel()
+            self.slow_log.flush()
+            self.telegram_bot.charts.shutdown()
+            await self.telegram_bot.subscribers.flush()
+            await self.http_server.stop()
 
 
 async def main():
@@ -315,6 +538,10 @@ async def main():
 
 
 if __name__ == "__main__":
+    if os.getenv('PROCESS_MODE', 'single').lower() == 'multi':
+        from app.supervisor import run_supervisor
+        run_supervisor()
+        sys.exit(0)
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
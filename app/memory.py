@@ -0,0 +1,171 @@
+import gc
+import logging
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.metrics import REGISTRY, process_rss_bytes
+
+logger = logging.getLogger(__name__)
+
+_CONTAINERS = (list, tuple, dict, set, frozenset)
+
+
+def estimate_bytes(obj, sample: int = 64, depth: int = 3) -> int:
+    """
+    Perkiraan footprint object beserta isinya (bukan sys.getsizeof yang hanya shell container)
+    Container besar diukur dari sample elemen lalu diskalakan, jadi biaya O(sample) bukan O(n).
+    Key dict tidak dihitung (umumnya string literal yang di-share antar record).
+    """
+    size = sys.getsizeof(obj)
+    if depth <= 0 or not isinstance(obj, _CONTAINERS):
+        return size
+    items = list(obj.values()) if isinstance(obj, dict) else obj
+    n = len(items)
+    if n == 0:
+        return size
+    if n <= sample:
+        picked = items if isinstance(items, (list, tuple)) else list(items)
+    else:
+        if not isinstance(items, (list, tuple)):
+            items = list(items)
+        step = n / sample
+        picked = [items[int(i * step)] for i in range(sample)]
+    total = sum(estimate_bytes(item, sample, depth - 1) for item in picked)
+    return size + int(total * n / len(picked))
+
+
+def format_bytes(n: float) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if n < 1024 or unit == 'GB':
+            return f"{n:.0f} {unit}" if unit == 'B' else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def gc_stats() -> Dict:
+    stats = gc.get_stats()
+    return {
+        "enabled": gc.isenabled(),
+        "counts": gc.get_count(),
+        "collections": [s['collections'] for s in stats],
+        "collected": [s['collected'] for s in stats],
+        "uncollectable": [s['uncollectable'] for s in stats],
+        "garbage": len(gc.garbage),
+    }
+
+
+class MemoryMonitor:
+    """
+    Akuntansi memory: RSS, ukuran struktur data utama (jumlah item + perkiraan byte) dan GC
+    Struktur didaftarkan sebagai getter supaya object yang diganti (mis. tick_buffer = [...]) tetap terbaca
+    """
+    
+    def __init__(self, max_age: float = 10.0):
+        self.max_age = max_age
+        self.started_at = time.time()
+        self.rss_at_start = process_rss_bytes()
+        self.structures: Dict[str, Callable[[], object]] = {}
+        self._snapshot: Optional[Dict] = None
+        self._snapshot_at = 0.0
+        # tracemalloc (admin toggle): baseline snapshot untuk diff
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.baseline_at = 0.0
+        REGISTRY.gauge('structure_items', "Jumlah item per struktur in-memory", ('name',),
+                       fn=lambda: {(name,): s['items'] for name, s in self.snapshot()['structures'].items()})
+        REGISTRY.gauge('structure_bytes', "Perkiraan byte per struktur in-memory", ('name',),
+                       fn=lambda: {(name,): s['bytes'] for name, s in self.snapshot()['structures'].items()})
+    
+    def track(self, name: str, getter: Callable[[], object]):
+        self.structures[name] = getter
+    
+    def snapshot(self, force: bool = False) -> Dict:
+        """RSS + struktur + GC, di-cache max_age detik (estimasi byte tidak gratis)"""
+        now = time.monotonic()
+        if not force and self._snapshot is not None and now - self._snapshot_at < self.max_age:
+            return self._snapshot
+        structures = {}
+        for name, getter in self.structures.items():
+            try:
+                obj = getter()
+                structures[name] = {"items": len(obj), "bytes": estimate_bytes(obj)}
+            except Exception as e:
+                logger.debug(f"Memory accounting {name} failed: {e}")
+        self._snapshot = {
+            "rss_bytes": process_rss_bytes(),
+            "rss_at_start": self.rss_at_start,
+            "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            "uptime_seconds": time.time() - self.started_at,
+            "structures": structures,
+            "gc": gc_stats(),
+            "tracemalloc": tracemalloc.is_tracing(),
+        }
+        self._snapshot_at = now
+        return self._snapshot
+    
+    # ---------- tracemalloc ----------
+    
+    def trace_start(self, frames: Optional[int] = None) -> str:
+        """Mulai tracemalloc dan ambil baseline (dipanggil di worker thread: snapshot bisa lambat)"""
+        frames = frames or int(os.getenv('TRACEMALLOC_FRAMES', 10))
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.baseline = tracemalloc.take_snapshot()
+        self.baseline_at = time.time()
+        return f"tracemalloc aktif ({frames} frame), baseline diambil"
+    
+    def trace_diff(self, top: int = 10, reset: bool = False) -> str:
+        """Pertumbuhan alokasi per lokasi sejak baseline (reset=True: snapshot ini jadi baseline baru)"""
+        if not tracemalloc.is_tracing() or self.baseline is None:
+            return "tracemalloc belum aktif (/memtrace start)"
+        snapshot = tracemalloc.take_snapshot()
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ]
+        stats = snapshot.filter_traces(filters).compare_to(self.baseline.filter_traces(filters), 'lineno')
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [
+            f"Diff {time.time() - self.baseline_at:.0f}s sejak baseline",
+            f"Traced: {format_bytes(current)} (peak {format_bytes(peak)})",
+            "",
+        ]
+        for stat in stats[:top]:
+            frame = stat.traceback[0]
+            filename = '/'.join(frame.filename.split('/')[-2:])
+            lines.append(f"{format_bytes(stat.size_diff):>9} ({stat.count_diff:+d}) {filename}:{frame.lineno}")
+        if reset:
+            self.baseline = snapshot
+            self.baseline_at = time.time()
+        return "\n".join(lines)
+    
+    def trace_stop(self) -> str:
+        if not tracemalloc.is_tracing():
+            return "tracemalloc tidak aktif"
+        tracemalloc.stop()
+        self.baseline = None
+        return "tracemalloc dimatikan"
+
+
+def render_memory(memory: Dict, limit: int = 12) -> str:
+    """Section Memory untuk /health"""
+    uptime = int(memory['uptime_seconds'])
+    gc_info = memory['gc']
+    lines = [
+        f"Uptime: {uptime // 86400}d {uptime % 86400 // 3600}h {uptime % 3600 // 60}m",
+        f"RSS: {format_bytes(memory['rss_bytes'])} (start {format_bytes(memory['rss_at_start'])}, "
+        f"peak {format_bytes(memory['peak_rss_bytes'])})",
+        f"GC gen0/1/2: {'/'.join(map(str, gc_info['counts']))} pending, "
+        f"{'/'.join(map(str, gc_info['collections']))} runs, "
+        f"{sum(gc_info['uncollectable'])} uncollectable",
+    ]
+    structures: List[Tuple[str, Dict]] = sorted(memory['structures'].items(), key=lambda kv: -kv[1]['bytes'])
+    for name, s in structures[:limit]:
+        lines.append(f"{name}: {s['items']:,} (~{format_bytes(s['bytes'])})")
+    if memory['tracemalloc']:
+        lines.append("tracemalloc: ON")
+    return "\n".join(lines)
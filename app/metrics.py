@@ -0,0 +1,402 @@
+import asyncio
+import bisect
+import heapq
+import logging
+import math
+import os
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class SlidingWindowCounter:
+    """
+    Counter sliding window dengan memory konstan (ring of buckets)
+    Rate = jumlah event di bucket yang masih dalam window / durasi yang dicakup bucket
+    """
+    __slots__ = ('window', 'width', 'size', 'counts', 'ids')
+    
+    def __init__(self, window: float, buckets: int = 10):
+        self.window = window
+        self.size = buckets
+        self.width = window / buckets
+        self.counts = [0] * buckets
+        self.ids = [-1] * buckets
+    
+    def add(self, n: int = 1, now: Optional[float] = None):
+        """Tambah n event pada waktu now (monotonic seconds)"""
+        idx = int((time.monotonic() if now is None else now) / self.width)
+        slot = idx % self.size
+        if self.ids[slot] != idx:
+            self.ids[slot] = idx
+            self.counts[slot] = 0
+        self.counts[slot] += n
+    
+    def total(self, now: Optional[float] = None) -> int:
+        """Jumlah event dalam window"""
+        idx = int((time.monotonic() if now is None else now) / self.width)
+        oldest = idx - self.size
+        return sum(c for c, i in zip(self.counts, self.ids) if i > oldest)
+    
+    def rate(self, now: Optional[float] = None) -> float:
+        """Event per detik dalam window (bucket berjalan dihitung sesuai porsi yang sudah lewat)"""
+        now = time.monotonic() if now is None else now
+        elapsed = self.window - self.width + (now % self.width)
+        return self.total(now) / elapsed if elapsed > 0 else 0.0
+
+
+class RateMeter:
+    """Beberapa sliding window counter sekaligus (default 1s, 10s, 60s)"""
+    
+    def __init__(self, windows: Sequence[float] = (1, 10, 60)):
+        self.counters = {w: SlidingWindowCounter(w, buckets=10 if w <= 10 else int(w)) for w in windows}
+    
+    def add(self, n: int = 1, now: Optional[float] = None):
+        """Catat n event"""
+        now = time.monotonic() if now is None else now
+        for counter in self.counters.values():
+            counter.add(n, now)
+    
+    def rates(self, now: Optional[float] = None) -> Dict[float, float]:
+        """Rate per window: {window_seconds: events_per_second}"""
+        now = time.monotonic() if now is None else now
+        return {w: c.rate(now) for w, c in self.counters.items()}
+
+
+def log_buckets(low: float = 1e-5, high: float = 100.0, per_octave: int = 4) -> List[float]:
+    """Upper bound bucket geometris dari low sampai high (detik)"""
+    count = int(math.ceil(math.log2(high / low) * per_octave))
+    return [low * 2 ** (i / per_octave) for i in range(count + 1)]
+
+
+DEFAULT_LATENCY_BUCKETS = log_buckets()
+
+
+class LatencyHistogram:
+    """
+    Histogram latency dengan bucket tetap (memory konstan)
+    Percentile diinterpolasi di dalam bucket, error relatif <= lebar bucket (~19%)
+    """
+    __slots__ = ('bounds', 'counts', 'count', 'sum', 'max')
+    
+    def __init__(self, bounds: Optional[List[float]] = None):
+        self.bounds = bounds or DEFAULT_LATENCY_BUCKETS
+        self.counts = [0] * (len(self.bounds) + 1)  # bucket terakhir = overflow
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, value: float):
+        """Catat satu sample (detik)"""
+        if value < 0:
+            value = 0.0
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+    
+    def percentile(self, q: float) -> float:
+        """Estimasi percentile q (0-100)"""
+        if not self.count:
+            return 0.0
+        
+        rank = q / 100 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                value = lower + (upper - lower) * ((rank - seen) / c)
+                return min(value, self.max)
+            seen += c
+        return self.max
+    
+    def summary(self) -> Dict[str, float]:
+        """p50/p95/p99/mean/max dalam milidetik"""
+        return {
+            "count": self.count,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "mean_ms": (self.sum / self.count * 1000) if self.count else 0.0,
+            "max_ms": self.max * 1000,
+        }
+    
+    def reset(self):
+        """Kosongkan histogram"""
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+
+# ---------- Prometheus text exposition ----------
+
+DEFAULT_SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(labelnames: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="' + str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+             for n, v in zip(labelnames, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 fn: Optional[Callable[[], Union[float, Dict[LabelValues, float]]]] = None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        # fn: nilai dibaca saat scrape dari counter yang sudah ada (tanpa biaya di hot path)
+        self.fn = fn
+        self.values: Dict[LabelValues, float] = {}
+    
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[n]) for n in self.labelnames)
+    
+    def collect(self) -> Dict[LabelValues, float]:
+        if self.fn is None:
+            return self.values
+        value = self.fn()
+        return value if isinstance(value, dict) else {(): value}
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in self.collect().items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Counter monoton (opsional per label)"""
+    kind = "counter"
+    
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Nilai sesaat (opsional per label)"""
+    kind = "gauge"
+    
+    def set(self, value: float, **labels):
+        self.values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Histogram bucket tetap (cumulative le, _sum, _count) per label"""
+    kind = "histogram"
+    
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_SECONDS_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        self.series: Dict[LabelValues, List[float]] = {}  # counts per bucket + overflow, lalu sum
+    
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+    
+    def time(self, **labels) -> "_HistogramTimer":
+        """Context manager: observe durasi blok (perf_counter)"""
+        return _HistogramTimer(self, labels)
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        bounds = self.buckets + (math.inf,)
+        for key, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip(bounds, series[:-1]):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _HistogramTimer:
+    __slots__ = ('histogram', 'labels', 'start')
+    
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+        self.start = 0.0
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """
+    Registry metric untuk endpoint /metrics (format teks Prometheus 0.0.4)
+    counter/gauge/histogram bersifat get-or-create, jadi aman dipanggil ulang dengan nama yang sama
+    """
+    
+    def __init__(self, prefix: str = "xau_"):
+        self.prefix = prefix
+        self.metrics: Dict[str, _Metric] = {}
+    
+    def _get(self, cls, name: str, help: str, labelnames: Sequence[str], **kwargs):
+        name = self.prefix + name
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, help, labelnames, **kwargs)
+        elif kwargs.get('fn') is not None:
+            # Callback didaftarkan ulang (mis. orchestrator dibuat ulang): pakai object terbaru
+            metric.fn = kwargs['fn']
+        return metric
+    
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = (), fn=None) -> Counter:
+        return self._get(Counter, name, help, labelnames, fn=fn)
+    
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = (), fn=None) -> Gauge:
+        return self._get(Gauge, name, help, labelnames, fn=fn)
+    
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_SECONDS_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, labelnames, buckets=buckets)
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                lines.append(f"# {metric.name} collect failed: {e}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def process_rss_bytes() -> int:
+    """RSS proses saat ini (Linux /proc), fallback ke peak RSS dari getrusage"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# ---------- Stage timing & event loop lag ----------
+
+class StageTimer:
+    """Durasi stage berurutan dalam satu iterasi: mark(stage) menutup stage yang sedang berjalan"""
+    __slots__ = ('last', 'stages')
+    
+    def __init__(self):
+        self.last = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+    
+    def mark(self, stage: str) -> float:
+        now = time.perf_counter()
+        elapsed = now - self.last
+        self.stages[stage] = self.stages.get(stage, 0.0) + elapsed
+        self.last = now
+        return elapsed
+    
+    def add(self, stage: str, seconds: float):
+        """Stage yang diukur di tempat lain (mis. di compute thread)"""
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+    
+    def total(self) -> float:
+        return sum(self.stages.values())
+
+
+def format_stages(stages: Dict[str, float]) -> str:
+    return " + ".join(f"{stage} {seconds * 1000:.1f}" for stage, seconds in stages.items()) + " (ms)"
+
+
+class SlowLog:
+    """
+    N iterasi paling lambat per window, di-log dengan breakdown stage saat window berganti
+    Biaya per iterasi: satu heappushpop pada heap kecil
+    """
+    
+    def __init__(self, name: str, size: int = 5, window: Optional[float] = None):
+        self.name = name
+        self.size = size
+        self.window = window or float(os.getenv('SLOW_LOG_WINDOW_SECONDS', 300))
+        self.entries: List[Tuple[float, int, str, Dict[str, float]]] = []
+        self.window_start = time.monotonic()
+        self.count = 0
+    
+    def add(self, total: float, label: str, stages: Dict[str, float]):
+        now = time.monotonic()
+        if now - self.window_start >= self.window:
+            self.flush(now)
+        self.count += 1
+        entry = (total, self.count, label, stages)
+        if len(self.entries) < self.size:
+            heapq.heappush(self.entries, entry)
+        elif total > self.entries[0][0]:
+            heapq.heapreplace(self.entries, entry)
+    
+    def flush(self, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        if self.entries:
+            lines = [f"🐢 Slowest {self.name} ({now - self.window_start:.0f}s, {self.count} total):"]
+            for total, _, label, stages in sorted(self.entries, reverse=True):
+                lines.append(f"  {label} {total * 1000:.1f}ms = {format_stages(stages)}")
+            logger.info("\n".join(lines))
+        self.entries = []
+        self.count = 0
+        self.window_start = now
+
+
+class LoopLagMonitor:
+    """
+    Lag event loop: selisih wakeup aktual vs terjadwal dari sleep periodik
+    Lag besar berarti ada callback yang memblok loop (kerja CPU / I/O sinkron di event loop)
+    """
+    
+    def __init__(self, interval: float = 0.1, warn_threshold: Optional[float] = None):
+        self.interval = interval
+        self.warn_threshold = warn_threshold or float(os.getenv('LOOP_LAG_WARN_MS', 100)) / 1000
+        self.histogram = LatencyHistogram()
+        self.metric = REGISTRY.histogram('event_loop_lag_seconds', "Wakeup aktual - terjadwal event loop")
+        self.last_warning = 0.0
+        self.running = False
+    
+    async def run(self):
+        self.running = True
+        while self.running:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self.histogram.observe(lag)
+            self.metric.observe(lag)
+            if lag > self.warn_threshold and now - self.last_warning > 10:
+                self.last_warning = now
+                logger.warning(f"⚠️ Event loop lag {lag * 1000:.0f}ms")
+    
+    def stop(self):
+        self.running = False
@@ -0,0 +1,312 @@
+"""
+Mock Exness feed server untuk load dan soak testing offline
+
+Protokol sama dengan wss://ws-json.exness.com/realtime: client kirim
+{"type": "subscribe", "pairs": [...]}, server stream frame tick
+{"type": "tick", "pair", "bid", "ask", "timestamp" (ms), "seq"}.
+
+Usage:
+    python -m app.mock_feed serve --port 8765 --rate 2000 --jitter-ms 5 --malformed-rate 0.01
+    python -m app.mock_feed serve --journal data/ticks.csv.gz --rate 500
+    python -m app.mock_feed loadtest --rate 20000 --duration 30 --disconnect-every 10
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+BASE_PRICES = {"XAUUSD": 2035.0, "XAGUSD": 23.5, "EURUSD": 1.085, "GBPUSD": 1.27, "USDJPY": 149.5}
+
+
+class FeedConfig:
+    """Parameter injeksi untuk mock feed"""
+    
+    def __init__(self, rate: float = 100.0, jitter_ms: float = 0.0, burst_every: float = 0.0,
+                 burst_size: int = 0, disconnect_every: float = 0.0, malformed_rate: float = 0.0,
+                 heartbeat_every: float = 1.0, journal: Optional[str] = None, seed: Optional[int] = None):
+        self.rate = max(1.0, min(rate, 50000.0))
+        self.jitter_ms = jitter_ms
+        self.burst_every = burst_every
+        self.burst_size = burst_size
+        self.disconnect_every = disconnect_every
+        self.malformed_rate = malformed_rate
+        self.heartbeat_every = heartbeat_every
+        self.journal = journal
+        self.seed = seed
+
+
+class FeedStats:
+    """Counter server, shared antar proses saat loadtest"""
+    
+    def __init__(self):
+        self.ticks_sent = multiprocessing.Value('q', 0, lock=False)
+        self.malformed_sent = multiprocessing.Value('q', 0, lock=False)
+        self.disconnects = multiprocessing.Value('q', 0, lock=False)
+        self.connections = multiprocessing.Value('q', 0, lock=False)
+
+
+def synthetic_ticks(pairs: List[str], seed: Optional[int] = None) -> Iterator[Tuple[str, float, float]]:
+    """Random walk per pair, round-robin antar pair"""
+    rng = random.Random(seed)
+    prices = {p: BASE_PRICES.get(p, 1.0) for p in pairs}
+    while True:
+        for pair in pairs:
+            price = prices[pair] * (1 + rng.gauss(0, 5e-5))
+            prices[pair] = price
+            spread = price * 0.0001
+            yield pair, round(price, 5), round(price + spread, 5)
+
+
+def journal_ticks(path: str, pairs: List[str]) -> Iterator[Tuple[str, float, float]]:
+    """Replay tick dari journal (JSONL frame, atau CSV timestamp,bid,ask untuk pair pertama), diulang terus"""
+    from app.history import open_text, read_ticks_csv
+    
+    while True:
+        if path.endswith('.jsonl') or path.endswith('.jsonl.gz'):
+            with open_text(path) as f:
+                for line in f:
+                    data = json.loads(line)
+                    if data.get("type") == "tick" and data.get("pair") in pairs:
+                        yield data["pair"], float(data["bid"]), float(data["ask"])
+        else:
+            for _, bid, ask in read_ticks_csv(path):
+                yield pairs[0], bid, ask
+
+
+class MockFeedServer:
+    """WebSocket server yang meniru feed Exness"""
+    
+    def __init__(self, config: FeedConfig, stats: Optional[FeedStats] = None):
+        self.config = config
+        self.stats = stats or FeedStats()
+        self.rng = random.Random(config.seed)
+    
+    async def handler(self, ws, path: str = "/"):
+        """Satu koneksi client: tunggu subscribe, lalu stream tick"""
+        self.stats.connections.value += 1
+        try:
+            message = await asyncio.wait_for(ws.recv(), timeout=10)
+            data = json.loads(message)
+            pairs = [p for p in data.get("pairs", []) if isinstance(p, str)] or ["XAUUSD"]
+            logger.info(f"Client subscribed to {pairs}")
+            await self.stream(ws, pairs)
+        except (websockets.ConnectionClosed, asyncio.TimeoutError):
+            pass
+    
+    async def stream(self, ws, pairs: List[str]):
+        """Kirim tick sesuai rate dengan jitter, burst, disconnect dan frame rusak"""
+        config = self.config
+        source = journal_ticks(config.journal, pairs) if config.journal else synthetic_ticks(pairs, config.seed)
+        seq = 0
+        extra = 0
+        start = time.monotonic()
+        last_heartbeat = last_burst = start
+        disconnect_at = start + config.disconnect_every if config.disconnect_every else None
+        
+        while True:
+            now = time.monotonic()
+            
+            if disconnect_at and now >= disconnect_at:
+                self.stats.disconnects.value += 1
+                logger.info("Injecting disconnect")
+                await ws.close(code=1012, reason="mock restart")
+                return
+            
+            if config.burst_every and now - last_burst >= config.burst_every:
+                extra += config.burst_size
+                last_burst = now
+            
+            # Jumlah tick yang seharusnya sudah terkirim sejak start (plus burst)
+            due = int((now - start) * config.rate) + extra - seq
+            for _ in range(due):
+                if config.malformed_rate and self.rng.random() < config.malformed_rate:
+                    await ws.send(self.malformed_frame())
+                    self.stats.malformed_sent.value += 1
+                pair, bid, ask = next(source)
+                seq += 1
+                await ws.send(
+                    f'{{"type":"tick","pair":"{pair}","bid":{bid},"ask":{ask},'
+                    f'"timestamp":{int(time.time() * 1000)},"seq":{seq}}}'
+                )
+                self.stats.ticks_sent.value += 1
+            
+            if config.heartbeat_every and now - last_heartbeat >= config.heartbeat_every:
+                await ws.send('{"type":"heartbeat"}')
+                last_heartbeat = now
+            
+            delay = 0.001
+            if config.jitter_ms:
+                delay += self.rng.uniform(0, config.jitter_ms) / 1000
+            await asyncio.sleep(delay)
+    
+    def malformed_frame(self) -> str:
+        """Frame rusak: JSON terpotong, field hilang, atau tipe salah"""
+        return self.rng.choice([
+            '{"type":"tick","pair":"XAUUSD","bid":20',
+            '{"type":"tick","pair":"XAUUSD"}',
+            '{"type":"tick","pair":"XAUUSD","bid":"abc","ask":null}',
+            'not json at all',
+            '',
+        ])
+    
+    async def serve(self, host: str = "localhost", port: int = 8765):
+        """Jalankan server sampai di-cancel"""
+        async with websockets.serve(self.handler, host, port, max_queue=None):
+            logger.info(f"Mock Exness feed on ws://{host}:{port} @ {self.config.rate:.0f} tps")
+            await asyncio.Future()
+
+
+def _run_server_process(config: FeedConfig, stats: FeedStats, host: str, port: int):
+    """Entry point proses server untuk loadtest"""
+    logging.basicConfig(level=logging.WARNING)
+    try:
+        asyncio.run(MockFeedServer(config, stats).serve(host, port))
+    except KeyboardInterrupt:
+        pass
+
+
+async def run_loadtest(config: FeedConfig, duration: float, pairs: List[str],
+                       host: str = "localhost", port: int = 8765) -> Dict:
+    """
+    Jalankan server di proses terpisah dan pipeline bot (tanpa Telegram) terhadapnya
+    Mengukur tick hilang, waktu reconnect dan latency tick -> evaluasi signal
+    """
+    from app.main import BotOrchestrator
+    from app.metrics import LatencyHistogram
+    
+    stats = FeedStats()
+    server = multiprocessing.Process(target=_run_server_process, args=(config, stats, host, port), daemon=True)
+    server.start()
+    await asyncio.sleep(1.0)
+    
+    os.environ['WS_URL'] = f"ws://{host}:{port}"
+    os.environ['SYMBOLS'] = ','.join(pairs)
+    orchestrator = BotOrchestrator()
+    ws = orchestrator.ws_manager
+    # Reconnect cepat supaya yang terukur adalah waktu reconnect, bukan backoff
+    ws.handle_disconnect = lambda attempt: 0.05
+    
+    received = {'ticks': 0}
+    for pair in pairs:
+        ws.subscribe(pair, lambda tick: received.__setitem__('ticks', received['ticks'] + 1))
+    
+    reconnect_times = []
+    signal_latency = LatencyHistogram()
+    evaluated = {}
+    
+    original_on_close = ws.on_close
+    original_on_open = ws.on_open
+    disconnected_at = {}
+    
+    def on_close(code, reason):
+        disconnected_at['t'] = time.monotonic()
+        original_on_close(code, reason)
+    
+    async def on_open(conn):
+        if 't' in disconnected_at:
+            reconnect_times.append(time.monotonic() - disconnected_at.pop('t'))
+        await original_on_open(conn)
+    
+    ws.on_close = on_close
+    ws.on_open = on_open
+    
+    original_process = orchestrator.process_symbol
+    
+    async def process_symbol(pipeline, *args):
+        quote = ws.quotes[pipeline.symbol]
+        await original_process(pipeline, *args)
+        # Latency dari timestamp server sampai evaluasi selesai, sekali per tick baru
+        if quote.last_exchange_time and evaluated.get(pipeline.symbol) != quote.tick_count:
+            evaluated[pipeline.symbol] = quote.tick_count
+            signal_latency.observe(time.time() - quote.last_exchange_time)
+    
+    orchestrator.process_symbol = process_symbol
+    
+    feed_task = asyncio.create_task(ws.run())
+    loop_task = asyncio.create_task(orchestrator.run_signal_loop())
+    started = time.monotonic()
+    await asyncio.sleep(duration)
+    elapsed = time.monotonic() - started
+    
+    # Matikan server dulu, beri waktu client membaca frame yang masih di buffer
+    server.terminate()
+    server.join()
+    await asyncio.sleep(0.5)
+    ticks_received = received['ticks']
+    
+    orchestrator.running = False
+    await ws.stop()
+    feed_task.cancel()
+    loop_task.cancel()
+    
+    sent = stats.ticks_sent.value
+    return {
+        "duration_s": elapsed,
+        "target_tps": config.rate,
+        "ticks_sent": sent,
+        "ticks_received": ticks_received,
+        "ticks_dropped": max(0, sent - ticks_received),
+        "drop_rate": (max(0, sent - ticks_received) / sent) if sent else 0.0,
+        "received_tps": ticks_received / elapsed,
+        "malformed_sent": stats.malformed_sent.value,
+        "decoder_errors": ws.decoder.stats['errors'],
+        "disconnects": stats.disconnects.value,
+        "reconnect_ms": [round(t * 1000, 1) for t in reconnect_times],
+        "feed_latency": ws.feed_latency.summary(),
+        "tick_to_signal": signal_latency.summary(),
+    }
+
+
+def _add_feed_args(parser: argparse.ArgumentParser):
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--rate', type=float, default=100.0, help="Ticks per second (1 - 50000)")
+    parser.add_argument('--journal', default=None, help="Replay CSV/JSONL tick journal instead of synthetic")
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help="Random delay per send loop")
+    parser.add_argument('--burst-every', type=float, default=0.0, help="Seconds between bursts")
+    parser.add_argument('--burst-size', type=int, default=0, help="Extra ticks per burst")
+    parser.add_argument('--disconnect-every', type=float, default=0.0, help="Close connection every N seconds")
+    parser.add_argument('--malformed-rate', type=float, default=0.0, help="Probability of a malformed frame per tick")
+    parser.add_argument('--seed', type=int, default=None)
+
+
+def main(argv: Optional[List[str]] = None):
+    """CLI entry point"""
+    parser = argparse.ArgumentParser(description="Mock Exness feed server")
+    sub = parser.add_subparsers(dest='command', required=True)
+    _add_feed_args(sub.add_parser('serve', help="Run mock feed server"))
+    p = sub.add_parser('loadtest', help="Run server + bot pipeline and report drops/latency")
+    _add_feed_args(p)
+    p.add_argument('--duration', type=float, default=30.0)
+    p.add_argument('--pairs', default='XAUUSD')
+    
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s')
+    config = FeedConfig(
+        rate=args.rate, jitter_ms=args.jitter_ms, burst_every=args.burst_every,
+        burst_size=args.burst_size, disconnect_every=args.disconnect_every,
+        malformed_rate=args.malformed_rate, journal=args.journal, seed=args.seed
+    )
+    
+    if args.command == 'serve':
+        try:
+            asyncio.run(MockFeedServer(config).serve(args.host, args.port))
+        except KeyboardInterrupt:
+            pass
+    else:
+        pairs = [p.strip().upper() for p in args.pairs.split(',') if p.strip()]
+        result = asyncio.run(run_loadtest(config, args.duration, pairs, args.host, args.port))
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
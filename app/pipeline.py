@@ -0,0 +1,144 @@
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.aggregator import OHLCVAggregator
+from app.clock import SYSTEM_CLOCK, Clock
+from app.codec import Tick
+from app.strategy import SignalStrategy
+from app.tracing import Span
+
+logger = logging.getLogger(__name__)
+
+
+class _CpuTimer:
+    """Context manager: tambahkan CPU time thread ke pipeline"""
+    __slots__ = ('pipeline', 'start')
+    
+    def __init__(self, pipeline: "SymbolPipeline"):
+        self.pipeline = pipeline
+        self.start = 0.0
+    
+    def __enter__(self):
+        self.start = time.thread_time()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.pipeline.cpu_seconds += time.thread_time() - self.start
+        return False
+
+
+class SymbolPipeline:
+    """State per symbol: aggregator, strategy, candle history dan CPU accounting"""
+    
+    def __init__(self, symbol: str, pip_size: float, strategy_config: Dict, clock: Optional[Clock] = None):
+        self.symbol = symbol
+        self.pip_size = pip_size
+        self.clock = clock or SYSTEM_CLOCK
+        self.aggregator = OHLCVAggregator(symbol, self.clock)
+        self.strategy = SignalStrategy(strategy_config)
+        # Candle closed untuk strategy; copy-on-write (list baru tiap close) supaya compute thread
+        # bisa memakai list yang di-snapshot tanpa lock
+        self.m1_candles: List[Dict] = []
+        self.m5_candles: List[Dict] = []
+        self.tick_count = 0
+        self.signal_count = 0
+        self.cpu_seconds = 0.0
+        self.last_tick: Optional[Tick] = None
+        self.closed_m1_seq = 0  # naik setiap candle M1 close (event untuk compute stage)
+        self.stage_times: Dict[str, float] = {}  # durasi stage CPU evaluasi terakhir (detik)
+        # Tick yang menutup candle M1 terakhir + waktu terima (pemicu evaluasi, untuk tracing)
+        self.close_tick: Optional[Tick] = None
+        self.close_tick_at = 0.0
+    
+    @property
+    def forming_m1(self) -> Optional[Dict]:
+        """Candle M1 berjalan (di-update per tick)"""
+        return self.aggregator.forming_candle("M1")
+    
+    def cpu_timer(self) -> _CpuTimer:
+        """Ukur CPU time satu blok kerja untuk symbol ini"""
+        return _CpuTimer(self)
+    
+    def on_tick(self, tick: Tick):
+        """Handler dispatch table WebSocket: masukkan tick ke aggregator, simpan candle yang close"""
+        start = time.thread_time()
+        now = self.clock.time()
+        for candle in self.aggregator.add_tick(tick.bid, tick.ask, now):
+            self._on_candle_close(candle)
+            if candle['timeframe'] == "M1":
+                self.closed_m1_seq += 1
+                self.close_tick = tick
+                self.close_tick_at = now
+        self.last_tick = tick
+        self.tick_count += 1
+        self.cpu_seconds += time.thread_time() - start
+    
+    def _on_candle_close(self, candle: Dict):
+        """Candle lengkap (OHLCV final) ke cache aggregator dan history strategy"""
+        timeframe = candle['timeframe']
+        self.aggregator.update_cache(timeframe, candle)
+        if timeframe == "M1":
+            self.m1_candles = self.m1_candles[-49:] + [candle]
+            logger.debug(f"{self.symbol} M1 Candle: {candle['close']:.5f}")
+        elif timeframe == "M5":
+            self.m5_candles = self.m5_candles[-49:] + [candle]
+            logger.info(f"{self.symbol} M5 Candle: {candle['close']:.5f}")
+    
+    def snapshot(self) -> Tuple[List[Dict], List[Dict]]:
+        """Input evaluasi (dipanggil di event loop): list candle closed yang tidak akan diubah lagi"""
+        return self.m1_candles, self.m5_candles
+    
+    def evaluate(self, m1_candles: List[Dict], m5_candles: List[Dict], bid: float, ask: float, spread: float,
+                 max_spread: float, span: Optional[Span] = None) -> Tuple[Optional[str], float, float]:
+        """
+        Kerja CPU satu evaluasi (jalan di compute stage, bukan event loop)
+        Hanya memakai snapshot candle dari argumen, tidak menyentuh state aggregator
+        Returns: (signal_type, confidence, atr M5)
+        """
+        with self.cpu_timer():
+            if span is not None:
+                span.mark('eval_start')
+            start = time.perf_counter()
+            self.stage_times = {'indicators': 0.0}
+            if len(m1_candles) < 2 or len(m5_candles) < 2:
+                return None, 0.0, 0.0
+            
+            signal_type, confidence = self.strategy.generate_signal(
+                m1_candles, m5_candles, bid, ask, spread, max_spread
+            )
+            atr = 0.0
+            if signal_type:
+                atr = self.strategy.calculate_atr(
+                    [c['high'] for c in m5_candles],
+                    [c['low'] for c in m5_candles],
+                    [c['close'] for c in m5_candles]
+                )
+            self.stage_times['indicators'] = time.perf_counter() - start
+            if span is not None:
+                span.mark('indicators')
+                # Candle yang dipakai strategy (timestamp UTC)
+                span.attrs['m1'] = m1_candles[-1]['timestamp']
+                span.attrs['m5'] = m5_candles[-1]['timestamp']
+            return signal_type, confidence, atr
+    
+    def closed_candles(self, timeframe: str, count: int = 100) -> List[Dict]:
+        """Candle yang sudah closed (OHLCV final), terlama dulu"""
+        return self.aggregator.get_recent_candles(timeframe, count)
+    
+    def has_enough_candles(self) -> bool:
+        """Cukup candle untuk generate signal"""
+        return len(self.m1_candles) >= 2 and len(self.m5_candles) >= 2
+    
+    def get_status(self) -> Dict:
+        """Return status dan biaya CPU pipeline"""
+        return {
+            "symbol": self.symbol,
+            "pip_size": self.pip_size,
+            "tick_count": self.tick_count,
+            "m1_candles": len(self.m1_candles),
+            "m5_candles": len(self.m5_candles),
+            "signal_count": self.signal_count,
+            "cpu_ms": self.cpu_seconds * 1000,
+            "cpu_us_per_tick": (self.cpu_seconds * 1e6 / self.tick_count) if self.tick_count else 0
+        }
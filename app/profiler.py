@@ -0,0 +1,134 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Leaf frame yang berarti thread sedang menunggu (bukan kerja CPU)
+IDLE_LEAVES = {
+    ('selectors.py', 'select'),
+    ('threading.py', 'wait'),
+    ('thread.py', '_worker'),
+    ('queue.py', 'get'),
+    ('connection.py', 'wait'),
+}
+
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    parts = filename.replace('\\', '/').split('/')
+    short = '/'.join(parts[-2:]) if len(parts) > 1 else filename
+    return f"{code.co_name} ({short}:{code.co_firstlineno})"
+
+
+class ProfileResult:
+    """Hasil satu sesi sampling: stack collapsed -> jumlah sample"""
+    
+    def __init__(self, stacks: Counter, samples: int, duration: float, interval: float):
+        self.stacks = stacks
+        self.samples = samples
+        self.duration = duration
+        self.interval = interval
+    
+    def is_idle(self, stack: Tuple[str, ...]) -> bool:
+        leaf = stack[-1]
+        name, _, location = leaf.partition(' (')
+        return (location.split('/')[-1].split(':')[0], name) in IDLE_LEAVES
+    
+    def top(self, n: int = 15) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]], int]:
+        """(top self, top inclusive, jumlah sample idle); thread root tidak dihitung"""
+        own = Counter()
+        inclusive = Counter()
+        idle = 0
+        for stack, count in self.stacks.items():
+            if self.is_idle(stack):
+                idle += count
+                continue
+            own[stack[-1]] += count
+            for frame in set(stack[1:]):
+                inclusive[frame] += count
+        return own.most_common(n), inclusive.most_common(n), idle
+    
+    def summary(self, n: int = 15) -> str:
+        own, inclusive, idle = self.top(n)
+        busy = self.samples - idle
+        lines = [
+            f"Samples: {self.samples} ({self.duration:.1f}s @ {self.interval * 1000:.0f}ms, semua thread)",
+            f"Busy: {busy} | Idle/wait: {idle}",
+            "",
+            "Top self:",
+        ]
+        lines += [f"{count * 100 / max(busy, 1):5.1f}% {frame}" for frame, count in own]
+        lines += ["", "Top inclusive:"]
+        lines += [f"{count * 100 / max(busy, 1):5.1f}% {frame}" for frame, count in inclusive]
+        return "\n".join(lines)
+    
+    def write_collapsed(self, path: str) -> str:
+        """Format collapsed stack (flamegraph.pl / speedscope): 'thread;f1;f2 count' per baris"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+        return path
+
+
+class SamplingProfiler:
+    """
+    Sampling profiler semua thread via sys._current_frames()
+    Tidak ada hook/thread saat idle; saat aktif biaya = satu snapshot stack per interval
+    """
+    
+    def __init__(self, interval: Optional[float] = None, max_seconds: Optional[float] = None):
+        self.interval = interval or float(os.getenv('PROFILE_INTERVAL_MS', 10)) / 1000
+        self.max_seconds = max_seconds or float(os.getenv('PROFILE_MAX_SECONDS', 60))
+        self.output_dir = os.getenv('PROFILE_DIR', '/app/data/profiles')
+        self._lock = threading.Lock()
+    
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+    
+    def profile(self, seconds: float) -> ProfileResult:
+        """Sampling selama seconds (blocking, jalankan di thread terpisah); ValueError jika sedang jalan"""
+        if not self._lock.acquire(blocking=False):
+            raise ValueError("Profiler sedang berjalan")
+        try:
+            return self._sample(min(seconds, self.max_seconds))
+        finally:
+            self._lock.release()
+    
+    def _sample(self, seconds: float) -> ProfileResult:
+        me = threading.get_ident()
+        stacks: Counter = Counter()
+        labels: Dict[object, str] = {}  # cache label per code object
+        samples = 0
+        started = time.monotonic()
+        deadline = started + seconds
+        next_at = started
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _frame_label(code)
+                    stack.append(label)
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                stack.reverse()
+                stacks[tuple(stack)] += 1
+                samples += 1
+            next_at += self.interval
+            time.sleep(max(0.0, next_at - time.monotonic()))
+        return ProfileResult(stacks, samples, time.monotonic() - started, self.interval)
+    
+    def output_path(self) -> str:
+        return os.path.join(self.output_dir, f"profile_{time.strftime('%Y%m%d_%H%M%S')}.folded")
@@ -0,0 +1,233 @@
+"""
+Replay tick historis/sintetis lewat BotOrchestrator lengkap di atas SimulatedClock
+
+Waktu hanya maju mengikuti timestamp tick, jadi satu hari market selesai dalam hitungan detik
+dan hasilnya (candle, signal, trade) identik di setiap run. Telegram tidak ikut.
+
+Usage:
+    python -m app.replay data/ticks.csv.gz --symbol XAUUSD
+    python -m app.replay data/journal.jsonl.gz --symbols XAUUSD,EURUSD
+    python -m app.replay --hours 24 --rate 2 --symbols XAUUSD --seed 42
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from app.clock import SimulatedClock
+from app.codec import Tick, TickDecoder
+from app.history import open_text, parse_timestamp, read_ticks_csv
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_START = '2024-01-02T00:00:00Z'
+
+
+def csv_ticks(path: str, symbol: str) -> Iterator[Tick]:
+    """Tick dari CSV timestamp,bid,ask (satu symbol)"""
+    for seq, (timestamp, bid, ask) in enumerate(read_ticks_csv(path), 1):
+        yield Tick(symbol, bid, ask, timestamp, seq)
+
+
+def journal_ticks(path: str, symbols: List[str]) -> Iterator[Tick]:
+    """Tick dari journal JSONL frame feed (timestamp wajib ada di frame)"""
+    decoder = TickDecoder(symbols)
+    with open_text(path) as f:
+        for line in f:
+            tick = decoder.decode(line)
+            if tick is not None and tick.timestamp is not None:
+                yield tick
+
+
+def synthetic_stream(symbols: List[str], hours: float, rate: float, start: float,
+                     seed: Optional[int] = 42) -> Iterator[Tick]:
+    """Random walk mock feed dengan timestamp rapat: rate tick/detik per symbol selama hours jam"""
+    from app.mock_feed import synthetic_ticks
+    
+    source = synthetic_ticks(symbols, seed)
+    step = 1.0 / (rate * len(symbols))
+    for seq in range(1, int(hours * 3600 * rate) * len(symbols) + 1):
+        pair, bid, ask = next(source)
+        yield Tick(pair, bid, ask, start + (seq - 1) * step, seq)
+
+
+class Replay:
+    """
+    Driver replay: tick di-dispatch pada waktu timestamp-nya, signal loop dan health check
+    bangun sesuai waktu simulasi, dan setiap evaluasi ditunggu selesai sebelum tick berikutnya
+    """
+    
+    def __init__(self, orchestrator, clock: SimulatedClock):
+        self.orchestrator = orchestrator
+        self.clock = clock
+        self.ticks = 0
+        self.dispatch_seconds = 0.0
+    
+    def _pending(self) -> bool:
+        """Ada candle M1 close yang belum dievaluasi (signal loop harus bangun tepat waktu)"""
+        evaluated = self.orchestrator.evaluated_seq
+        return any(p.closed_m1_seq != evaluated.get(p.symbol, 0) for p in self.orchestrator.pipelines.values())
+    
+    async def settle(self):
+        """Biarkan task yang dibangunkan jalan, lalu tunggu semua evaluasi selesai"""
+        await asyncio.sleep(0)
+        evaluations = self.orchestrator.evaluations
+        while evaluations:
+            await asyncio.gather(*list(evaluations.values()), return_exceptions=True)
+            await asyncio.sleep(0)
+    
+    async def advance_to(self, timestamp: float):
+        """
+        Majukan clock ke timestamp. Selama ada candle yang menunggu evaluasi, maju per wakeup
+        (loop bangun 0.1 detik setelah candle close seperti produksi); selain itu langsung lompat
+        """
+        clock = self.clock
+        while self._pending():
+            wakeup = clock.next_wakeup()
+            if wakeup is None or wakeup > timestamp:
+                break
+            clock.advance_to(wakeup)
+            await self.settle()
+        if clock.advance_to(timestamp):
+            await self.settle()
+    
+    async def run(self, ticks: Iterable[Tick]) -> Dict:
+        orchestrator = self.orchestrator
+        ws = orchestrator.ws_manager
+        ws.connected = True
+        tasks = [asyncio.create_task(orchestrator.run_signal_loop()),
+                 asyncio.create_task(orchestrator.run_health_check())]
+        await self.settle()
+        
+        started = time.perf_counter()
+        first = None
+        try:
+            for tick in ticks:
+                if first is None:
+                    first = tick.timestamp
+                await self.advance_to(tick.timestamp)
+                received = time.perf_counter()
+                ws.dispatch(tick, received)
+                self.dispatch_seconds += time.perf_counter() - received
+                self.ticks += 1
+            # Candle terakhir yang close ikut dievaluasi
+            await self.advance_to(self.clock.time() + 1)
+        finally:
+            orchestrator.running = False
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            orchestrator.compute.shutdown()
+        
+        elapsed = time.perf_counter() - started
+        simulated = self.clock.time() - first if first is not None else 0.0
+        return {
+            "ticks": self.ticks,
+            "simulated_seconds": round(simulated, 3),
+            "wall_seconds": round(elapsed, 3),
+            "speedup": round(simulated / elapsed, 1) if elapsed else 0.0,
+            "dispatch_us": round(self.dispatch_seconds / self.ticks * 1e6, 3) if self.ticks else 0.0,
+            "symbols": {
+                p.symbol: {"ticks": p.tick_count, "m1_closed": p.closed_m1_seq, "signals": p.signal_count}
+                for p in orchestrator.pipelines.values()
+            },
+            "compute": orchestrator.compute.get_status(),
+        }
+
+
+def trades_digest(database) -> Dict:
+    """Jumlah trade + sha256 semua baris trade (sama persis antar run jika replay deterministik)"""
+    digest = hashlib.sha256()
+    count = 0
+    for rows in database.iter_trades():
+        for row in rows:
+            digest.update(repr(row).encode())
+            count += 1
+    return {"trades": count, "digest": digest.hexdigest()}
+
+
+def replay(ticks: Iterable[Tick], symbols: List[str], start: float, db_path: Optional[str] = None,
+           env: Optional[Dict[str, str]] = None, orchestrator_hook=None) -> Dict:
+    """
+    Jalankan replay lengkap; DB sementara kecuali db_path diberikan
+    env meng-override konfigurasi selama replay, orchestrator_hook(orchestrator) dipanggil sebelum start
+    """
+    workdir = None
+    if db_path is None:
+        workdir = tempfile.mkdtemp(prefix="replay_")
+        db_path = os.path.join(workdir, 'replay.db')
+    overrides = dict(env or {}, DATABASE_URL=f"sqlite:///{db_path}", SYMBOLS=','.join(symbols))
+    saved = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    
+    try:
+        from app.main import BotOrchestrator
+        
+        clock = SimulatedClock(start)
+        orchestrator = BotOrchestrator(clock=clock)
+        if orchestrator_hook is not None:
+            orchestrator_hook(orchestrator)
+        summary = asyncio.run(Replay(orchestrator, clock).run(ticks))
+        summary.update(trades_digest(orchestrator.database))
+        return summary
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', nargs='?', default=None,
+                        help="CSV timestamp,bid,ask atau journal .jsonl (kosong = tick sintetis)")
+    parser.add_argument('--symbol', default=None, help="Symbol untuk tick CSV (default symbol pertama)")
+    parser.add_argument('--symbols', default=os.getenv('SYMBOLS', 'XAUUSD'))
+    parser.add_argument('--hours', type=float, default=24.0, help="Durasi tick sintetis")
+    parser.add_argument('--rate', type=float, default=2.0, help="Tick/detik per symbol (sintetis)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--start', default=DEFAULT_START, help="Awal tick sintetis (epoch/ISO UTC)")
+    parser.add_argument('--db', default=None, help="Simpan trade hasil replay ke SQLite ini")
+    parser.add_argument('--verbose', action='store_true', help="Log INFO per candle/signal")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if not args.verbose:
+        logging.disable(logging.INFO)
+    
+    symbols = [s.strip().upper() for s in args.symbols.split(',') if s.strip()]
+    if args.source is None:
+        start = parse_timestamp(args.start)
+        ticks = synthetic_stream(symbols, args.hours, args.rate, start, args.seed)
+    elif args.source.endswith('.jsonl') or args.source.endswith('.jsonl.gz'):
+        ticks = journal_ticks(args.source, symbols)
+    else:
+        symbols = [(args.symbol or symbols[0]).upper()]
+        ticks = csv_ticks(args.source, symbols[0])
+    
+    # Waktu mulai clock = timestamp tick pertama
+    ticks = iter(ticks)
+    first = next(ticks, None)
+    if first is None:
+        parser.error("Tidak ada tick di source")
+    
+    def with_first():
+        yield first
+        yield from ticks
+    
+    summary = replay(with_first(), symbols, first.timestamp, args.db)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import math
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+from app.clock import Clock
+from app.codec import Tick
+from app.metrics import LatencyHistogram
+from app.ws_manager import ExnessWebSocket
+
+logger = logging.getLogger(__name__)
+
+# Header: write_seq, read_seq, heartbeat, connected, reconnects, stale, dropped, capacity
+_HEADER = struct.Struct('<QQdQQQQQ')
+_HEADER_SIZE = 64
+# Slot: seq (1-based, validasi slot), pair index, bid, ask, exchange timestamp (NaN = tidak ada), waktu terima
+_SLOT = struct.Struct('<QI4xdddd')
+
+_U64 = struct.Struct('<Q')
+_OFF_WRITE = 0
+_OFF_READ = 8
+_OFF_FEED_STATE = 16
+_FEED_STATE = struct.Struct('<dQQQ')  # heartbeat, connected, reconnects, stale
+_OFF_DROPPED = 48
+_OFF_CAPACITY = 56
+
+
+class TickRing:
+    """
+    Ring buffer SPSC lock-free di shared memory (satu producer: proses feed, satu consumer: proses bot)
+    Producer hanya menulis write_seq, consumer hanya menulis read_seq; slot ditulis sebelum write_seq
+    dinaikkan. Ring penuh -> tick baru di-drop dan dihitung (producer tidak pernah menunggu consumer).
+    """
+    
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, owner: bool = False):
+        self.shm = shm
+        self.buf = shm.buf
+        self.capacity = capacity
+        self.owner = owner
+        self._read_seq = _U64.unpack_from(self.buf, _OFF_READ)[0]
+    
+    @property
+    def name(self) -> str:
+        return self.shm.name
+    
+    @classmethod
+    def create(cls, capacity: Optional[int] = None, name: Optional[str] = None) -> "TickRing":
+        """Alokasi ring baru (dipanggil supervisor, yang juga unlink saat selesai)"""
+        capacity = capacity or int(os.getenv('FEED_RING_CAPACITY', 65536))
+        shm = shared_memory.SharedMemory(name=name, create=True, size=_HEADER_SIZE + capacity * _SLOT.size)
+        shm.buf[:_HEADER_SIZE] = bytes(_HEADER_SIZE)
+        _U64.pack_into(shm.buf, _OFF_CAPACITY, capacity)
+        return cls(shm, capacity, owner=True)
+    
+    @classmethod
+    def attach(cls, name: str) -> "TickRing":
+        """Buka ring yang sudah dibuat proses lain"""
+        shm = shared_memory.SharedMemory(name=name)
+        capacity = _U64.unpack_from(shm.buf, _OFF_CAPACITY)[0]
+        return cls(shm, capacity)
+    
+    def push(self, pair_index: int, bid: float, ask: float, timestamp: Optional[float], received: float) -> bool:
+        """Producer: tulis satu tick; False jika ring penuh (tick di-drop)"""
+        buf = self.buf
+        write_seq = _U64.unpack_from(buf, _OFF_WRITE)[0]
+        if write_seq - _U64.unpack_from(buf, _OFF_READ)[0] >= self.capacity:
+            _U64.pack_into(buf, _OFF_DROPPED, _U64.unpack_from(buf, _OFF_DROPPED)[0] + 1)
+            return False
+        offset = _HEADER_SIZE + (write_seq % self.capacity) * _SLOT.size
+        _SLOT.pack_into(buf, offset, write_seq + 1, pair_index, bid, ask,
+                        math.nan if timestamp is None else timestamp, received)
+        # Publish setelah slot lengkap
+        _U64.pack_into(buf, _OFF_WRITE, write_seq + 1)
+        return True
+    
+    def drain(self, limit: int) -> List[Tuple[int, int, float, float, Optional[float], float]]:
+        """Consumer: ambil sampai limit tick (seq, pair_index, bid, ask, timestamp, received)"""
+        buf = self.buf
+        read_seq = self._read_seq
+        available = _U64.unpack_from(buf, _OFF_WRITE)[0] - read_seq
+        records = []
+        for _ in range(min(available, limit)):
+            seq, pair_index, bid, ask, timestamp, received = _SLOT.unpack_from(
+                buf, _HEADER_SIZE + (read_seq % self.capacity) * _SLOT.size
+            )
+            if seq != read_seq + 1:
+                # Slot belum konsisten (tidak seharusnya terjadi pada SPSC), coba lagi di poll berikutnya
+                break
+            records.append((seq, pair_index, bid, ask, None if timestamp != timestamp else timestamp, received))
+            read_seq += 1
+        if records:
+            self._read_seq = read_seq
+            _U64.pack_into(buf, _OFF_READ, read_seq)
+        return records
+    
+    def skip_backlog(self) -> int:
+        """Consumer: lompati tick yang belum dibaca (mis. setelah proses bot restart), return jumlahnya"""
+        write_seq = _U64.unpack_from(self.buf, _OFF_WRITE)[0]
+        skipped = write_seq - self._read_seq
+        self._read_seq = write_seq
+        _U64.pack_into(self.buf, _OFF_READ, write_seq)
+        return skipped
+    
+    def set_feed_state(self, connected: bool, reconnects: int, stale: int):
+        """Producer: heartbeat + status koneksi feed"""
+        _FEED_STATE.pack_into(self.buf, _OFF_FEED_STATE, time.time(), int(connected), reconnects, stale)
+    
+    def header(self) -> Dict:
+        write_seq, read_seq, heartbeat, connected, reconnects, stale, dropped, capacity = _HEADER.unpack_from(self.buf, 0)
+        return {
+            "write_seq": write_seq,
+            "read_seq": read_seq,
+            "backlog": write_seq - read_seq,
+            "heartbeat": heartbeat,
+            "connected": bool(connected),
+            "reconnects": reconnects,
+            "stale": stale,
+            "dropped": dropped,
+            "capacity": capacity,
+        }
+    
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class RingFeed(ExnessWebSocket):
+    """
+    Feed untuk proses bot di mode multi-process: tick dibaca dari TickRing, bukan dari WebSocket
+    Interface sama dengan ExnessWebSocket (quotes, subscribe, get_status, ...)
+    """
+    
+    def __init__(self, ring: TickRing, pairs: List[str], pip_sizes: Optional[Dict[str, float]] = None,
+                 poll_interval: Optional[float] = None, batch: int = 1024, clock: Optional[Clock] = None):
+        super().__init__(ws_url=f"shm://{ring.name}", pairs=pairs, pip_sizes=pip_sizes, clock=clock)
+        self.ring = ring
+        self.poll_interval = poll_interval or float(os.getenv('FEED_RING_POLL_MS', 2)) / 1000
+        self.batch = batch
+        self.heartbeat_timeout = float(os.getenv('FEED_HEARTBEAT_TIMEOUT', 5))
+        # Waktu terima di proses feed -> dibaca proses bot
+        self.ring_latency = LatencyHistogram()
+        self.dropped = 0
+        # Tick yang menunggu saat proses bot mati sudah basi untuk candle berjalan
+        skipped = ring.skip_backlog()
+        if skipped:
+            logger.warning(f"Skipped {skipped} stale ticks in ring {ring.name}")
+    
+    async def run(self):
+        """Poll ring dan dispatch tick ke handler symbol"""
+        self.running = True
+        ring = self.ring
+        pairs = self.pairs
+        while self.running:
+            header = ring.header()
+            self.connected = header["connected"] and time.time() - header["heartbeat"] < self.heartbeat_timeout
+            self.reconnect_count = header["reconnects"]
+            self.stale_count = header["stale"]
+            self.dropped = header["dropped"]
+            
+            records = ring.drain(self.batch)
+            if records:
+                received = time.perf_counter()
+                now = time.time()
+                for seq, pair_index, bid, ask, timestamp, feed_received in records:
+                    self.ring_latency.observe(now - feed_received)
+                    # Sequence ID = posisi di ring (tetap monoton walau proses feed restart)
+                    self.dispatch(Tick(pairs[pair_index], bid, ask, timestamp, seq), received)
+            # Batch penuh: masih ada backlog, lanjut tanpa tidur
+            await asyncio.sleep(0 if len(records) == self.batch else self.poll_interval)
+    
+    async def stop(self):
+        self.running = False
+    
+    def get_latency_stats(self) -> Dict:
+        stats = super().get_latency_stats()
+        stats["ring"] = self.ring_latency.summary()
+        return stats
+    
+    def get_status(self) -> Dict:
+        status = super().get_status()
+        status["ring_dropped"] = self.dropped
+        return status
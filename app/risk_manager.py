@@ -3,28 +3,31 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, Optional, Tuple
 
+from app.clock import SYSTEM_CLOCK, Clock
+
 logger = logging.getLogger(__name__)
 
 
 class RiskManager:
-    def __init__(self):
+    def __init__(self, clock: Optional[Clock] = None):
+        self.clock = clock or SYSTEM_CLOCK
         self.evaluation_mode = os.getenv('EVALUATION_MODE', 'false').lower() == 'true'
         self.virtual_balance = 1000000  # Representasi modal
         self.trades_today = 0
         self.daily_loss_usd = 0
         self.last_signal_time = 0
+        self.last_signal_times: Dict[str, float] = {}  # {symbol: time}
         self.is_paused = False
         self.daily_loss_list = []
         self.trades_list = []
         
     def can_generate_signal(self, current_delay: float, min_signal_confidence: float,
-                          signal_confidence: float) -> Tuple[bool, str]:
+                          signal_confidence: float, symbol: Optional[str] = None) -> Tuple[bool, str]:
         """
         Check all risk conditions sebelum generate signal
+        Cooldown dihitung per symbol jika symbol diberikan
         Returns: (can_generate, reason)
         """
-        import time
-        
         # 1. DELAY CHECK (selalu aktif)
         max_delay = float(os.getenv('MAX_TICK_DELAY_SECONDS', 3.0))
         if current_delay > max_delay:
@@ -51,8 +54,10 @@ class RiskManager:
         else:
             cooldown = float(os.getenv('SIGNAL_COOLDOWN_SECONDS', 180))
         
-        if time.time() - self.last_signal_time < cooldown:
-            return False, f"Cooldown active: {time.time() - self.last_signal_time:.0f}s < {cooldown}s"
+        last_signal_time = self.last_signal_times.get(symbol, 0) if symbol else self.last_signal_time
+        elapsed = self.clock.time() - last_signal_time
+        if elapsed < cooldown:
+            return False, f"Cooldown active: {elapsed:.0f}s < {cooldown}s"
         
         # 5. MAX TRADES CHECK (skip jika eval mode)
         if not self.evaluation_mode:
@@ -72,10 +77,11 @@ class RiskManager:
         
         return True, "OK"
     
-    def record_signal(self):
+    def record_signal(self, symbol: Optional[str] = None):
         """Record when signal is generated"""
-        import time
-        self.last_signal_time = time.time()
+        self.last_signal_time = self.clock.time()
+        if symbol:
+            self.last_signal_times[symbol] = self.last_signal_time
         self.trades_today += 1
     
     def record_trade_result(self, pips_gained: float, lot_size: float = 0.01):
@@ -84,7 +90,7 @@ class RiskManager:
         pl_usd = pips_gained * 10 * lot_size
         self.daily_loss_usd += pl_usd
         self.trades_list.append({
-            'timestamp': datetime.now(),
+            'timestamp': self.clock.now(),
             'pips': pips_gained,
             'pl_usd': pl_usd
         })
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from app.memory import render_memory
+
+logger = logging.getLogger(__name__)
+
+
+class StatusSnapshot:
+    """Status bot pada satu titik waktu, termasuk pesan /status dan /health yang sudah di-render"""
+    __slots__ = ('created', 'data', 'status_message', 'health_message')
+    
+    def __init__(self, created: float, data: Dict, status_message: str, health_message: str):
+        self.created = created
+        self.data = data
+        self.status_message = status_message
+        self.health_message = health_message
+    
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.monotonic() if now is None else now) - self.created
+
+
+def render_status(ws_status: Dict, risk_status: Dict, subscribers: int) -> str:
+    return f"""
+🟢 **STATUS BOT**
+
+📊 Mode: **{'EVALUATION UNLIMITED' if risk_status['evaluation_mode'] else 'PRODUCTION'}**
+🤖 Bot Status: **{'PAUSED' if risk_status['is_paused'] else 'RUNNING'}**
+
+**WebSocket:**
+Status: **{'🟢 Connected' if ws_status['connected'] else '🔴 Disconnected'}**
+Delay: {ws_status['delay_seconds']:.2f}s
+Tick Rate: {ws_status['tick_rate_tps']:.2f} tps
+Spread: {ws_status['spread_pips']:.2f} pips
+Price: BID {ws_status['current_bid'] or 0:.2f} / ASK {ws_status['current_ask'] or 0:.2f}
+
+**Trading:**
+Trades Today: {risk_status['trades_today']}
+Max/Day: {risk_status['max_trades_per_day']}
+Daily Loss: {risk_status['daily_loss_percent']:.2f}%
+Balance: ${risk_status['virtual_balance']:,}
+
+📈 Subscribers: {subscribers}
+"""
+
+
+def render_health(ws_status: Dict, risk_status: Dict, pipelines: Dict[str, Dict],
+                  memory: Optional[Dict] = None) -> str:
+    feed_lat = ws_status['latency']['feed']
+    proc_lat = ws_status['latency']['process']
+    
+    msg = f"""
+🏥 **BOT HEALTH CHECK**
+
+**WebSocket:**
+Status: **{'🟢 OK' if ws_status['connected'] else '🔴 ERROR'}**
+Delay: {ws_status['delay_seconds']:.3f}s
+Tick Rate: {ws_status['tick_rate_1s']:.1f} / {ws_status['tick_rate_10s']:.1f} / {ws_status['tick_rate_tps']:.1f} tps (1s/10s/60s)
+Reconnects: {ws_status['reconnect_count']}
+Ticks (uptime): {ws_status['tick_count']}
+
+**Latency (p50/p95/p99):**
+Feed: {feed_lat['p50_ms']:.0f} / {feed_lat['p95_ms']:.0f} / {feed_lat['p99_ms']:.0f} ms ({feed_lat['count']} samples)
+Process: {proc_lat['p50_ms']:.2f} / {proc_lat['p95_ms']:.2f} / {proc_lat['p99_ms']:.2f} ms
+
+**Trading Engine:**
+Mode: {'EVAL' if risk_status['evaluation_mode'] else 'PROD'}
+Trades: {risk_status['trades_today']}
+Loss: {risk_status['daily_loss_percent']:.2f}%
+Paused: {'YES' if risk_status['is_paused'] else 'NO'}
+
+**Memory:**
+```
+{render_memory(memory) if memory else 'n/a'}
+```
+"""
+    if pipelines:
+        msg += "\n**Symbols (CPU):**\n"
+        for p in pipelines.values():
+            msg += (f"{p['symbol']}: {p['tick_count']} ticks, {p['cpu_ms']:.0f}ms "
+                    f"({p['cpu_us_per_tick']:.1f}µs/tick), {p['signal_count']} signals\n")
+    return msg
+
+
+class StatusCache:
+    """
+    Snapshot status yang di-refresh background task maksimal sekali per interval
+    Command /status dan /health hanya mengirim pesan yang sudah di-render
+    """
+    
+    def __init__(self, ws_manager, risk_manager, subscribers, pipelines: Optional[Dict] = None,
+                 interval: float = 1.0, memory=None):
+        self.ws_manager = ws_manager
+        self.risk_manager = risk_manager
+        self.subscribers = subscribers
+        self.pipelines = pipelines or {}
+        self.interval = interval
+        self.memory = memory
+        self.snapshot: Optional[StatusSnapshot] = None
+        self.refresh_count = 0
+        self.running = False
+    
+    def refresh(self) -> StatusSnapshot:
+        """Hitung ulang status dan render pesan"""
+        ws_status = self.ws_manager.get_status()
+        risk_status = self.risk_manager.get_status()
+        pipelines = {symbol: p.get_status() for symbol, p in self.pipelines.items()}
+        subscribers = len(self.subscribers)
+        # MemoryMonitor men-cache hasilnya sendiri (estimasi byte tidak dihitung tiap refresh)
+        memory = self.memory.snapshot() if self.memory else None
+        
+        data = {
+            "generated_at": time.time(),
+            "ws": ws_status,
+            "risk": risk_status,
+            "pipelines": pipelines,
+            "subscribers": subscribers,
+            "memory": memory,
+        }
+        self.snapshot = StatusSnapshot(
+            time.monotonic(), data,
+            render_status(ws_status, risk_status, subscribers),
+            render_health(ws_status, risk_status, pipelines, memory)
+        )
+        self.refresh_count += 1
+        return self.snapshot
+    
+    def get(self) -> StatusSnapshot:
+        """Snapshot terakhir; refresh di tempat hanya jika background task tertinggal/tidak jalan"""
+        snapshot = self.snapshot
+        max_age = self.interval * 2 if self.running else self.interval
+        if snapshot is None or snapshot.age() >= max_age:
+            snapshot = self.refresh()
+        return snapshot
+    
+    def as_dict(self) -> Dict:
+        """Snapshot dalam bentuk dict (untuk endpoint metrics)"""
+        snapshot = self.get()
+        return dict(snapshot.data, age_seconds=snapshot.age())
+    
+    async def run(self):
+        """Background task: refresh snapshot setiap interval"""
+        self.running = True
+        while self.running:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Status refresh error: {e}")
+            await asyncio.sleep(self.interval)
+    
+    def stop(self):
+        self.running = False
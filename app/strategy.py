@@ -1,6 +1,4 @@
 import logging
-import numpy as np
-import pandas as pd
 from typing import Dict, List, Tuple, Optional
 
 logger = logging.getLogger(__name__)
@@ -16,16 +14,15 @@ class SignalStrategy:
         if len(closes) < period:
             return []
         
-        closes_array = np.array(closes)
         ema_values = []
         
         # Calculate SMA for first value
-        sma = np.mean(closes_array[:period])
+        sma = sum(closes[:period]) / period
         ema_values.append(sma)
         
         # Calculate EMA for rest
         multiplier = 2 / (period + 1)
-        for price in closes_array[period:]:
+        for price in closes[period:]:
             ema = (price - ema_values[-1]) * multiplier + ema_values[-1]
             ema_values.append(ema)
         
@@ -39,11 +36,11 @@ class SignalStrategy:
         if len(closes) < period + 1:
             return None
         
-        deltas = np.diff(closes)
+        deltas = [b - a for a, b in zip(closes, closes[1:])]
         seed = deltas[:period+1]
         
-        up = seed[seed >= 0].sum() / period
-        down = -seed[seed < 0].sum() / period
+        up = sum(d for d in seed if d >= 0) / period
+        down = -sum(d for d in seed if d < 0) / period
         
         rs = up / down if down != 0 else 0
         rsi = 100 - (100 / (1 + rs))
@@ -68,14 +65,10 @@ class SignalStrategy:
         if len(closes) < k_period:
             return None, None
         
-        highs_array = np.array(highs[-k_period:])
-        lows_array = np.array(lows[-k_period:])
-        closes_array = np.array(closes[-k_period:])
+        highest_high = max(highs[-k_period:])
+        lowest_low = min(lows[-k_period:])
         
-        highest_high = np.max(highs_array)
-        lowest_low = np.min(lows_array)
-        
-        k = 100 * (closes_array[-1] - lowest_low) / (highest_high - lowest_low) if (highest_high - lowest_low) != 0 else 50
+        k = 100 * (closes[-1] - lowest_low) / (highest_high - lowest_low) if (highest_high - lowest_low) != 0 else 50
         
         # Calculate D (SMA of K)
         if len(closes) < k_period + d_period:
@@ -107,7 +100,7 @@ class SignalStrategy:
             return None
         
         # Calculate ATR as SMA of TR
-        atr = np.mean(tr_values[-period:])
+        atr = sum(tr_values[-period:]) / period
         return atr
     
     def check_bullish_ema(self, ema_fast: List[float], ema_med: List[float], 
@@ -256,7 +249,7 @@ class SignalStrategy:
     def calculate_sl_tp(self, entry_price: float, signal_type: str, 
                        atr: Optional[float], default_sl_pips: float,
                        default_tp_pips: float, tp_rr_ratio: float,
-                       sl_atr_multiplier: float) -> Tuple[float, float]:
+                       sl_atr_multiplier: float, pip_size: float = 0.01) -> Tuple[float, float]:
         """
         Calculate SL dan TP based on ATR atau default
         """
@@ -264,7 +257,7 @@ class SignalStrategy:
             if atr:
                 sl = entry_price - (atr * sl_atr_multiplier)
             else:
-                sl = entry_price - (default_sl_pips * 0.01)
+                sl = entry_price - (default_sl_pips * pip_size)
             
             sl_distance = entry_price - sl
             tp = entry_price + (sl_distance * tp_rr_ratio)
@@ -272,7 +265,7 @@ class SignalStrategy:
             if atr:
                 sl = entry_price + (atr * sl_atr_multiplier)
             else:
-                sl = entry_price + (default_sl_pips * 0.01)
+                sl = entry_price + (default_sl_pips * pip_size)
             
             sl_distance = sl - entry_price
             tp = entry_price - (sl_distance * tp_rr_ratio)
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from typing import Dict, Iterator, Optional, Set
+
+from app.filters import DEFAULT_FILTER, FilterIndex, SubscriberFilter, wib_hour
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriberRegistry:
+    """
+    Daftar subscriber di memory (set) dengan write-through asynchronous ke SQLite
+    Add/remove langsung mengubah set, perubahan ditulis oleh writer task di background
+    Filter sinyal per subscriber di-index (FilterIndex) untuk resolve recipient
+    """
+    
+    def __init__(self, database, flush_delay: float = 0.05):
+        self.database = database
+        self.flush_delay = flush_delay
+        self._members = set(database.get_subscribers())
+        self.filters: Dict[int, SubscriberFilter] = {
+            chat_id: SubscriberFilter.from_json(data)
+            for chat_id, data in database.get_subscriber_filters().items()
+        }
+        self.index = FilterIndex()
+        for chat_id in self._members:
+            self.index.add(chat_id, self.get_filter(chat_id))
+        self._pending: Dict[int, bool] = {}  # chat_id -> subscribed (perubahan terakhir menang)
+        self._pending_filters: Dict[int, str] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._writer: Optional[asyncio.Task] = None
+        self.writes = 0
+        logger.info(f"Loaded {len(self._members)} subscribers")
+    
+    def __contains__(self, chat_id: int) -> bool:
+        return chat_id in self._members
+    
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._members)
+    
+    def __len__(self) -> int:
+        return len(self._members)
+    
+    def add(self, chat_id: int) -> bool:
+        """Subscribe chat_id, return True jika sebelumnya belum subscribe"""
+        if chat_id in self._members:
+            return False
+        self._members.add(chat_id)
+        self.index.add(chat_id, self.get_filter(chat_id))
+        self._schedule(chat_id, True)
+        return True
+    
+    def discard(self, chat_id: int) -> bool:
+        """Unsubscribe chat_id, return True jika sebelumnya subscribe"""
+        if chat_id not in self._members:
+            return False
+        self._members.discard(chat_id)
+        self.index.remove(chat_id)
+        self._schedule(chat_id, False)
+        return True
+    
+    def get_filter(self, chat_id: int) -> SubscriberFilter:
+        return self.filters.get(chat_id, DEFAULT_FILTER)
+    
+    def set_filter(self, chat_id: int, f: SubscriberFilter):
+        """Simpan filter chat_id (tetap tersimpan walau unsubscribe)"""
+        self.filters[chat_id] = f
+        if chat_id in self._members:
+            self.index.add(chat_id, f)
+        self._pending_filters[chat_id] = f.to_json()
+        self._schedule()
+    
+    def recipients(self, direction: str, confidence: float, symbol: str, hour: Optional[int] = None) -> Set[int]:
+        """Subscriber yang filternya cocok dengan sinyal (hour = jam WIB, default sekarang)"""
+        return self.index.recipients(direction, confidence, symbol, wib_hour() if hour is None else hour)
+    
+    def _schedule(self, chat_id: Optional[int] = None, subscribed: bool = True):
+        if chat_id is not None:
+            self._pending[chat_id] = subscribed
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Di luar event loop (script/test): tulis langsung
+            self._write(self._take_pending())
+            return
+        
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._writer is None or self._writer.done():
+            self._writer = loop.create_task(self._run_writer())
+    
+    def _take_pending(self):
+        pending, self._pending = self._pending, {}
+        filters, self._pending_filters = self._pending_filters, {}
+        return pending, filters
+    
+    def _write(self, batch):
+        pending, filters = batch
+        if not pending and not filters:
+            return
+        try:
+            if pending:
+                self.database.apply_subscriber_changes(pending.items())
+            if filters:
+                self.database.save_subscriber_filters(filters.items())
+            self.writes += 1
+        except Exception as e:
+            logger.error(f"Failed to persist {len(pending) + len(filters)} subscriber changes: {e}")
+            # Kembalikan ke antrian kecuali sudah ada perubahan yang lebih baru
+            for chat_id, subscribed in pending.items():
+                self._pending.setdefault(chat_id, subscribed)
+            for chat_id, data in filters.items():
+                self._pending_filters.setdefault(chat_id, data)
+    
+    async def _run_writer(self):
+        """Writer task: kumpulkan perubahan sebentar lalu tulis satu batch di thread"""
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            await asyncio.sleep(self.flush_delay)
+            await asyncio.to_thread(self._write, self._take_pending())
+            if not self._pending and not self._pending_filters:
+                return
+            # Masih ada perubahan (baru masuk atau gagal ditulis): ulangi
+            self._wakeup.set()
+    
+    async def flush(self):
+        """Tunggu sampai semua perubahan tersimpan (dipanggil saat shutdown)"""
+        if self._writer is not None and not self._writer.done():
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self._write, self._take_pending())
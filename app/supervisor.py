@@ -0,0 +1,192 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from typing import Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from app.ring import TickRing
+
+logger = logging.getLogger(__name__)
+
+_LOG_FORMAT = '[%(asctime)s] [%(levelname)s] [%(name)s] %(message)s'
+
+
+def _cancel_on_sigterm():
+    """SIGTERM dari supervisor -> cancel task utama supaya blok finally (flush, close) tetap jalan"""
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+
+
+async def _run_feed(ring: TickRing):
+    from app.symbols import load_pip_sizes, load_symbols
+    from app.ws_manager import ExnessWebSocket
+    
+    ws = ExnessWebSocket(
+        ws_url=os.getenv('WS_URL', 'wss://ws-json.exness.com/realtime'),
+        pairs=load_symbols(),
+        pip_sizes=load_pip_sizes()
+    )
+    for index, pair in enumerate(ws.pairs):
+        ws.subscribe(pair, lambda tick, i=index: ring.push(i, tick.bid, tick.ask, tick.timestamp, time.time()))
+    
+    async def heartbeat():
+        while True:
+            ring.set_feed_state(ws.connected, ws.reconnect_count, ws.stale_count)
+            await asyncio.sleep(1)
+    
+    _cancel_on_sigterm()
+    heartbeat_task = asyncio.create_task(heartbeat())
+    try:
+        await ws.run()
+    finally:
+        heartbeat_task.cancel()
+        ring.set_feed_state(False, ws.reconnect_count, ws.stale_count)
+
+
+def feed_process_main(ring_name: str):
+    """Proses feed: ExnessWebSocket -> TickRing (tanpa Telegram, tanpa strategy)"""
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format=_LOG_FORMAT, stream=sys.stdout)
+    ring = TickRing.attach(ring_name)
+    try:
+        asyncio.run(_run_feed(ring))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        ring.close()
+
+
+def bot_process_main(ring_name: str):
+    """Proses bot: BotOrchestrator dengan RingFeed sebagai ws_manager"""
+    os.environ['FEED_RING_NAME'] = ring_name
+    from app.main import BotOrchestrator
+    
+    async def run():
+        _cancel_on_sigterm()
+        await BotOrchestrator().main()
+    
+    try:
+        asyncio.run(run())
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+class Supervisor:
+    """
+    Mode multi-process: proses feed dan proses bot terhubung lewat TickRing di shared memory
+    Ring dimiliki supervisor, jadi tiap proses bisa di-restart sendiri tanpa kehilangan posisi ring
+    """
+    
+    def __init__(self, ring: TickRing, check_interval: float = 1.0):
+        self.ring = ring
+        self.check_interval = check_interval
+        self.heartbeat_timeout = float(os.getenv('FEED_HEARTBEAT_TIMEOUT', 5)) * 3
+        self.max_backoff = 60.0
+        self.context = multiprocessing.get_context('spawn')
+        self.targets: Dict[str, Callable[[str], None]] = {
+            'feed': feed_process_main,
+            'bot': bot_process_main,
+        }
+        self.processes: Dict[str, Optional[multiprocessing.Process]] = {name: None for name in self.targets}
+        self.started_at: Dict[str, float] = {}
+        self.next_start: Dict[str, float] = {name: 0.0 for name in self.targets}
+        self.failures: Dict[str, int] = {name: 0 for name in self.targets}
+        self.restarts: Dict[str, int] = {name: 0 for name in self.targets}
+        self.running = False
+    
+    def _start(self, name: str):
+        process = self.context.Process(target=self.targets[name], args=(self.ring.name,), name=f"xau-{name}")
+        process.start()
+        self.processes[name] = process
+        self.started_at[name] = time.monotonic()
+        logger.info(f"Started {name} process (pid {process.pid})")
+    
+    def _on_exit(self, name: str, process: multiprocessing.Process):
+        # Proses yang sempat jalan lama dianggap sehat: backoff mulai dari awal
+        if time.monotonic() - self.started_at[name] > self.max_backoff:
+            self.failures[name] = 0
+        self.failures[name] += 1
+        delay = min(2 ** (self.failures[name] - 1), self.max_backoff)
+        self.next_start[name] = time.monotonic() + delay
+        self.restarts[name] += 1
+        self.processes[name] = None
+        logger.warning(f"{name} process exited (code {process.exitcode}), restart in {delay:.0f}s")
+    
+    def _feed_hung(self) -> bool:
+        """Feed hidup tapi heartbeat berhenti (event loop macet)"""
+        heartbeat = self.ring.header()["heartbeat"]
+        uptime = time.monotonic() - self.started_at.get('feed', 0.0)
+        return uptime > self.heartbeat_timeout and time.time() - heartbeat > self.heartbeat_timeout
+    
+    def check(self):
+        """Satu siklus pengawasan: restart proses yang mati atau feed yang macet"""
+        now = time.monotonic()
+        for name in self.targets:
+            process = self.processes[name]
+            if process is not None and name == 'feed' and process.is_alive() and self._feed_hung():
+                logger.error("Feed heartbeat lost, killing feed process")
+                process.kill()
+                process.join(5)
+            if process is not None and not process.is_alive():
+                self._on_exit(name, process)
+                process = None
+            if process is None and now >= self.next_start[name]:
+                self._start(name)
+    
+    def run(self):
+        self.running = True
+        signal.signal(signal.SIGTERM, lambda *_: self.stop())
+        try:
+            while self.running:
+                self.check()
+                time.sleep(self.check_interval)
+        finally:
+            self.shutdown()
+    
+    def stop(self):
+        self.running = False
+    
+    def shutdown(self, timeout: float = 10.0):
+        """SIGTERM ke semua proses, kill yang tidak berhenti dalam timeout"""
+        for process in self.processes.values():
+            if process is not None and process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for name, process in self.processes.items():
+            if process is not None:
+                process.join(max(0.0, deadline - time.monotonic()))
+                if process.is_alive():
+                    logger.warning(f"{name} process did not stop, killing")
+                    process.kill()
+        logger.info(f"Supervisor stopped (restarts: {self.restarts}, ring: {self.ring.header()})")
+    
+    def get_status(self) -> Dict:
+        return {
+            "processes": {
+                name: {"pid": p.pid if p else None, "alive": bool(p and p.is_alive()), "restarts": self.restarts[name]}
+                for name, p in self.processes.items()
+            },
+            "ring": self.ring.header(),
+        }
+
+
+def run_supervisor():
+    """Entry point PROCESS_MODE=multi"""
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format=_LOG_FORMAT, stream=sys.stdout)
+    ring = TickRing.create()
+    logger.info(f"Tick ring {ring.name}: {ring.capacity} slots")
+    try:
+        Supervisor(ring).run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
+
+
+if __name__ == "__main__":
+    run_supervisor()
@@ -0,0 +1,50 @@
+import math
+import os
+from typing import Dict, List
+
+# Ukuran 1 pip per symbol (harga, bukan point)
+DEFAULT_PIP_SIZES: Dict[str, float] = {
+    "XAUUSD": 0.01,
+    "XAGUSD": 0.001,
+    "EURUSD": 0.0001,
+    "GBPUSD": 0.0001,
+    "AUDUSD": 0.0001,
+    "NZDUSD": 0.0001,
+    "USDCHF": 0.0001,
+    "USDCAD": 0.0001,
+    "EURGBP": 0.0001,
+    "USDJPY": 0.01,
+    "EURJPY": 0.01,
+    "GBPJPY": 0.01,
+}
+
+
+def load_symbols() -> List[str]:
+    """Daftar symbol dari SYMBOLS (comma separated), default XAUUSD"""
+    symbols = [s.strip().upper() for s in os.getenv('SYMBOLS', 'XAUUSD').split(',') if s.strip()]
+    # Urutan dipertahankan, symbol pertama = primary
+    return list(dict.fromkeys(symbols)) or ["XAUUSD"]
+
+
+def load_pip_sizes() -> Dict[str, float]:
+    """Pip size per symbol: default + override dari SYMBOL_PIP_SIZES (XAGUSD:0.001,EURUSD:0.0001)"""
+    pip_sizes = dict(DEFAULT_PIP_SIZES)
+    for item in os.getenv('SYMBOL_PIP_SIZES', '').split(','):
+        if ':' in item:
+            symbol, size = item.split(':', 1)
+            pip_sizes[symbol.strip().upper()] = float(size)
+    return pip_sizes
+
+
+def pip_size_for(symbol: str, pip_sizes: Dict[str, float]) -> float:
+    """Pip size untuk symbol; JPY cross 0.01, lainnya 0.0001 jika tidak dikonfigurasi"""
+    if symbol in pip_sizes:
+        return pip_sizes[symbol]
+    return 0.01 if symbol.endswith("JPY") else 0.0001
+
+
+def price_digits(pip_size: float) -> int:
+    """Jumlah desimal untuk format harga: 2 untuk pip >= 0.01, selain itu sampai fractional pip"""
+    if pip_size >= 0.01:
+        return 2
+    return round(-math.log10(pip_size)) + 1
@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional
+
+from app.delivery import PRIORITY_BROADCAST, DeliveryPipeline
+from app.symbols import price_digits
+
+logger = logging.getLogger(__name__)
+
+
+class TickerState:
+    """Satu pesan ticker yang di-edit in-place"""
+    __slots__ = ('chat_id', 'message_id', 'symbol', 'last_text', 'next_due', 'expires_at', 'edits', 'skipped')
+    
+    def __init__(self, chat_id: int, message_id: int, symbol: str, expires_at: float):
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.symbol = symbol
+        self.last_text = ""
+        self.next_due = 0.0
+        self.expires_at = expires_at
+        self.edits = 0
+        self.skipped = 0
+
+
+class LiveTicker:
+    """
+    Ticker harga live per chat lewat edit message
+    Teks di-render sekali per symbol per siklus; tiap chat diedit paling cepat sekali per interval
+    dan hanya jika teksnya berubah. Edit lewat DeliveryPipeline (prioritas di bawah signal).
+    """
+    
+    def __init__(self, ws_manager, pipelines: Dict, delivery: DeliveryPipeline,
+                 edit_func: Callable[..., Awaitable], interval: Optional[float] = None,
+                 ttl: Optional[float] = None, max_chats: Optional[int] = None):
+        self.ws_manager = ws_manager
+        self.pipelines = pipelines
+        self.delivery = delivery
+        self.edit_func = edit_func
+        self.interval = interval or float(os.getenv('TICKER_INTERVAL_SECONDS', 5))
+        self.ttl = ttl or float(os.getenv('TICKER_TTL_SECONDS', 3600))
+        self.max_chats = max_chats or int(os.getenv('TICKER_MAX_CHATS', 200))
+        self.chats: Dict[int, TickerState] = {}
+        self.running = False
+        self.stats = {"edits": 0, "skipped": 0, "errors": 0, "cycles": 0}
+    
+    def render(self, symbol: str) -> str:
+        """Teks ticker untuk symbol (bid/ask/spread + candle M1 berjalan)"""
+        quote = self.ws_manager.quotes.get(symbol)
+        pipeline = self.pipelines.get(symbol)
+        if quote is None or quote.bid is None:
+            return f"📡 {symbol} LIVE\n\nMenunggu tick..."
+        
+        digits = price_digits(quote.pip_size)
+        lines = [
+            f"📡 {symbol} LIVE",
+            "",
+            f"BID {quote.bid:.{digits}f} | ASK {quote.ask:.{digits}f}",
+            f"Spread: {quote.get_spread():.1f} pips",
+        ]
+        candle = pipeline.forming_m1 if pipeline else None
+        if candle:
+            lines += [
+                "",
+                f"M1 {datetime.fromtimestamp(candle['timestamp'], timezone.utc).strftime('%H:%M')} UTC",
+                f"O {candle['open']:.{digits}f} H {candle['high']:.{digits}f}",
+                f"L {candle['low']:.{digits}f} C {candle['close']:.{digits}f}",
+                f"Ticks: {candle['volume']}",
+            ]
+        if quote.last_exchange_time:
+            lines += ["", f"Update: {datetime.fromtimestamp(quote.last_exchange_time, timezone.utc).strftime('%H:%M:%S')} UTC"]
+        return "\n".join(lines)
+    
+    def start_chat(self, chat_id: int, message_id: int, symbol: str) -> bool:
+        """Aktifkan ticker untuk chat (replace ticker lama); False jika kapasitas penuh"""
+        if chat_id not in self.chats and len(self.chats) >= self.max_chats:
+            return False
+        self.chats[chat_id] = TickerState(chat_id, message_id, symbol, time.monotonic() + self.ttl)
+        return True
+    
+    def stop_chat(self, chat_id: int) -> Optional[TickerState]:
+        return self.chats.pop(chat_id, None)
+    
+    async def _edit(self, state: TickerState, text: str):
+        error = await self.delivery.send(
+            state.chat_id, text, PRIORITY_BROADCAST, func=self.edit_func, message_id=state.message_id
+        )
+        if error is None:
+            state.last_text = text
+            state.edits += 1
+            self.stats["edits"] += 1
+            return
+        if "not modified" in error:
+            state.last_text = text
+            return
+        self.stats["errors"] += 1
+        if error.startswith(("BadRequest", "Forbidden")):
+            # Pesan dihapus / bot di-block: hentikan ticker chat ini
+            logger.info(f"Ticker stopped for {state.chat_id}: {error}")
+            self.chats.pop(state.chat_id, None)
+    
+    async def tick(self, now: Optional[float] = None):
+        """Satu siklus: edit chat yang sudah jatuh tempo dan teksnya berubah"""
+        now = time.monotonic() if now is None else now
+        self.stats["cycles"] += 1
+        texts: Dict[str, str] = {}
+        edits = []
+        for state in list(self.chats.values()):
+            if now >= state.expires_at:
+                self.chats.pop(state.chat_id, None)
+                edits.append(self._edit(state, "⏹️ Ticker berhenti (timeout). Ketik /ticker on untuk mulai lagi."))
+                continue
+            if now < state.next_due:
+                continue
+            state.next_due = now + self.interval
+            text = texts.get(state.symbol)
+            if text is None:
+                text = texts[state.symbol] = self.render(state.symbol)
+            if text == state.last_text:
+                state.skipped += 1
+                self.stats["skipped"] += 1
+                continue
+            edits.append(self._edit(state, text))
+        if edits:
+            await asyncio.gather(*edits)
+    
+    async def run(self):
+        """Background task ticker"""
+        self.running = True
+        step = min(1.0, self.interval)
+        while self.running:
+            try:
+                if self.chats:
+                    await self.tick()
+            except Exception as e:
+                logger.error(f"Ticker error: {e}")
+            await asyncio.sleep(step)
+    
+    def stop(self):
+        self.running = False
@@ -0,0 +1,65 @@
+import json
+import os
+import random
+from typing import Dict, List, Optional, Tuple
+
+from app.clock import SYSTEM_CLOCK, Clock
+
+
+class Span:
+    """
+    Jejak satu evaluasi signal: tick pemicu (sequence ID) dan timestamp per hop
+    Hop dicatat sebagai wall clock (clock.time) supaya bisa dibandingkan lintas thread/proses
+    """
+    __slots__ = ('trace_id', 'seq', 'hops', 'attrs', 'clock')
+    
+    def __init__(self, trace_id: str, seq: int, clock: Clock = SYSTEM_CLOCK):
+        self.trace_id = trace_id
+        self.seq = seq
+        self.clock = clock
+        self.hops: List[Tuple[str, float]] = []
+        self.attrs: Dict[str, object] = {}
+    
+    def mark(self, hop: str, at: Optional[float] = None):
+        self.hops.append((hop, self.clock.time() if at is None else at))
+    
+    def to_json(self) -> str:
+        """Record ringkas: t0 absolut, hop lain sebagai offset ms dari t0"""
+        t0 = self.hops[0][1] if self.hops else 0.0
+        record = {
+            "id": self.trace_id,
+            "seq": self.seq,
+            "t0": round(t0, 4),
+            "hops": [[hop, round((at - t0) * 1000, 1)] for hop, at in self.hops],
+        }
+        if self.attrs:
+            record["attrs"] = self.attrs
+        return json.dumps(record, separators=(',', ':'))
+    
+    @staticmethod
+    def describe(trace: str) -> str:
+        """Render record JSON dari tabel trades untuk dibaca manusia"""
+        record = json.loads(trace)
+        lines = [f"Trace {record['id']} (tick #{record['seq']})"]
+        previous = 0.0
+        for hop, offset in record["hops"]:
+            lines.append(f"{hop:<14} +{offset:>9.1f}ms  (Δ {offset - previous:.1f}ms)")
+            previous = offset
+        for key, value in record.get("attrs", {}).items():
+            lines.append(f"{key}: {value}")
+        return "\n".join(lines)
+
+
+class Tracer:
+    """Sampling span per evaluasi; tanpa sample tidak ada alokasi sama sekali"""
+    
+    def __init__(self, sample_rate: Optional[float] = None, clock: Optional[Clock] = None):
+        self.clock = clock or SYSTEM_CLOCK
+        self.sample_rate = sample_rate if sample_rate is not None else float(os.getenv('TRACE_SAMPLE_RATE', 1.0))
+        self.started = 0
+    
+    def start(self, trace_id: str, seq: int) -> Optional[Span]:
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return None
+        self.started += 1
+        return Span(trace_id, seq, self.clock)
@@ -1,103 +1,254 @@
 import asyncio
 import json
 import logging
+import os
+import random
 import time
-import websocket
+import websockets
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Callable, Optional, Dict, List
+
+from app.clock import SYSTEM_CLOCK, Clock
+from app.codec import Tick, TickDecoder
+from app.metrics import LatencyHistogram, RateMeter
+from app.symbols import pip_size_for
 
 logger = logging.getLogger(__name__)
 
 
+class SymbolQuote:
+    """Harga terakhir satu symbol"""
+    __slots__ = ('symbol', 'pip_size', 'bid', 'ask', 'last_tick_time', 'last_exchange_time', 'tick_count')
+    
+    def __init__(self, symbol: str, pip_size: float, now: float):
+        self.symbol = symbol
+        self.pip_size = pip_size
+        self.bid: Optional[float] = None
+        self.ask: Optional[float] = None
+        self.last_tick_time = now
+        self.last_exchange_time: Optional[float] = None
+        self.tick_count = 0
+    
+    def get_delay(self, now: float) -> float:
+        """Umur quote: dari timestamp exchange jika ada, selain itu dari waktu terima"""
+        if self.last_exchange_time is not None:
+            return now - self.last_exchange_time
+        return now - self.last_tick_time
+    
+    def get_spread(self) -> float:
+        """Spread dalam pips sesuai pip size symbol"""
+        if self.bid and self.ask:
+            return (self.ask - self.bid) / self.pip_size
+        return 0
+
+
 class ExnessWebSocket:
-    def __init__(self, ws_url: str, pair: str = "XAUUSD"):
+    def __init__(self, ws_url: str, pair: str = "XAUUSD", pairs: Optional[List[str]] = None,
+                 pip_sizes: Optional[Dict[str, float]] = None, clock: Optional[Clock] = None):
         self.ws_url = ws_url
-        self.pair = pair
+        self.clock = clock or SYSTEM_CLOCK
+        # Satu koneksi untuk semua symbol, pair pertama = primary
+        self.pairs = list(pairs) if pairs else [pair]
+        self.pair = self.pairs[0]
+        self.pip_sizes = pip_sizes or {}
+        self.quotes: Dict[str, SymbolQuote] = {
+            p: SymbolQuote(p, pip_size_for(p, self.pip_sizes), self.clock.time()) for p in self.pairs
+        }
+        # Dispatch table: symbol -> tick handlers
+        self.handlers: Dict[str, List[Callable[[Tick], None]]] = {p: [] for p in self.pairs}
         self.ws = None
+        self.decoder = TickDecoder(self.pairs)
         self.connected = False
-        self.current_bid = None
-        self.current_ask = None
-        self.last_tick_time = time.time()
+        self.running = False
+        self.last_tick_time = self.clock.time()
+        self.last_activity = self.clock.monotonic()
         self.tick_count = 0
-        self.tick_count_last_minute = 0
+        self.tick_rate = RateMeter((1, 10, 60))
+        # Exchange timestamp -> terima, dan terima -> selesai di-dispatch
+        self.feed_latency = LatencyHistogram()
+        self.process_latency = LatencyHistogram()
         self.reconnect_count = 0
+        self.stale_count = 0
         self.reconnect_delay = 5
         self.max_reconnect_delay = 60
+        self.max_reconnect_attempts = int(os.getenv('WS_RECONNECT_MAX_ATTEMPTS', 10))
+        self.stale_feed_seconds = float(os.getenv('WS_DISCONNECT_ALERT_SECONDS', 30))
+        self.ping_interval = 20
+        self.ping_timeout = 20
+    
+    @property
+    def current_bid(self) -> Optional[float]:
+        """BID terakhir primary pair"""
+        return self.quotes[self.pair].bid
+    
+    @property
+    def current_ask(self) -> Optional[float]:
+        """ASK terakhir primary pair"""
+        return self.quotes[self.pair].ask
+    
+    def subscribe(self, pair: str, handler: Callable[[Tick], None]):
+        """Daftarkan handler yang dipanggil untuk setiap tick pair ini"""
+        if pair not in self.handlers:
+            raise ValueError(f"Pair {pair} is not subscribed on this connection")
+        self.handlers[pair].append(handler)
+    
+    async def run(self):
+        """
+        Koneksi ke WebSocket Exness dengan reconnect loop iteratif
+        Berhenti setelah WS_RECONNECT_MAX_ATTEMPTS kegagalan berturut-turut (0 = tanpa batas)
+        """
+        self.running = True
+        attempts = 0
         
-    def connect(self):
-        """Koneksi ke WebSocket Exness"""
-        try:
-            self.ws = websocket.WebSocketApp(
-                self.ws_url,
-                on_open=self.on_open,
-                on_message=self.on_message,
-                on_error=self.on_error,
-                on_close=self.on_close
-            )
-            logger.info(f"Connecting to {self.ws_url}")
-            self.ws.run_forever()
-        except Exception as e:
-            logger.error(f"WebSocket error: {e}")
-            self.handle_disconnect()
-    
-    def on_open(self, ws):
+        while self.running:
+            try:
+                logger.info(f"Connecting to {self.ws_url}")
+                async with websockets.connect(
+                    self.ws_url,
+                    ping_interval=self.ping_interval,
+                    ping_timeout=self.ping_timeout,
+                    close_timeout=5
+                ) as ws:
+                    attempts = 0
+                    await self.on_open(ws)
+                    watchdog = asyncio.create_task(self._watchdog(ws))
+                    try:
+                        async for message in ws:
+                            self.on_message(message)
+                    finally:
+                        watchdog.cancel()
+                    self.on_close(ws.close_code, ws.close_reason)
+            except asyncio.CancelledError:
+                self.running = False
+                raise
+            except websockets.ConnectionClosed as e:
+                self.on_close(e.code, e.reason)
+            except Exception as e:
+                self.on_error(e)
+            finally:
+                self.connected = False
+                self.ws = None
+            
+            if not self.running:
+                break
+            
+            attempts += 1
+            if self.max_reconnect_attempts and attempts > self.max_reconnect_attempts:
+                logger.error(f"Giving up after {self.max_reconnect_attempts} failed reconnect attempts")
+                break
+            
+            await self.clock.sleep(self.handle_disconnect(attempts))
+        
+        self.running = False
+    
+    async def stop(self):
+        """Stop reconnect loop dan tutup koneksi"""
+        self.running = False
+        if self.ws is not None:
+            await self.ws.close()
+    
+    async def on_open(self, ws):
         """Callback saat koneksi berhasil"""
+        self.ws = ws
         self.connected = True
         self.reconnect_delay = 5
+        self.last_activity = self.clock.monotonic()
         logger.info("WebSocket connected")
-        # Subscribe ke XAUUSD
+        # Subscribe semua pair dalam satu pesan
         subscribe_msg = {
             "type": "subscribe",
-            "pairs": [self.pair]
+            "pairs": self.pairs
         }
-        ws.send(json.dumps(subscribe_msg))
-        logger.info(f"Subscribed to {self.pair}")
+        await ws.send(json.dumps(subscribe_msg))
+        logger.info(f"Subscribed to {', '.join(self.pairs)}")
     
-    def on_message(self, ws, message):
+    def on_message(self, message):
         """Callback saat menerima pesan"""
-        try:
-            data = json.loads(message)
-            if data.get("type") == "tick" and data.get("pair") == self.pair:
-                self.current_bid = float(data.get("bid", 0))
-                self.current_ask = float(data.get("ask", 0))
-                self.last_tick_time = time.time()
-                self.tick_count += 1
-                self.tick_count_last_minute += 1
-                logger.debug(f"Tick: BID={self.current_bid}, ASK={self.current_ask}")
-        except Exception as e:
-            logger.error(f"Error processing message: {e}")
-    
-    def on_error(self, ws, error):
+        received = time.perf_counter()
+        tick = self.decoder.decode(message)
+        if tick is None:
+            return
+        self.dispatch(tick, received)
+    
+    def dispatch(self, tick: Tick, received: float):
+        """Update quote dan panggil handler symbol (received = perf_counter saat frame diterima)"""
+        now = self.clock.time()
+        quote = self.quotes[tick.pair]
+        quote.bid = tick.bid
+        quote.ask = tick.ask
+        quote.last_tick_time = now
+        quote.tick_count += 1
+        self.last_tick_time = now
+        self.last_activity = self.clock.monotonic()
+        self.tick_count += 1
+        self.tick_rate.add(1, self.last_activity)
+        
+        if tick.timestamp is not None:
+            quote.last_exchange_time = tick.timestamp
+            self.feed_latency.observe(now - tick.timestamp)
+        
+        for handler in self.handlers[tick.pair]:
+            try:
+                handler(tick)
+            except Exception as e:
+                logger.error(f"Tick handler error ({tick.pair}): {e}", exc_info=True)
+        
+        self.process_latency.observe(time.perf_counter() - received)
+    
+    def on_error(self, error):
         """Callback saat error"""
         logger.error(f"WebSocket error: {error}")
     
-    def on_close(self, ws, close_status_code, close_msg):
+    def on_close(self, close_status_code, close_msg):
         """Callback saat koneksi ditutup"""
         self.connected = False
         logger.warning(f"WebSocket closed: {close_status_code} - {close_msg}")
-        self.handle_disconnect()
     
-    def handle_disconnect(self):
-        """Handle disconnect dengan reconnect exponential backoff"""
+    def handle_disconnect(self, attempt: int) -> float:
+        """Hitung delay reconnect: exponential backoff dengan jitter"""
         self.reconnect_count += 1
-        logger.warning(f"Reconnect attempt #{self.reconnect_count}, delay {self.reconnect_delay}s")
-        time.sleep(self.reconnect_delay)
-        self.reconnect_delay = min(self.reconnect_delay * 2, self.max_reconnect_delay)
-        self.connect()
+        backoff = min(5 * 2 ** (attempt - 1), self.max_reconnect_delay)
+        # Equal jitter: setengah tetap, setengah acak supaya reconnect tidak serempak
+        self.reconnect_delay = backoff / 2 + random.uniform(0, backoff / 2)
+        logger.warning(f"Reconnect attempt #{self.reconnect_count}, delay {self.reconnect_delay:.1f}s")
+        return self.reconnect_delay
     
-    def get_current_delay(self) -> float:
-        """Hitung delay tick saat ini"""
-        return time.time() - self.last_tick_time
+    async def _watchdog(self, ws):
+        """Force reconnect jika tidak ada tick selama WS_DISCONNECT_ALERT_SECONDS"""
+        check_interval = max(self.stale_feed_seconds / 4, 0.5)
+        while True:
+            await self.clock.sleep(check_interval)
+            idle = self.clock.monotonic() - self.last_activity
+            if idle > self.stale_feed_seconds:
+                self.stale_count += 1
+                logger.warning(f"⚠️ Feed stale: no tick for {idle:.0f}s, forcing reconnect")
+                await ws.close(code=4000, reason="stale feed")
+                return
     
-    def get_tick_rate(self) -> float:
-        """Hitung tick rate (ticks per second)"""
-        return self.tick_count_last_minute / 60.0 if self.tick_count_last_minute > 0 else 0
+    def get_current_delay(self, pair: Optional[str] = None) -> float:
+        """
+        Hitung delay tick saat ini: umur quote terakhir diukur dari timestamp exchange
+        (jika feed mengirim timestamp), jadi mencakup latency feed dan feed yang diam
+        """
+        now = self.clock.time()
+        if pair:
+            return self.quotes[pair].get_delay(now)
+        return min(q.get_delay(now) for q in self.quotes.values())
     
-    def get_spread(self) -> float:
-        """Hitung spread dalam pips (0.01 untuk XAUUSD)"""
-        if self.current_bid and self.current_ask:
-            return (self.current_ask - self.current_bid) / 0.01
-        return 0
+    def get_tick_rate(self, window: float = 60) -> float:
+        """Hitung tick rate (ticks per second) dalam sliding window 1/10/60 detik"""
+        return self.tick_rate.counters[window].rate(self.clock.monotonic())
+    
+    def get_latency_stats(self) -> Dict:
+        """Percentile latency exchange->terima dan terima->diproses"""
+        return {
+            "feed": self.feed_latency.summary(),
+            "process": self.process_latency.summary()
+        }
+    
+    def get_spread(self, pair: Optional[str] = None) -> float:
+        """Hitung spread dalam pips sesuai pip size symbol (default primary pair)"""
+        return self.quotes[pair or self.pair].get_spread()
     
     def get_status(self) -> Dict:
         """Return status WebSocket"""
@@ -107,7 +258,21 @@ class ExnessWebSocket:
             "current_ask": self.current_ask,
             "delay_seconds": self.get_current_delay(),
             "tick_rate_tps": self.get_tick_rate(),
+            "tick_rate_1s": self.get_tick_rate(1),
+            "tick_rate_10s": self.get_tick_rate(10),
+            "latency": self.get_latency_stats(),
             "spread_pips": self.get_spread(),
             "tick_count": self.tick_count,
-            "reconnect_count": self.reconnect_count
+            "reconnect_count": self.reconnect_count,
+            "stale_count": self.stale_count,
+            "symbols": {
+                p: {
+                    "bid": q.bid,
+                    "ask": q.ask,
+                    "spread_pips": q.get_spread(),
+                    "delay_seconds": q.get_delay(self.clock.time()),
+                    "tick_count": q.tick_count
+                }
+                for p, q in self.quotes.items()
+            }
         }
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark decode frame WebSocket: messages/second per jalur
+
+Usage: python benchmarks/bench_decode.py [--frames 200000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.codec import TickDecoder, load_json_backend
+
+
+def make_frames(count: int, tick_ratio: float = 0.5, seed: int = 42) -> list:
+    """Campuran frame: tick XAUUSD, tick pair lain, heartbeat"""
+    rng = random.Random(seed)
+    frames = []
+    price = 2035.0
+    for _ in range(count):
+        r = rng.random()
+        price += rng.gauss(0, 0.05)
+        if r < tick_ratio:
+            frames.append(json.dumps({"type": "tick", "pair": "XAUUSD", "bid": round(price, 2),
+                                      "ask": round(price + 0.2, 2), "timestamp": time.time()}))
+        elif r < tick_ratio + (1 - tick_ratio) / 2:
+            frames.append(json.dumps({"type": "tick", "pair": "EURUSD", "bid": 1.0851,
+                                      "ask": 1.0852, "timestamp": time.time()}))
+        else:
+            frames.append(json.dumps({"type": "heartbeat", "timestamp": time.time()}))
+    return frames
+
+
+def legacy_decode(message, pair="XAUUSD"):
+    """Jalur lama on_message: json.loads + dict.get + float() untuk setiap frame"""
+    data = json.loads(message)
+    if data.get("type") == "tick" and data.get("pair") == pair:
+        return float(data.get("bid", 0)), float(data.get("ask", 0))
+    return None
+
+
+def bench(name: str, func, frames: list, repeat: int = 3) -> float:
+    """Return best messages/second dari beberapa putaran"""
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for frame in frames:
+            func(frame)
+        elapsed = time.perf_counter() - start
+        best = max(best, len(frames) / elapsed)
+    print(f"{name:<32} {best:>14,.0f} msg/s")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--frames', type=int, default=200000)
+    parser.add_argument('--tick-ratio', type=float, default=0.5)
+    args = parser.parse_args()
+    
+    frames = make_frames(args.frames, args.tick_ratio)
+    frames_bytes = [f.encode() for f in frames]
+    print(f"{len(frames):,} frames, {args.tick_ratio:.0%} XAUUSD ticks\n")
+    
+    results = {'legacy (json + dict.get)': bench('legacy (json + dict.get)', legacy_decode, frames)}
+    
+    backends = ['json']
+    if load_json_backend('auto')[1] != 'json':
+        backends.append(load_json_backend('auto')[1])
+    
+    for backend in backends:
+        decoder = TickDecoder(["XAUUSD"], backend=backend)
+        results[f'TickDecoder[{backend}] str'] = bench(f'TickDecoder[{backend}] str', decoder.decode, frames)
+        results[f'TickDecoder[{backend}] bytes'] = bench(f'TickDecoder[{backend}] bytes', decoder.decode, frames_bytes)
+    
+    decoder = TickDecoder(["XAUUSD"], backend='json')
+    bench('prefilter only', decoder.accepts, frames)
+    
+    baseline = results['legacy (json + dict.get)']
+    print()
+    for name, rate in results.items():
+        print(f"{name:<32} {rate / baseline:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Macrobenchmark: latency tick -> pesan Telegram end-to-end terhadap stand-in lokal
+
+Mock feed (app.mock_feed, proses terpisah) -> BotOrchestrator lengkap (WebSocket, signal loop, compute stage,
+risk, DB, delivery) -> fake Bot API (app.fake_telegram). Latency diambil dari span trace tiap signal:
+timestamp exchange tick penutup candle sampai pesan pertama/terakhir diterima fake Telegram.
+
+Evaluasi dipicu candle M1 close (real time), jadi satu sample per symbol per menit. Candle history
+di-seed supaya evaluasi pertama sudah lengkap, dan secara default setiap evaluasi tanpa signal
+diubah menjadi signal (--natural untuk memakai keputusan strategy apa adanya).
+
+Usage: python benchmarks/bench_macro.py [--duration 150] [--symbols XAUUSD,XAGUSD,EURUSD] [--chats 10]
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_micro import make_candles
+from benchmarks.harness import report, result, save
+from app.fake_telegram import FAKE_TOKEN, FakeTelegramServer
+from app.metrics import LatencyHistogram
+from app.mock_feed import BASE_PRICES, FeedConfig, FeedStats, _run_server_process
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed_history(pipeline):
+    """Isi candle M1/M5 sebelum start supaya indikator lengkap sejak candle close pertama"""
+    base = BASE_PRICES.get(pipeline.symbol, 1.0)
+    for timeframe, seconds, target in (("M1", 60, pipeline.m1_candles), ("M5", 300, pipeline.m5_candles)):
+        candles = make_candles(50, seconds)
+        scale = base / candles[-1]['close']
+        for candle in candles:
+            for key in ('open', 'high', 'low', 'close'):
+                candle[key] *= scale
+        target.extend(candles)
+
+
+def force_signals(pipeline):
+    """Strategy tetap dihitung penuh; hasil tanpa signal diganti BUY supaya path delivery selalu terukur"""
+    generate = pipeline.strategy.generate_signal
+    
+    def generate_signal(*args, **kwargs):
+        signal_type, confidence = generate(*args, **kwargs)
+        return (signal_type, confidence) if signal_type else ("BUY", 100)
+    pipeline.strategy.generate_signal = generate_signal
+
+
+async def measure(duration: float, symbols: list, chats: int, rate: float, natural: bool) -> list:
+    from app.main import BotOrchestrator
+    
+    feed_port = free_port()
+    api_port = free_port()
+    stats = FeedStats()
+    feed = multiprocessing.Process(target=_run_server_process,
+                                   args=(FeedConfig(rate=rate, seed=42), stats, "127.0.0.1", feed_port), daemon=True)
+    feed.start()
+    telegram = FakeTelegramServer(port=api_port)
+    await telegram.http.start()
+    os.environ.update({
+        'WS_URL': f"ws://127.0.0.1:{feed_port}",
+        'TELEGRAM_BASE_URL': f"http://127.0.0.1:{api_port}/bot",
+    })
+    
+    orchestrator = BotOrchestrator()
+    for pipeline in orchestrator.pipelines.values():
+        seed_history(pipeline)
+        if not natural:
+            force_signals(pipeline)
+    for chat_id in range(1, chats + 1):
+        orchestrator.telegram_bot.subscribers.add(chat_id)
+    
+    spans = []
+    original_send = orchestrator.telegram_bot.send_signal
+    
+    async def send_signal(*args, span=None, **kwargs):
+        summary = await original_send(*args, span=span, **kwargs)
+        if span is not None and summary:
+            spans.append(span)
+        return summary
+    
+    orchestrator.telegram_bot.send_signal = send_signal
+    
+    tasks = [
+        asyncio.create_task(orchestrator.ws_manager.run()),
+        asyncio.create_task(orchestrator.run_signal_loop()),
+        asyncio.create_task(orchestrator.run_telegram_bot()),
+    ]
+    started = time.monotonic()
+    print(f"Running {duration:.0f}s: {len(symbols)} symbols, {rate:.0f} tps, {chats} chats "
+          f"({'natural' if natural else 'forced'} signals)")
+    await asyncio.sleep(duration)
+    
+    orchestrator.running = False
+    await orchestrator.ws_manager.stop()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    orchestrator.compute.shutdown()
+    await telegram.http.stop()
+    feed.terminate()
+    feed.join()
+    elapsed = time.monotonic() - started
+    
+    first = LatencyHistogram()
+    last = LatencyHistogram()
+    internal = LatencyHistogram()
+    for span in spans:
+        hops = dict(span.hops)
+        if 'tick_exchange' not in hops:
+            continue
+        first.observe(hops['deliver_start'] + span.attrs['first_ms'] / 1000 - hops['tick_exchange'])
+        last.observe(hops['delivered'] - hops['tick_exchange'])
+        internal.observe(hops['deliver_start'] - hops['tick_recv'])
+    feed_latency = orchestrator.ws_manager.feed_latency.summary()
+    print(f"{len(spans)} signals delivered, {telegram.calls['sendMessage']} messages, "
+          f"{stats.ticks_sent.value:,} ticks in {elapsed:.0f}s")
+    if not first.count:
+        print("No delivered signals with exchange timestamp (duration too short?)")
+        return []
+    
+    results = []
+    for name, histogram in (("tick_to_first_message", first), ("tick_to_last_message", last),
+                            ("tick_recv_to_deliver_start", internal)):
+        summary = histogram.summary()
+        results.append(report(result(f"macro.{name}.p50_ms", round(summary['p50_ms'], 2), "ms",
+                                     count=summary['count'])))
+        results.append(report(result(f"macro.{name}.max_ms", round(summary['max_ms'], 2), "ms")))
+    results.append(report(result("macro.feed_latency.p50_ms", round(feed_latency['p50_ms'], 2), "ms",
+                                 count=feed_latency['count'])))
+    return results
+
+
+def run(duration: float = 150.0, symbols: tuple = ("XAUUSD", "XAGUSD", "EURUSD"), chats: int = 10,
+        rate: float = 50.0, natural: bool = False) -> list:
+    workdir = tempfile.mkdtemp(prefix="bench_macro_")
+    overrides = {
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'SYMBOLS': ','.join(symbols),
+        'TELEGRAM_BOT_TOKEN': FAKE_TOKEN,
+        'TELEGRAM_MODE': 'polling',
+        'EVALUATION_MODE': 'true',
+        'SIGNAL_COOLDOWN_SECONDS_EVAL': '0',
+        'MIN_SIGNAL_CONFIDENCE_EVAL': '0',
+        'MAX_SPREAD_PIPS': '100',
+        'TRACE_SAMPLE_RATE': '1.0',
+        'CHART_ON_SIGNAL': 'false',
+    }
+    saved = {key: os.environ.get(key) for key in list(overrides) + ['WS_URL', 'TELEGRAM_BASE_URL']}
+    os.environ.update(overrides)
+    logging.disable(logging.INFO)
+    try:
+        return asyncio.run(measure(duration, list(symbols), chats, rate, natural))
+    finally:
+        logging.disable(logging.NOTSET)
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=150.0, help="Detik (satu sample per symbol per menit)")
+    parser.add_argument('--symbols', default='XAUUSD,XAGUSD,EURUSD')
+    parser.add_argument('--chats', type=int, default=10, help="Jumlah subscriber")
+    parser.add_argument('--rate', type=float, default=50.0, help="Tick/detik mock feed (semua symbol)")
+    parser.add_argument('--natural', action='store_true', help="Jangan paksa signal di setiap evaluasi")
+    parser.add_argument('--output', default=None, help="Simpan hasil ke JSON")
+    args = parser.parse_args()
+    
+    symbols = tuple(s.strip().upper() for s in args.symbols.split(',') if s.strip())
+    results = run(args.duration, symbols, args.chats, args.rate, args.natural)
+    if args.output:
+        print(f"\nSaved: {save(results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
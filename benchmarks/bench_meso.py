@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Mesobenchmark: satu jam tick sintetis lewat BotOrchestrator (dispatch -> pipeline -> compute stage -> risk -> DB)
+
+Replay memakai app.replay di atas SimulatedClock, jadi 1 jam market selesai dalam hitungan detik
+dan candle M1/M5 close sama seperti produksi. Telegram tidak ikut (lihat bench_macro.py).
+
+Usage: python benchmarks/bench_meso.py [--hours 1] [--rate 10] [--symbols XAUUSD,EURUSD]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import report, result, save
+from app.history import parse_timestamp
+from app.metrics import LatencyHistogram, process_rss_bytes
+from app.replay import DEFAULT_START, replay, synthetic_stream
+
+# Evaluation mode tanpa cooldown: signal sebanyak mungkin supaya path risk + DB ikut terukur
+OVERRIDES = {
+    'EVALUATION_MODE': 'true',
+    'SIGNAL_COOLDOWN_SECONDS_EVAL': '0',
+    'MIN_SIGNAL_CONFIDENCE_EVAL': '40',
+    'MAX_TICK_DELAY_SECONDS': '3600',
+    # Spread synthetic_ticks = 1 bp harga (~20 pip XAUUSD), di atas default MAX_SPREAD_PIPS
+    'MAX_SPREAD_PIPS': '100',
+    'TRACE_SAMPLE_RATE': '1.0',
+}
+
+
+def run(hours: float = 1.0, rate: float = 10.0, symbols: tuple = ("XAUUSD",)) -> list:
+    """Jalankan tick sintetis hours jam (rate tick/detik per symbol) lewat orchestrator"""
+    evaluation_latency = LatencyHistogram()
+    
+    def instrument(orchestrator):
+        original_process = orchestrator.process_symbol
+        
+        async def process_symbol(pipeline, *args):
+            start = time.perf_counter()
+            await original_process(pipeline, *args)
+            evaluation_latency.observe(time.perf_counter() - start)
+        
+        orchestrator.process_symbol = process_symbol
+    
+    # Start tetap (awal hari): batas candle dan tick sama di setiap run, jadi jumlah signal deterministik
+    ticks = synthetic_stream(list(symbols), hours, rate, parse_timestamp(DEFAULT_START))
+    rss_before = process_rss_bytes()
+    logging.disable(logging.INFO)
+    try:
+        summary = replay(ticks, list(symbols), parse_timestamp(DEFAULT_START), env=OVERRIDES,
+                         orchestrator_hook=instrument)
+    finally:
+        logging.disable(logging.NOTSET)
+    
+    elapsed = summary['wall_seconds']
+    total_ticks = summary['ticks']
+    latency = evaluation_latency.summary()
+    candles = sum(s['m1_closed'] for s in summary['symbols'].values())
+    signals = sum(s['signals'] for s in summary['symbols'].values())
+    print(f"{total_ticks:,} ticks, {candles} M1 candles, {latency['count']} evaluations, {signals} signals "
+          f"in {elapsed:.1f}s ({summary['speedup']:.0f}x real time, trades {summary['digest'][:12]})")
+    return [
+        report(result("meso.replay.ticks_per_second", round(total_ticks / elapsed, 1), "ticks/s", better="higher",
+                      ticks=total_ticks, hours=hours, symbols=list(symbols))),
+        report(result("meso.replay.wall_seconds", elapsed, "s")),
+        report(result("meso.dispatch.mean_us", summary['dispatch_us'], "us")),
+        report(result("meso.evaluation.p50_ms", latency['p50_ms'], "ms", count=latency['count'])),
+        report(result("meso.evaluation.p95_ms", latency['p95_ms'], "ms")),
+        report(result("meso.evaluation.p99_ms", latency['p99_ms'], "ms")),
+        report(result("meso.rss_growth_mb", round((process_rss_bytes() - rss_before) / 2**20, 2), "MB",
+                      signals=signals, candles=candles, digest=summary['digest'])),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hours', type=float, default=1.0, help="Durasi market yang disimulasikan")
+    parser.add_argument('--rate', type=float, default=10.0, help="Tick/detik per symbol")
+    parser.add_argument('--symbols', default='XAUUSD')
+    parser.add_argument('--output', default=None, help="Simpan hasil ke JSON")
+    args = parser.parse_args()
+    
+    symbols = tuple(s.strip().upper() for s in args.symbols.split(',') if s.strip())
+    results = run(args.hours, args.rate, symbols)
+    if args.output:
+        print(f"\nSaved: {save(results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark hot path: tick ingest, agregasi candle, indikator, strategy, risk check, Database
+
+Usage: python benchmarks/bench_micro.py [--quick] [--output results.json]
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import measure, save
+from app.aggregator import OHLCVAggregator
+from app.codec import Tick, TickDecoder
+from app.database import Database
+from app.mock_feed import synthetic_ticks
+from app.pipeline import SymbolPipeline
+from app.risk_manager import RiskManager
+from app.strategy import SignalStrategy
+from app.ws_manager import ExnessWebSocket
+
+STRATEGY_CONFIG = {'ema_fast': 5, 'ema_med': 10, 'ema_slow': 20, 'rsi_period': 14, 'atr_period': 14}
+
+
+def make_candles(count: int, seconds: int, seed: int = 42) -> list:
+    """Candle OHLCV dari random walk, bentuk sama dengan output aggregator"""
+    rng = random.Random(seed)
+    price = 2035.0
+    start = 1_700_000_000 - count * seconds
+    candles = []
+    for i in range(count):
+        open_ = price
+        closes = [price := price + rng.gauss(0, 0.3) for _ in range(10)]
+        candles.append({"timeframe": f"M{seconds // 60}", "timestamp": start + i * seconds, "open": open_,
+                        "high": max(closes + [open_]), "low": min(closes + [open_]), "close": closes[-1],
+                        "volume": 10})
+    return candles
+
+
+def make_buffer(seconds: int, rate: float, end: float) -> list:
+    """Tick buffer aggregator: seconds detik terakhir dengan rate tick/detik"""
+    source = synthetic_ticks(["XAUUSD"], seed=7)
+    count = int(seconds * rate)
+    buffer = []
+    for i in range(count):
+        _, bid, ask = next(source)
+        buffer.append({"timestamp": end - seconds + i / rate, "bid": bid, "ask": ask, "price": (bid + ask) / 2})
+    return buffer
+
+
+def bench_ingest(scale: float) -> list:
+    results = []
+    n = max(1000, int(20000 * scale))
+    source = synthetic_ticks(["XAUUSD"], seed=1)
+    ticks = [Tick("XAUUSD", bid, ask, time.time(), i + 1) for i, (_, bid, ask) in zip(range(n), source)]
+    frames = [json.dumps({"type": "tick", "pair": t.pair, "bid": t.bid, "ask": t.ask,
+                          "timestamp": int(t.timestamp * 1000)}).encode() for t in ticks]
+    
+    decoder = TickDecoder(["XAUUSD"])
+    frame_iter = itertools.cycle(frames)
+    results.append(measure("micro.ingest.decode", lambda: decoder.decode(next(frame_iter)), number=n))
+    
+    aggregator = OHLCVAggregator("XAUUSD")
+    tick_iter = itertools.cycle(ticks)
+    
+    def add_tick():
+        t = next(tick_iter)
+        aggregator.add_tick(t.bid, t.ask, t.timestamp)
+    results.append(measure("micro.ingest.aggregator_add_tick", add_tick, number=n,
+                           setup=lambda: aggregator.tick_buffer.clear()))
+    
+    pipeline = SymbolPipeline("XAUUSD", 0.01, STRATEGY_CONFIG)
+    results.append(measure("micro.ingest.pipeline_on_tick", lambda: pipeline.on_tick(next(tick_iter)), number=n,
+                           setup=lambda: pipeline.aggregator.tick_buffer.clear()))
+    
+    # Jalur penuh per tick: quote update + latency histogram + dispatch ke pipeline
+    ws = ExnessWebSocket(ws_url="ws://bench", pairs=["XAUUSD"])
+    pipeline = SymbolPipeline("XAUUSD", 0.01, STRATEGY_CONFIG)
+    ws.subscribe("XAUUSD", pipeline.on_tick)
+    results.append(measure("micro.ingest.ws_dispatch", lambda: ws.dispatch(next(tick_iter), time.perf_counter()),
+                           number=n, setup=lambda: pipeline.aggregator.tick_buffer.clear()))
+    return results
+
+
+def bench_aggregation(scale: float, rate: float) -> list:
+    results = []
+    number = max(5, int(50 * scale))
+    aggregator = OHLCVAggregator("XAUUSD")
+    # Buffer steady state: clear_old_ticks menyimpan 300 detik terakhir
+    aggregator.tick_buffer = make_buffer(300, rate, time.time())
+    for timeframe in ("M1", "M5"):
+        results.append(measure(f"micro.aggregate.{timeframe}",
+                               lambda tf=timeframe: aggregator.aggregate_to_timeframe(tf), number=number))
+    
+    results.append(measure("micro.aggregate.clear_old_ticks", aggregator.clear_old_ticks, number=number,
+                           setup=lambda: setattr(aggregator, 'tick_buffer', make_buffer(300, rate, time.time()))))
+    return results
+
+
+def bench_strategy(scale: float) -> list:
+    results = []
+    number = max(100, int(2000 * scale))
+    m1 = make_candles(50, 60, seed=1)
+    m5 = make_candles(50, 300, seed=2)
+    closes = [c['close'] for c in m5]
+    highs = [c['high'] for c in m5]
+    lows = [c['low'] for c in m5]
+    strategy = SignalStrategy(STRATEGY_CONFIG)
+    
+    results.append(measure("micro.indicator.ema20", lambda: strategy.calculate_ema(closes, 20), number=number))
+    results.append(measure("micro.indicator.rsi14", lambda: strategy.calculate_rsi(closes, 14), number=number))
+    results.append(measure("micro.indicator.stochastic", lambda: strategy.calculate_stochastic(highs, lows, closes),
+                           number=number))
+    results.append(measure("micro.indicator.atr14", lambda: strategy.calculate_atr(highs, lows, closes), number=number))
+    results.append(measure("micro.strategy.generate_signal",
+                           lambda: strategy.generate_signal(m1, m5, 2035.0, 2035.2, 2.0, 5.0), number=number))
+    
+    risk = RiskManager()
+    results.append(measure("micro.risk.can_generate_signal",
+                           lambda: risk.can_generate_signal(0.2, 60.0, 80.0, "XAUUSD"), number=number * 5))
+    return results
+
+
+def bench_database(scale: float) -> list:
+    """Semua method Database terhadap file SQLite sementara (termasuk biaya connect per method)"""
+    results = []
+    number = max(20, int(200 * scale))
+    workdir = tempfile.mkdtemp(prefix="bench_db_")
+    try:
+        db = Database(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+        counter = itertools.count()
+        candle = {"open": 2035.0, "high": 2036.0, "low": 2034.0, "close": 2035.5, "volume": 10}
+        bulk_start = itertools.count(2_000_000_000, 60_000)
+        
+        def bulk_rows():
+            start = next(bulk_start)
+            return [(start + i * 60, 2035.0, 2036.0, 2034.0, 2035.5, 10) for i in range(1000)]
+        
+        results.append(measure("micro.db.add_ohlcv", lambda: db.add_ohlcv("M1", next(counter) * 60, candle),
+                               number=number))
+        results.append(measure("micro.db.add_ohlcv_bulk_1000", lambda: db.add_ohlcv_bulk("M1", bulk_rows()),
+                               number=max(3, number // 20)))
+        results.append(measure("micro.db.count_ohlcv", lambda: db.count_ohlcv("M1"), number=number))
+        results.append(measure("micro.db.iter_ohlcv", lambda: sum(len(c) for c in db.iter_ohlcv("M1")),
+                               number=max(3, number // 20)))
+        results.append(measure("micro.db.get_recent_ohlcv", lambda: db.get_recent_ohlcv("M1", 100), number=number))
+        
+        signal_ids = []
+        
+        def add_trade():
+            signal_id = f"bench_{next(counter)}"
+            signal_ids.append(signal_id)
+            db.add_trade(signal_id, "XAUUSD", "BUY", 2035.2, 2032.7, 2039.7, "2024-01-01T00:00:00", 80.0, True)
+        results.append(measure("micro.db.add_trade", add_trade, number=number))
+        trade_iter = itertools.cycle(signal_ids)
+        results.append(measure("micro.db.update_trade_result",
+                               lambda: db.update_trade_result(next(trade_iter), 2039.7, 45.0, 4.5, "WIN"),
+                               number=number))
+        trace = '{"id":"XAUUSD:1","seq":1,"t0":0,"hops":[["tick_recv",0.0],["delivered",12.5]]}'
+        results.append(measure("micro.db.update_trade_trace",
+                               lambda: db.update_trade_trace(next(trade_iter), trace), number=number))
+        results.append(measure("micro.db.get_trade_trace", lambda: db.get_trade_trace(), number=number))
+        results.append(measure("micro.db.get_trades", lambda: db.get_trades(20), number=number))
+        results.append(measure("micro.db.get_performance", lambda: db.get_performance(24), number=number))
+        results.append(measure("micro.db.count_trades", db.count_trades, number=number))
+        results.append(measure("micro.db.iter_trades", lambda: sum(len(c) for c in db.iter_trades()),
+                               number=max(3, number // 20)))
+        
+        results.append(measure("micro.db.set_state", lambda: db.set_state("bench", str(next(counter))), number=number))
+        results.append(measure("micro.db.get_state", lambda: db.get_state("bench"), number=number))
+        results.append(measure("micro.db.log_ws_health", lambda: db.log_ws_health(120.0, "OK"), number=number))
+        
+        delivery_rows = [(chat_id, "sent", None) for chat_id in range(100)]
+        results.append(measure("micro.db.add_delivery_results_100",
+                               lambda: db.add_delivery_results(f"bc_{next(counter)}", delivery_rows), number=number))
+        
+        chats = itertools.count(100000)
+        results.append(measure("micro.db.apply_subscriber_changes_100",
+                               lambda: db.apply_subscriber_changes([(next(chats), True) for _ in range(100)]),
+                               number=number))
+        results.append(measure("micro.db.get_subscribers", db.get_subscribers, number=number))
+        filters = [(chat_id, '{"direction":"BUY"}') for chat_id in range(100000, 100100)]
+        results.append(measure("micro.db.save_subscriber_filters_100", lambda: db.save_subscriber_filters(filters),
+                               number=number))
+        results.append(measure("micro.db.get_subscriber_filters", db.get_subscriber_filters, number=number))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def run(scale: float = 1.0, rate: float = 10.0) -> list:
+    """Semua microbenchmark; scale < 1 untuk run cepat (CI/smoke)"""
+    import logging
+    # Log per trade/OHLCV di Database ikut terukur kalau level INFO
+    logging.disable(logging.INFO)
+    try:
+        return bench_ingest(scale) + bench_aggregation(scale, rate) + bench_strategy(scale) + bench_database(scale)
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--quick', action='store_true', help="Iterasi lebih sedikit (smoke run)")
+    parser.add_argument('--rate', type=float, default=10.0, help="Tick/detik untuk tick buffer agregasi")
+    parser.add_argument('--output', default=None, help="Simpan hasil ke JSON")
+    args = parser.parse_args()
+    
+    results = run(0.1 if args.quick else 1.0, args.rate)
+    if args.output:
+        print(f"\nSaved: {save(results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
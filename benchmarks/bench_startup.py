@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Cold start: proses baru sampai tick pertama diproses, plus RSS baseline
+
+Setiap sample adalah interpreter baru (bench_startup.py --child) yang meng-import app.main, membuat
+BotOrchestrator dan connect ke mock feed lokal. Waktu dihitung dari sebelum spawn sampai handler
+pipeline selesai memproses tick pertama; RSS diambil setelah init (baseline) dan saat tick pertama.
+
+Usage: python benchmarks/bench_startup.py [--samples 10]
+"""
+import time
+
+STARTED = time.time()
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Modul berat yang seharusnya tidak ter-load sebelum tick pertama
+HEAVY_MODULES = ('pandas', 'numpy', 'telegram', 'httpx', 'matplotlib')
+
+
+def child(spawned: float):
+    """Satu cold start (jalan di proses benchmark yang baru di-spawn), hasil JSON di baris terakhir stdout"""
+    import asyncio
+    
+    from app.main import BotOrchestrator
+    imported = time.time()
+    orchestrator = BotOrchestrator()
+    initialized = time.time()
+    
+    from app.metrics import process_rss_bytes
+    rss_idle = process_rss_bytes()
+    first = {}
+    
+    async def first_tick():
+        ws = orchestrator.ws_manager
+        done = asyncio.Event()
+        
+        def on_tick(tick):
+            # Handler terakhir di dispatch table: pipeline symbol sudah memproses tick ini
+            if not done.is_set():
+                first['at'] = time.time()
+                done.set()
+        
+        for symbol in orchestrator.pipelines:
+            ws.subscribe(symbol, on_tick)
+        feed_task = asyncio.create_task(ws.run())
+        await asyncio.wait_for(done.wait(), timeout=30)
+        first['rss'] = process_rss_bytes()
+        await ws.stop()
+        feed_task.cancel()
+    
+    asyncio.run(first_tick())
+    orchestrator.compute.shutdown()
+    print(json.dumps({
+        "interpreter_ms": (STARTED - spawned) * 1000,
+        "import_ms": (imported - STARTED) * 1000,
+        "init_ms": (initialized - imported) * 1000,
+        "first_tick_ms": (first['at'] - spawned) * 1000,
+        "rss_idle_mb": rss_idle / 2**20,
+        "rss_first_tick_mb": first['rss'] / 2**20,
+        "heavy_modules": [m for m in HEAVY_MODULES if m in sys.modules],
+    }))
+
+
+def wait_for_port(port: int, timeout: float = 10.0):
+    import socket
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Mock feed tidak listen di port {port}")
+
+
+def run(samples: int = 10, symbols: tuple = ("XAUUSD",)) -> list:
+    import multiprocessing
+    import shutil
+    import tempfile
+    
+    from benchmarks.bench_macro import free_port
+    from benchmarks.harness import ROOT, report, result
+    from app.mock_feed import FeedConfig, FeedStats, _run_server_process
+    
+    port = free_port()
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    feed = multiprocessing.Process(target=_run_server_process,
+                                   args=(FeedConfig(rate=200, seed=42), FeedStats(), "127.0.0.1", port), daemon=True)
+    feed.start()
+    env = dict(os.environ, WS_URL=f"ws://127.0.0.1:{port}", SYMBOLS=','.join(symbols),
+               DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'startup.db')}", PROCESS_MODE='single')
+    env.pop('FEED_RING_NAME', None)
+    rows = []
+    try:
+        wait_for_port(port)
+        for _ in range(samples):
+            spawned = time.time()
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), '--child', repr(spawned)],
+                                  cwd=ROOT, env=env, capture_output=True, text=True, timeout=60)
+            if proc.returncode != 0:
+                raise RuntimeError(f"Cold start gagal:\n{proc.stderr[-2000:]}")
+            rows.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    finally:
+        feed.terminate()
+        feed.join(timeout=5)
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    def stat(key):
+        values = [row[key] for row in rows]
+        return round(min(values), 2), round(statistics.median(values), 2)
+    
+    heavy = sorted({m for row in rows for m in row['heavy_modules']})
+    print(f"{samples} cold starts, heavy modules loaded before first tick: {', '.join(heavy) or 'none'}")
+    results = []
+    for key, name, unit in (("first_tick_ms", "startup.first_tick_ms", "ms"),
+                            ("interpreter_ms", "startup.interpreter_ms", "ms"),
+                            ("import_ms", "startup.import_ms", "ms"),
+                            ("init_ms", "startup.init_ms", "ms"),
+                            ("rss_idle_mb", "startup.baseline_rss_mb", "MB"),
+                            ("rss_first_tick_mb", "startup.first_tick_rss_mb", "MB")):
+        best, median = stat(key)
+        extra = {"heavy_modules": heavy} if key == "first_tick_ms" else {}
+        results.append(report(result(name, best, unit, median=median, samples=samples, **extra)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--samples', type=int, default=10, help="Jumlah cold start")
+    parser.add_argument('--symbols', default='XAUUSD')
+    parser.add_argument('--output', default=None, help="Simpan hasil ke JSON")
+    parser.add_argument('--child', type=float, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child is not None:
+        child(args.child)
+        return
+    
+    symbols = tuple(s.strip().upper() for s in args.symbols.split(',') if s.strip())
+    results = run(args.samples, symbols)
+    if args.output:
+        from benchmarks.harness import save
+        print(f"\nSaved: {save(results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
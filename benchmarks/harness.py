@@ -0,0 +1,123 @@
+"""
+Helper bersama benchmark suite: timing, format hasil JSON dan deteksi regresi
+
+Setiap hasil adalah dict {"name", "value", "unit", "better", ...extra};
+better = "lower" (durasi) atau "higher" (throughput), dipakai saat membandingkan run.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+
+def result(name: str, value: float, unit: str, better: str = "lower", **extra) -> Dict:
+    record = {"name": name, "value": value, "unit": unit, "better": better}
+    record.update(extra)
+    return record
+
+
+def measure(name: str, func: Callable[[], object], number: int = 1000, repeat: int = 5,
+            setup: Optional[Callable[[], object]] = None) -> Dict:
+    """
+    Waktu per panggilan (µs): repeat sample x number panggilan
+    Nilai = sample tercepat (paling sedikit noise dari proses lain, seperti timeit); median ikut disimpan.
+    setup dipanggil sebelum tiap sample (di luar timing), mis. untuk reset state
+    """
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+    best = min(samples)
+    median = statistics.median(samples)
+    record = result(name, round(best, 3), "us", median=round(median, 3), number=number, repeat=repeat)
+    print(f"{name:<40} {best:>12.2f} µs  (median {median:.2f}, {number}x{repeat})")
+    return record
+
+
+def report(record: Dict) -> Dict:
+    """Print satu hasil non-measure (throughput, latency) dengan format yang sama"""
+    print(f"{record['name']:<40} {record['value']:>12.2f} {record['unit']}")
+    return record
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def metadata() -> Dict:
+    return {
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "git": git_revision(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "argv": sys.argv[1:],
+    }
+
+
+def save(results: List[Dict], path: Optional[str] = None) -> str:
+    """Tulis run ke JSON (default benchmarks/results/<timestamp>_<git>.json)"""
+    meta = metadata()
+    if path is None:
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        path = os.path.join(RESULTS_DIR, f"{stamp}_{meta['git'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({"meta": meta, "results": {r["name"]: r for r in results}}, f, indent=2)
+    return path
+
+
+def load(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.10) -> List[Dict]:
+    """
+    Bandingkan dua run per nama benchmark
+    change > 0 berarti lebih buruk (lebih lambat / throughput turun); regression jika change > threshold
+    """
+    rows = []
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None or not before["value"]:
+            continue
+        ratio = now["value"] / before["value"]
+        change = ratio - 1 if now["better"] == "lower" else 1 / ratio - 1 if ratio else float('inf')
+        rows.append({
+            "name": name,
+            "before": before["value"],
+            "after": now["value"],
+            "unit": now["unit"],
+            "change": change,
+            "regression": change > threshold,
+        })
+    return rows
+
+
+def print_comparison(rows: List[Dict], threshold: float):
+    print(f"\n{'benchmark':<40} {'before':>12} {'after':>12}  change")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else "  improved" if row["change"] < -threshold else ""
+        print(f"{row['name']:<40} {row['before']:>12.2f} {row['after']:>12.2f}  "
+              f"{row['change'] * 100:+6.1f}% {row['unit']}{flag}")
+    regressions = [row for row in rows if row["regression"]]
+    print(f"\n{len(regressions)} regression(s) beyond {threshold:.0%}")
+
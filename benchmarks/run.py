@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: startup (cold start sampai tick pertama + RSS baseline), micro (hot path per fungsi),
+meso (1 jam tick sintetis lewat orchestrator), macro (tick -> Telegram end-to-end terhadap mock feed + fake Bot API)
+
+Hasil disimpan sebagai JSON di benchmarks/results/; --compare membandingkan dengan run lain dan
+exit code 1 jika ada benchmark yang memburuk lebih dari --threshold.
+
+Usage:
+    python benchmarks/run.py                                  # startup + micro + meso
+    python benchmarks/run.py --tiers micro,meso,macro --quick
+    python benchmarks/run.py --compare benchmarks/results/baseline.json --threshold 0.15
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import bench_macro, bench_meso, bench_micro, bench_startup
+from benchmarks.harness import compare, load, print_comparison, save
+
+TIERS = ('startup', 'micro', 'meso', 'macro')
+
+
+def run_tiers(tiers, quick: bool) -> list:
+    results = []
+    if 'startup' in tiers:
+        print("== startup ==")
+        results += bench_startup.run(samples=3 if quick else 10)
+    if 'micro' in tiers:
+        print("\n== micro ==")
+        results += bench_micro.run(scale=0.1 if quick else 1.0)
+    if 'meso' in tiers:
+        print("\n== meso ==")
+        results += bench_meso.run(hours=0.25 if quick else 1.0)
+    if 'macro' in tiers:
+        print("\n== macro ==")
+        results += bench_macro.run(duration=75.0 if quick else 150.0)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tiers', default='startup,micro,meso', help=f"Subset dari {','.join(TIERS)}")
+    parser.add_argument('--quick', action='store_true', help="Iterasi/durasi lebih pendek (smoke run)")
+    parser.add_argument('--output', default=None, help="Path JSON hasil (default benchmarks/results/...)")
+    parser.add_argument('--compare', default=None, help="JSON run sebelumnya sebagai baseline")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Batas regresi relatif (0.10 = 10%%)")
+    args = parser.parse_args()
+    
+    tiers = [t.strip() for t in args.tiers.split(',') if t.strip()]
+    unknown = set(tiers) - set(TIERS)
+    if unknown:
+        parser.error(f"Unknown tier: {', '.join(sorted(unknown))}")
+    
+    results = run_tiers(tiers, args.quick)
+    path = save(results, args.output)
+    print(f"\nSaved: {path}")
+    
+    if args.compare:
+        rows = compare(load(args.compare), load(path), args.threshold)
+        print_comparison(rows, args.threshold)
+        if any(row["regression"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
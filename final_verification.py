@@ -79,17 +79,10 @@ except:
     checks.append(False)
 
 try:
-    import websocket
-    print("   ✅ websocket-client")
+    import websockets
+    print("   ✅ websockets")
 except:
-    print("   ❌ websocket-client - NOT INSTALLED")
-    checks.append(False)
-
-try:
-    import pandas
-    print("   ✅ pandas")
-except:
-    print("   ❌ pandas - NOT INSTALLED")
+    print("   ❌ websockets - NOT INSTALLED")
     checks.append(False)
 
 try:
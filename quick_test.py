@@ -30,9 +30,7 @@ async def test_run():
     orchestrator = BotOrchestrator()
     
     # Start WebSocket in background
-    import threading
-    ws_thread = threading.Thread(target=orchestrator.run_websocket, daemon=True)
-    ws_thread.start()
+    feed_task = asyncio.create_task(orchestrator.ws_manager.run())
     
     # Wait untuk koneksi
     wait_time = 0
@@ -55,6 +53,9 @@ async def test_run():
         logger.warning("⚠️ WebSocket tidak bisa connect (WebSocket EXNESS mungkin tidak tersedia)")
         logger.info("✅ Namun bot architecture sudah OK, siap deploy!")
     
+    await orchestrator.ws_manager.stop()
+    feed_task.cancel()
+    
     logger.info("\n" + "=" * 60)
     logger.info("📊 BOT STATUS SUMMARY:")
     logger.info("=" * 60)
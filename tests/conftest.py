@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STRATEGY_CONFIG = {'ema_fast': 5, 'ema_med': 10, 'ema_slow': 20, 'rsi_period': 14, 'atr_period': 14}
+
+
+@pytest.fixture
+def telegram_bot(tmp_path):
+    """TelegramBot dengan komponen asli di atas database sementara (tanpa koneksi Telegram)"""
+    from app.bot import TelegramBot
+    from app.database import Database
+    from app.pipeline import SymbolPipeline
+    from app.risk_manager import RiskManager
+    from app.ws_manager import ExnessWebSocket
+    
+    ws = ExnessWebSocket(ws_url="ws://test", pairs=["XAUUSD"])
+    pipeline = SymbolPipeline("XAUUSD", 0.01, STRATEGY_CONFIG)
+    bot = TelegramBot(token="TEST", authorized_users=[1], admin_users=[1], ws_manager=ws,
+                      risk_manager=RiskManager(), strategy=pipeline.strategy,
+                      database=Database(f"sqlite:///{tmp_path / 'test.db'}"), pipelines={"XAUUSD": pipeline})
+    yield bot
+    bot.charts.shutdown()
@@ -0,0 +1,73 @@
+from app.aggregator import OHLCVAggregator
+from app.clock import SimulatedClock
+from app.codec import Tick
+from app.pipeline import SymbolPipeline
+
+START = 1_704_153_600.0  # 2024-01-02 00:00 UTC
+STRATEGY_CONFIG = {'ema_fast': 5, 'ema_med': 10, 'ema_slow': 20, 'rsi_period': 14, 'atr_period': 14}
+
+
+def test_timeframe_seconds():
+    seconds = OHLCVAggregator._get_timeframe_seconds
+    assert [seconds(tf) for tf in ("M1", "M5", "M15", "H1", "D1", "5M")] == [60, 300, 900, 3600, 86400, 300]
+
+
+def test_rollover_returns_completed_candle():
+    aggregator = OHLCVAggregator("XAUUSD")
+    prices = [10.0, 12.0, 9.0, 11.0]
+    for i, price in enumerate(prices):
+        assert aggregator.add_tick(price, price, START + i * 10) == []
+    
+    closed = aggregator.add_tick(20.0, 20.0, START + 60)
+    assert closed == [{'timeframe': 'M1', 'timestamp': START, 'open': 10.0, 'high': 12.0, 'low': 9.0,
+                       'close': 11.0, 'volume': 4}]
+    # Candle berjalan baru dimulai dari tick rollover
+    assert aggregator.aggregate_to_timeframe("M1")['volume'] == 1
+    assert aggregator.aggregate_to_timeframe("M5")['volume'] == 5
+
+
+def test_late_tick_does_not_touch_closed_candle():
+    aggregator = OHLCVAggregator("XAUUSD")
+    aggregator.add_tick(10.0, 10.0, START)
+    closed = aggregator.add_tick(11.0, 11.0, START + 61)[0]
+    aggregator.add_tick(50.0, 50.0, START + 30)
+    assert closed['high'] == 10.0
+    assert aggregator.aggregate_to_timeframe("M1")['high'] == 11.0
+
+
+def test_aggregate_non_live_timeframe_from_buffer():
+    aggregator = OHLCVAggregator("XAUUSD")
+    for i in range(5):
+        aggregator.add_tick(1.0 + i, 1.0 + i, START + i * 600)
+    candle = aggregator.aggregate_to_timeframe("H1")
+    assert (candle['timestamp'], candle['open'], candle['close'], candle['volume']) == (START, 1.0, 5.0, 5)
+
+
+def test_pipeline_publishes_full_candles_copy_on_write():
+    clock = SimulatedClock(START)
+    pipeline = SymbolPipeline("XAUUSD", 0.01, STRATEGY_CONFIG, clock)
+    seq = 0
+    
+    def tick(price, at):
+        nonlocal seq
+        seq += 1
+        clock.advance_to(at)
+        pipeline.on_tick(Tick("XAUUSD", price, price, at, seq))
+    
+    for i in range(6):
+        tick(100.0 + i, START + i * 10)
+    tick(200.0, START + 60)
+    
+    assert pipeline.closed_m1_seq == 1
+    m1, m5 = pipeline.snapshot()
+    assert m1 == [{'timeframe': 'M1', 'timestamp': START, 'open': 100.0, 'high': 105.0, 'low': 100.0,
+                   'close': 105.0, 'volume': 6}]
+    assert m5 == []
+    assert pipeline.closed_candles("M1") == m1
+    assert pipeline.close_tick.seq == 7
+    
+    # Snapshot yang sudah diberikan ke compute stage tidak berubah oleh candle berikutnya
+    tick(201.0, START + 120)
+    assert len(m1) == 1
+    assert len(pipeline.m1_candles) == 2
+    assert pipeline.m1_candles[-1]['open'] == 200.0
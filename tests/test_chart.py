@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from app.clock import SimulatedClock
+from app.codec import Tick
+
+START = 1_704_153_600.0  # 2024-01-02 00:00 UTC
+
+
+def test_chart_candles_are_completed_live_candles(telegram_bot):
+    pipeline = telegram_bot.pipelines["XAUUSD"]
+    pipeline.clock = SimulatedClock(START)
+    for i in range(3 * 60 + 1):
+        price = 2000.0 + (i % 7)
+        pipeline.clock.advance_to(START + i)
+        pipeline.on_tick(Tick("XAUUSD", price, price, START + i, i + 1))
+    
+    candles = asyncio.run(telegram_bot._chart_candles("XAUUSD", "M1", 10))
+    assert [c['timestamp'] for c in candles] == [START, START + 60, START + 120]
+    assert all(c['volume'] == 60 and c['high'] == 2006.0 and c['low'] == 2000.0 for c in candles)
+
+
+def test_chart_higher_timeframe_uses_history_only(telegram_bot):
+    assert asyncio.run(telegram_bot._chart_candles("XAUUSD", "H1", 10)) == []
+    telegram_bot.database.add_ohlcv_bulk("H1", [(int(START) + i * 3600, 1.0, 2.0, 0.5, 1.5, 10) for i in range(3)])
+    candles = asyncio.run(telegram_bot._chart_candles("XAUUSD", "H1", 10))
+    assert [c['timestamp'] for c in candles] == [START, START + 3600, START + 7200]
+
+
+
+def test_renderer_cache_key_follows_history_and_uses_spawn(tmp_path):
+    pytest.importorskip("matplotlib")
+    from app.charts import ChartRenderer
+    
+    candles = [{'timestamp': START + i * 60, 'open': 1.0 + i, 'high': 2.0 + i, 'low': 0.5 + i, 'close': 1.5 + i}
+               for i in range(30)]
+    reimported = [dict(c) for c in candles]
+    reimported[3]['close'] += 0.25
+    renderer = ChartRenderer(cache_dir=str(tmp_path))
+    
+    async def scenario():
+        first = await renderer.render("XAUUSD", "H1", candles, 30)
+        again = await renderer.render("XAUUSD", "H1", candles, 30)
+        changed = await renderer.render("XAUUSD", "H1", reimported, 30)
+        return first, again, changed
+    
+    try:
+        first, again, changed = asyncio.run(scenario())
+        assert renderer.pool._mp_context.get_start_method() == "spawn"
+    finally:
+        renderer.shutdown()
+    assert first == again and first != changed
+    assert renderer.stats == {"hits": 1, "renders": 2, "errors": 0}
@@ -0,0 +1,113 @@
+import asyncio
+from datetime import timezone
+
+import pytest
+
+from app.clock import SYSTEM_CLOCK, AcceleratedClock, SimulatedClock, clock_from_env
+from app.compute import ComputeStage
+
+START = 1_704_153_600.0  # 2024-01-02 00:00 UTC
+
+
+def test_simulated_clock_only_moves_forward():
+    clock = SimulatedClock(START)
+    assert clock.time() == START and clock.monotonic() == 0
+    clock.advance(90)
+    clock.advance_to(START + 30)
+    assert clock.time() == START + 90 and clock.monotonic() == 90
+    assert clock.now(timezone.utc).isoformat() == "2024-01-02T00:01:30+00:00"
+
+
+def test_simulated_sleep_wakes_in_deadline_order():
+    async def scenario():
+        clock = SimulatedClock(START)
+        woke = []
+        
+        async def sleeper(name, seconds):
+            await clock.sleep(seconds)
+            woke.append((name, clock.time() - START))
+        
+        tasks = [asyncio.create_task(sleeper("slow", 5)), asyncio.create_task(sleeper("fast", 1))]
+        await asyncio.sleep(0)
+        assert clock.next_wakeup() == START + 1
+        assert clock.advance(0.5) == 0
+        assert clock.advance_to(START + 10) == 2
+        await asyncio.gather(*tasks)
+        return woke, clock.next_wakeup()
+    
+    woke, wakeup = asyncio.run(scenario())
+    assert woke == [("fast", 10), ("slow", 10)]
+    assert wakeup is None
+
+
+def test_accelerated_clock():
+    clock = AcceleratedClock(60, start=START)
+    assert START <= clock.time() < START + 60
+    with pytest.raises(ValueError):
+        AcceleratedClock(0)
+
+
+def test_clock_from_env(monkeypatch):
+    monkeypatch.setenv('CLOCK_SPEED', '1')
+    assert clock_from_env() is SYSTEM_CLOCK
+    monkeypatch.setenv('CLOCK_SPEED', '10')
+    assert isinstance(clock_from_env(), AcceleratedClock)
+
+
+def test_compute_deadline_uses_clock():
+    clock = SimulatedClock(START)
+    
+    def slow_in_clock_time():
+        clock.advance(5)
+        return "done"
+    
+    async def scenario():
+        compute = ComputeStage(max_workers=1, deadline=2.0, clock=clock)
+        try:
+            kept = await compute.run(lambda: "done", event_time=clock.monotonic())
+            late = await compute.run(slow_in_clock_time, event_time=clock.monotonic())
+            clock.advance(3)
+            stale = await compute.run(lambda: "done", event_time=clock.monotonic() - 3)
+            return kept, late, stale, compute.stats
+        finally:
+            compute.shutdown()
+    
+    kept, late, stale, stats = asyncio.run(scenario())
+    assert (kept, late, stale) == ("done", None, None)
+    assert stats["dropped_late"] == 1 and stats["dropped_queued"] == 1
+
+
+def test_signal_time_and_quiet_hours_follow_clock(telegram_bot):
+    from app.delivery import DeliveryReport
+    from app.filters import SubscriberFilter
+    
+    telegram_bot.clock = SimulatedClock(START)  # 07:00 WIB
+    telegram_bot.application = object()
+    sent = []
+    
+    async def deliver(recipients, text, **kwargs):
+        sent.append((sorted(recipients), text))
+        return DeliveryReport(len(recipients))
+    
+    telegram_bot.delivery.deliver = deliver
+    telegram_bot.subscribers.add(1)
+    telegram_bot.subscribers.add(2)
+    telegram_bot.subscribers.set_filter(2, SubscriberFilter(quiet_start=6, quiet_end=8))
+    asyncio.run(telegram_bot.send_signal("BUY", 2000.0, 1990.0, 2010.0, 80, 1.0, 0.1, 10.0))
+    
+    recipients, text = sent[0]
+    assert recipients == [1]
+    assert "Signal Time: 2024-01-02 00:00:00 UTC / 07:00 WIB" in text
+
+
+def test_incomplete_clock_fails_at_instantiation():
+    from app.clock import Clock
+    
+    class WallOnly(Clock):
+        def time(self):
+            return START
+    
+    with pytest.raises(TypeError):
+        WallOnly()
+    with pytest.raises(TypeError):
+        Clock()
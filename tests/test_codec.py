@@ -0,0 +1,46 @@
+import json
+
+import pytest
+
+from app.codec import TickDecoder
+
+
+def frame(**fields):
+    return json.dumps(dict({"type": "tick", "pair": "XAUUSD", "bid": 2000.1, "ask": 2000.3}, **fields))
+
+
+@pytest.mark.parametrize("backend", ["json", "auto"])
+def test_decode_tick_str_and_bytes(backend):
+    decoder = TickDecoder(["XAUUSD"], backend=backend)
+    tick = decoder.decode(frame(timestamp=1_704_153_600_500))
+    assert (tick.pair, tick.bid, tick.ask, tick.timestamp, tick.seq) == ("XAUUSD", 2000.1, 2000.3, 1_704_153_600.5, 1)
+    assert decoder.decode(frame().encode()).seq == 2
+    assert decoder.stats == {'frames': 2, 'prefiltered': 0, 'parsed': 2, 'ticks': 2, 'errors': 0}
+
+
+def test_prefilter_rejects_without_parsing():
+    decoder = TickDecoder(["XAUUSD"], backend="json")
+    for message in ('{"type": "heartbeat"}', frame(pair="EURUSD"), frame(pair="EURUSD").encode(), b'{"type":"ping"}'):
+        assert not decoder.accepts(message)
+        assert decoder.decode(message) is None
+    assert decoder.stats['prefiltered'] == 4
+    assert decoder.stats['parsed'] == 0
+
+
+def test_prefilter_substring_match_is_validated_after_parse():
+    decoder = TickDecoder(["XAUUSD"], backend="json")
+    # Lolos pre-filter (token "tick" dan "XAUUSD" ada), tapi bukan frame tick untuk XAUUSD
+    assert decoder.decode('{"type": "info", "note": "tick", "pair": "XAUUSD"}') is None
+    assert decoder.decode(frame(pair="EURUSD", note="XAUUSD")) is None
+    assert decoder.decode('{"type": "tick", "pair": "XAUUSD", "bid": "x"}') is None
+    assert decoder.stats['prefiltered'] == 0
+    assert decoder.stats['parsed'] == 3
+    assert decoder.stats['errors'] == 1
+    assert decoder.stats['ticks'] == 0
+
+
+def test_set_pairs_updates_prefilter():
+    decoder = TickDecoder(["XAUUSD"], backend="json")
+    decoder.set_pairs(["EURUSD"])
+    assert decoder.decode(frame()) is None
+    assert decoder.decode(frame(pair="EURUSD")).pair == "EURUSD"
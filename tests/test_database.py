@@ -0,0 +1,37 @@
+import sqlite3
+
+from app import database as database_module
+from app.database import Database
+
+
+def test_ohlcv_dedup_runs_once_as_migration(tmp_path, monkeypatch):
+    path = str(tmp_path / "old.db")
+    # Database lama: tabel tanpa unique index, berisi candle duplikat
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE ohlcv_cache (id INTEGER PRIMARY KEY AUTOINCREMENT, timeframe TEXT NOT NULL, "
+                 "timestamp_utc INTEGER NOT NULL, open REAL, high REAL, low REAL, close REAL, volume INTEGER, "
+                 "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)")
+    conn.executemany("INSERT INTO ohlcv_cache (timeframe, timestamp_utc, close) VALUES (?, ?, ?)",
+                     [("M1", 60, 1.0), ("M1", 60, 2.0), ("M1", 120, 3.0)])
+    conn.commit()
+    conn.close()
+    
+    statements = []
+    connect = sqlite3.connect
+    
+    def traced_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(statements.append)
+        return conn
+    
+    monkeypatch.setattr(database_module.sqlite3, "connect", traced_connect)
+    Database(f"sqlite:///{path}")
+    assert any("DELETE FROM ohlcv_cache" in s for s in statements)
+    
+    conn = connect(path)
+    assert conn.execute("SELECT timestamp_utc, close FROM ohlcv_cache ORDER BY id").fetchall() == [(60, 1.0), (120, 3.0)]
+    conn.close()
+    
+    statements.clear()
+    Database(f"sqlite:///{path}")
+    assert statements and not any("DELETE FROM ohlcv_cache" in s for s in statements)
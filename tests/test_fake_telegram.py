@@ -0,0 +1,40 @@
+import asyncio
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+import pytest
+
+from app.fake_telegram import _harness_result, run_bench
+
+
+def _exit(code):
+    sys.exit(code)
+
+
+@pytest.fixture
+def restore_environ():
+    saved = dict(os.environ)
+    yield
+    os.environ.clear()
+    os.environ.update(saved)
+
+
+def test_harness_result_reports_dead_process():
+    results = multiprocessing.Queue()
+    harness = multiprocessing.Process(target=_exit, args=(3,))
+    harness.start()
+    harness.join()
+    assert _harness_result(results, harness, timeout=30) == {"error": "harness exited with code 3 without a result"}
+
+
+def test_bench_fails_fast_when_api_port_is_taken(restore_environ):
+    with socket.socket() as busy:
+        busy.bind(("127.0.0.1", 0))
+        busy.listen()
+        started = time.monotonic()
+        result = asyncio.run(run_bench(10, 10, "/help", users=1, api_port=busy.getsockname()[1], webhook_port=0))
+    assert "error" in result
+    assert time.monotonic() - started < 5
@@ -0,0 +1,50 @@
+import itertools
+import random
+
+from app.filters import FilterIndex, SubscriberFilter
+
+
+def test_exact_threshold_kept():
+    assert SubscriberFilter(min_confidence=75).min_confidence == 75
+    assert SubscriberFilter.from_json(SubscriberFilter(min_confidence=95).to_json()).min_confidence == 95
+
+
+def test_boundary_band_rechecks_exact_threshold():
+    index = FilterIndex()
+    index.add(1, SubscriberFilter(min_confidence=75))
+    index.add(2, SubscriberFilter(min_confidence=95))
+    index.add(3, SubscriberFilter(min_confidence=70))
+    
+    assert index.recipients("BUY", 72, "XAUUSD", 3) == {3}
+    assert index.recipients("BUY", 75, "XAUUSD", 3) == {1, 3}
+    assert index.recipients("BUY", 92, "XAUUSD", 3) == {1, 3}
+    assert index.recipients("BUY", 96, "XAUUSD", 3) == {1, 2, 3}
+    
+    index.remove(1)
+    assert index.recipients("BUY", 78, "XAUUSD", 3) == {3}
+    assert 70 not in index.boundary
+    
+    index.add(2, SubscriberFilter(min_confidence=80))
+    assert index.recipients("BUY", 92, "XAUUSD", 3) == {2, 3}
+    assert index.boundary == {}
+
+
+def test_index_matches_direct_evaluation():
+    rng = random.Random(7)
+    index = FilterIndex()
+    filters = {}
+    for chat_id in range(200):
+        f = SubscriberFilter(
+            directions=rng.choice([None, frozenset(["BUY"]), frozenset(["SELL"])]),
+            min_confidence=rng.choice([0, 45, 50, 65, 75, 80, 95, rng.uniform(0, 100)]),
+            symbols=rng.choice([None, frozenset(["XAUUSD"]), frozenset(["XAGUSD", "EURUSD"])]),
+            quiet_start=rng.choice([None, 22, 8]),
+            quiet_end=rng.choice([None, 6, 17]),
+        )
+        filters[chat_id] = f
+        index.add(chat_id, f)
+    
+    for direction, symbol, confidence, hour in itertools.product(
+            ("BUY", "SELL"), ("XAUUSD", "XAGUSD", "GBPUSD"), (0, 49.9, 50, 74, 75, 88, 95, 100), (0, 12, 23)):
+        expected = {cid for cid, f in filters.items() if f.matches(direction, confidence, symbol, hour)}
+        assert index.recipients(direction, confidence, symbol, hour) == expected
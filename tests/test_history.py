@@ -0,0 +1,24 @@
+import gc
+import warnings
+import zipfile
+
+from app.history import open_text, read_candles_csv
+
+ROWS = "timestamp,open,high,low,close,volume\n1704153600,1,2,0.5,1.5,10\n1704153660,1.5,3,1,2,5\n"
+
+
+def test_zip_member_read_and_archive_closed(tmp_path):
+    path = str(tmp_path / "candles.zip")
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("candles.csv", ROWS)
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", ResourceWarning)
+        assert list(read_candles_csv(path)) == [(1704153600, 1.0, 2.0, 0.5, 1.5, 10),
+                                                (1704153660, 1.5, 3.0, 1.0, 2.0, 5)]
+        with open_text(path) as f:
+            raw = f.buffer._fileobj._file
+            assert f.read() == ROWS
+            assert not raw.closed
+        assert raw.closed
+        gc.collect()
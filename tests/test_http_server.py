@@ -0,0 +1,68 @@
+import asyncio
+
+from app.http_server import HttpServer, text_response
+
+
+async def ok(request):
+    return text_response(200, f"{len(request.body)}")
+
+
+async def exchange(raw: bytes, **kwargs) -> bytes:
+    """Kirim raw bytes ke server baru, return semua respons sampai koneksi ditutup"""
+    server = HttpServer("127.0.0.1", 0, **kwargs)
+    server.route("POST", "/hook", ok)
+    await server.start()
+    try:
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        writer.write(raw)
+        await writer.drain()
+        data = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        return data
+    finally:
+        await server.stop()
+
+
+def status(data: bytes) -> int:
+    return int(data.split(b" ", 2)[1])
+
+
+def test_body_is_read():
+    data = asyncio.run(exchange(b"POST /hook HTTP/1.1\r\nContent-Length: 3\r\nConnection: close\r\n\r\nabc"))
+    assert status(data) == 200 and data.endswith(b"\r\n\r\n3")
+
+
+def test_bad_content_length_rejected():
+    for value in (b"abc", b"-5"):
+        data = asyncio.run(exchange(b"POST /hook HTTP/1.1\r\nContent-Length: " + value + b"\r\n\r\n"))
+        assert status(data) == 400
+
+
+def test_too_many_headers_and_large_body_rejected():
+    headers = b"".join(b"X-H%d: 1\r\n" % i for i in range(10))
+    assert status(asyncio.run(exchange(b"POST /hook HTTP/1.1\r\n" + headers + b"\r\n", max_headers=5))) == 431
+    data = asyncio.run(exchange(b"POST /hook HTTP/1.1\r\nContent-Length: 100\r\n\r\n", max_body=10))
+    assert status(data) == 413
+
+
+def test_long_header_line_closes_connection():
+    line = b"X-Long: " + b"a" * 1000 + b"\r\n"
+    assert asyncio.run(exchange(b"POST /hook HTTP/1.1\r\n" + line + b"\r\n", max_line=256)) == b""
+
+
+def test_idle_connection_is_closed():
+    async def scenario():
+        server = HttpServer("127.0.0.1", 0, idle_timeout=0.2)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            # Header tidak pernah selesai (slowloris)
+            writer.write(b"POST /hook HTTP/1.1\r\nX-Slow: 1\r\n")
+            await writer.drain()
+            data = await asyncio.wait_for(reader.read(), 2)
+            writer.close()
+            return data, len(server.connections)
+        finally:
+            await server.stop()
+    
+    assert asyncio.run(scenario()) == (b"", 0)
@@ -0,0 +1,38 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.main import BotOrchestrator
+
+
+def orchestrator(**kwargs):
+    state = dict(feed_task=None, last_loop_iteration=time.monotonic(), running=True, liveness_timeout=30,
+                 feed_down_since=None, feed_down_timeout=600)
+    state.update(kwargs)
+    return SimpleNamespace(**state)
+
+
+def live(state):
+    status, _, body = asyncio.run(BotOrchestrator.handle_live(state, None))
+    return status, body.decode()
+
+
+def test_live_ok_while_feed_runs():
+    assert live(orchestrator()) == (200, "ok")
+
+
+def test_live_fails_when_feed_task_finished():
+    async def finished_task():
+        task = asyncio.create_task(asyncio.sleep(0))
+        await task
+        return task
+    
+    task = asyncio.run(finished_task())
+    assert live(orchestrator(feed_task=task)) == (503, "feed stopped")
+
+
+def test_live_fails_when_feed_down_too_long():
+    now = time.monotonic()
+    assert live(orchestrator(feed_down_since=now - 60))[0] == 200
+    status, body = live(orchestrator(feed_down_since=now - 700))
+    assert status == 503 and body.startswith("feed disconnected")
@@ -0,0 +1,54 @@
+import pytest
+
+from app.metrics import LatencyHistogram, RateMeter, SlidingWindowCounter
+
+
+def test_sliding_window_expires_old_buckets():
+    counter = SlidingWindowCounter(10, buckets=10)
+    for t in range(10):
+        counter.add(5, 100.0 + t)
+    assert counter.total(109.5) == 50
+    assert counter.total(114.5) == 25
+    assert counter.total(125.0) == 0
+    # Slot ring dipakai ulang: bucket lama tidak ikut terhitung
+    counter.add(1, 130.0)
+    assert counter.total(130.0) == 1
+
+
+def test_rate_meter_windows():
+    meter = RateMeter()
+    for i in range(600):
+        meter.add(1, 1000.0 + i * 0.1)  # 10 event/detik selama 60 detik
+    rates = meter.rates(1059.95)
+    assert rates[1] == pytest.approx(10, rel=0.1)
+    assert rates[10] == pytest.approx(10, rel=0.05)
+    assert rates[60] == pytest.approx(10, rel=0.05)
+    
+    # Feed berhenti: window pendek turun ke 0 lebih dulu, window 60s masih menyimpan history
+    rates = meter.rates(1075.0)
+    assert rates[1] == 0 and rates[10] == 0
+    assert 0 < rates[60] < 10
+
+
+def test_latency_histogram_percentiles():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.observe(ms / 1000)
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    assert summary["max_ms"] == pytest.approx(100)
+    assert summary["mean_ms"] == pytest.approx(50.5)
+    # Error interpolasi dibatasi lebar bucket (~19%)
+    assert summary["p50_ms"] == pytest.approx(50, rel=0.19)
+    assert summary["p99_ms"] == pytest.approx(99, rel=0.19)
+    assert summary["p99_ms"] <= summary["max_ms"]
+
+
+def test_latency_histogram_overflow_negative_and_reset():
+    histogram = LatencyHistogram(bounds=[0.001, 0.01])
+    histogram.observe(-1)
+    histogram.observe(5.0)
+    assert histogram.counts == [1, 0, 1]
+    assert histogram.percentile(100) == 5.0
+    histogram.reset()
+    assert histogram.summary()["count"] == 0 and histogram.percentile(50) == 0.0
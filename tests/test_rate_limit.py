@@ -0,0 +1,45 @@
+from telegram import Update
+
+USER = {"id": 1, "is_bot": False, "first_name": "Test"}
+CHAT = {"id": 1, "type": "private"}
+
+
+def _message(text, entities=None):
+    message = {"message_id": 1, "date": 0, "chat": CHAT, "from": USER, "text": text}
+    if entities:
+        message["entities"] = entities
+    return {"update_id": 1, "message": message}
+
+
+def _callback():
+    return {"update_id": 2, "callback_query": {"id": "1", "from": USER, "chat_instance": "1", "data": "x"}}
+
+
+def test_gate_only_charges_command_messages(telegram_bot):
+    telegram_bot.token = "123:TEST"
+    app = telegram_bot.create_application()
+    (gate,) = app.handlers[-1]
+    assert gate.callback == telegram_bot.rate_limit_gate
+    
+    def charged(data):
+        return bool(gate.check_update(Update.de_json(data, app.bot)))
+    
+    assert charged(_message("/status", [{"type": "bot_command", "offset": 0, "length": 7}]))
+    assert not charged(_message("halo"))
+    assert not charged(_callback())
+
+
+def test_idle_user_state_is_pruned_together(telegram_bot, monkeypatch):
+    import time
+    from app import bot as bot_module
+    
+    monkeypatch.setattr(bot_module, "USER_STATE_MAX", 3)
+    old = time.monotonic() - 3600
+    for user_id in range(3):
+        telegram_bot._user_bucket(user_id).updated = old
+        telegram_bot.shed_notified[user_id] = old
+    telegram_bot.shed_notified[99] = time.monotonic()
+    
+    telegram_bot._user_bucket(10)
+    assert set(telegram_bot.user_buckets) == {10}
+    assert set(telegram_bot.shed_notified) == {99}
@@ -0,0 +1,40 @@
+import logging
+
+import pytest
+
+from app.history import parse_timestamp
+from app.replay import DEFAULT_START, replay, synthetic_stream
+
+# Konfigurasi yang sama dengan benchmarks/bench_meso.py: evaluation mode tanpa cooldown
+ENV = {
+    'EVALUATION_MODE': 'true',
+    'SIGNAL_COOLDOWN_SECONDS_EVAL': '0',
+    'MIN_SIGNAL_CONFIDENCE_EVAL': '40',
+    'MAX_TICK_DELAY_SECONDS': '3600',
+    'MAX_SPREAD_PIPS': '100',
+}
+SYMBOLS = ["XAUUSD", "EURUSD"]
+
+
+def run_replay():
+    start = parse_timestamp(DEFAULT_START)
+    return replay(synthetic_stream(SYMBOLS, hours=3, rate=1, start=start, seed=7), SYMBOLS, start, env=ENV)
+
+
+@pytest.fixture
+def quiet_logs():
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def test_replay_is_deterministic_with_trades(quiet_logs):
+    first = run_replay()
+    second = run_replay()
+    
+    assert first["trades"] > 0
+    assert first["ticks"] == 3 * 3600 * len(SYMBOLS)
+    assert first["simulated_seconds"] >= 3 * 3600 - 1
+    assert (second["trades"], second["digest"]) == (first["trades"], first["digest"])
+    assert second["symbols"] == first["symbols"]
+    assert first["compute"]["dropped_queued"] == first["compute"]["dropped_late"] == 0
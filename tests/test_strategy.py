@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from app.strategy import SignalStrategy
+
+np = pytest.importorskip("numpy")
+
+
+class NumpyStrategy(SignalStrategy):
+    """Indikator versi numpy sebelum user-050, sebagai referensi"""
+    
+    @staticmethod
+    def calculate_ema(closes, period):
+        if len(closes) < period:
+            return []
+        closes_array = np.array(closes)
+        sma = np.mean(closes_array[:period])
+        ema_values = [sma]
+        multiplier = 2 / (period + 1)
+        for price in closes_array[period:]:
+            ema_values.append((price - ema_values[-1]) * multiplier + ema_values[-1])
+        return [sma] * period + ema_values[1:]
+    
+    @staticmethod
+    def calculate_rsi(closes, period=14):
+        if len(closes) < period + 1:
+            return None
+        deltas = np.diff(closes)
+        seed = deltas[:period + 1]
+        up = seed[seed >= 0].sum() / period
+        down = -seed[seed < 0].sum() / period
+        rs = up / down if down != 0 else 0
+        rsi = 100 - (100 / (1 + rs))
+        for delta in deltas[period + 1:]:
+            if delta > 0:
+                up = (up * (period - 1) + delta) / period
+                down = down * (period - 1) / period
+            else:
+                up = up * (period - 1) / period
+                down = (down * (period - 1) - delta) / period
+            rs = up / down if down != 0 else 0
+            rsi = 100 - (100 / (1 + rs))
+        return rsi
+    
+    @staticmethod
+    def calculate_stochastic(highs, lows, closes, k_period=14, d_period=3):
+        if len(closes) < k_period:
+            return None, None
+        highest_high = np.max(np.array(highs[-k_period:]))
+        lowest_low = np.min(np.array(lows[-k_period:]))
+        close = np.array(closes[-k_period:])[-1]
+        k = 100 * (close - lowest_low) / (highest_high - lowest_low) if (highest_high - lowest_low) != 0 else 50
+        return k, k
+    
+    @staticmethod
+    def calculate_atr(highs, lows, closes, period=14):
+        if len(closes) < period:
+            return None
+        tr_values = [max(highs[i] - lows[i], abs(highs[i] - closes[i - 1]), abs(lows[i] - closes[i - 1]))
+                     for i in range(1, len(closes))]
+        if len(tr_values) < period:
+            return None
+        return np.mean(tr_values[-period:])
+
+
+def random_candles(rng, count, price=2000.0):
+    candles = []
+    for i in range(count):
+        open_ = price
+        price += rng.gauss(0, 1.5)
+        high = max(open_, price) + abs(rng.gauss(0, 0.5))
+        low = min(open_, price) - abs(rng.gauss(0, 0.5))
+        candles.append({'timestamp': i * 60, 'open': open_, 'high': high, 'low': low, 'close': price, 'volume': 10})
+    return candles
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_indicators_match_numpy_reference(seed):
+    rng = random.Random(seed)
+    candles = random_candles(rng, 60)
+    closes = [c['close'] for c in candles]
+    highs = [c['high'] for c in candles]
+    lows = [c['low'] for c in candles]
+    
+    for period in (5, 10, 20):
+        assert SignalStrategy.calculate_ema(closes, period) == pytest.approx(NumpyStrategy.calculate_ema(closes, period))
+    assert SignalStrategy.calculate_rsi(closes) == pytest.approx(NumpyStrategy.calculate_rsi(closes))
+    assert SignalStrategy.calculate_stochastic(highs, lows, closes) == pytest.approx(
+        NumpyStrategy.calculate_stochastic(highs, lows, closes))
+    assert SignalStrategy.calculate_atr(highs, lows, closes) == pytest.approx(NumpyStrategy.calculate_atr(highs, lows, closes))
+
+
+def test_short_series_edge_cases():
+    assert SignalStrategy.calculate_ema([1.0, 2.0], 5) == []
+    assert SignalStrategy.calculate_rsi([1.0] * 10) is None
+    assert SignalStrategy.calculate_rsi([1.0] * 20) == NumpyStrategy.calculate_rsi([1.0] * 20) == 0
+    assert SignalStrategy.calculate_stochastic([1.0] * 14, [1.0] * 14, [1.0] * 14) == (50, 50)
+    assert SignalStrategy.calculate_atr([1.0] * 14, [1.0] * 14, [1.0] * 14) is None
+
+
+def test_signals_match_numpy_reference():
+    rng = random.Random(42)
+    strategy, reference = SignalStrategy({}), NumpyStrategy({})
+    signals = 0
+    for _ in range(300):
+        m1 = random_candles(rng, 50)
+        m5 = random_candles(rng, 30)
+        result = strategy.generate_signal(m1, m5, 2000.0, 2000.2, 2.0, 5.0)
+        assert result == reference.generate_signal(m1, m5, 2000.0, 2000.2, 2.0, 5.0)
+        signals += result[0] is not None
+    assert signals > 0
@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+from app.http_server import HttpRequest
+
+
+class _Route:
+    def __init__(self):
+        self.routes = {}
+    
+    def route(self, method, path, handler):
+        self.routes[(method, path)] = handler
+
+
+class _Bot:
+    def __init__(self):
+        self.webhooks = []
+    
+    async def set_webhook(self, **kwargs):
+        self.webhooks.append(kwargs)
+
+
+class _Application:
+    def __init__(self):
+        self.bot = _Bot()
+        self.update_queue = asyncio.Queue()
+
+
+def _request(token=None):
+    headers = {} if token is None else {'x-telegram-bot-api-secret-token': token}
+    body = json.dumps({"update_id": 1}).encode()
+    return HttpRequest("POST", "/telegram", {}, headers, body)
+
+
+def test_webhook_rejects_missing_or_wrong_secret(telegram_bot):
+    async def scenario():
+        telegram_bot.application = _Application()
+        await telegram_bot.start_webhook(_Route(), "https://bot.example", secret="s3cret")
+        assert (await telegram_bot.handle_webhook(_request()))[0] == 403
+        assert (await telegram_bot.handle_webhook(_request("wrong")))[0] == 403
+        assert telegram_bot.application.update_queue.empty()
+        assert (await telegram_bot.handle_webhook(_request("s3cret")))[0] == 200
+        assert telegram_bot.application.update_queue.qsize() == 1
+    asyncio.run(scenario())
+
+
+def test_webhook_without_configured_secret_generates_one(telegram_bot):
+    async def scenario():
+        telegram_bot.application = _Application()
+        await telegram_bot.start_webhook(_Route(), "https://bot.example", secret=None)
+        secret = telegram_bot.webhook_secret
+        assert secret
+        assert telegram_bot.application.bot.webhooks[0]['secret_token'] == secret
+        assert (await telegram_bot.handle_webhook(_request()))[0] == 403
+        assert (await telegram_bot.handle_webhook(_request("")))[0] == 403
+        assert (await telegram_bot.handle_webhook(_request(secret)))[0] == 200
+    asyncio.run(scenario())
+
+
+def test_webhook_rejects_before_start(telegram_bot):
+    assert asyncio.run(telegram_bot.handle_webhook(_request("anything")))[0] == 403